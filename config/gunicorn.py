@@ -0,0 +1,70 @@
+"""Настройки gunicorn для продакшена: gunicorn config.wsgi -c config/gunicorn.py
+
+Число процессов и потоков считается от числа ядер и переопределяется
+переменными окружения. Приложение загружается в главном процессе до fork,
+там же компилируются шаблоны, строятся таблицы адресов и матрица подбора
+резюме, поэтому рабочие процессы получают их готовыми. Каждый процесс
+перед приемом запросов открывает соединения с базами и выполняет пробный
+запрос. Время холодного старта и первого запроса пишется в лог gunicorn.
+"""
+import multiprocessing
+import os
+import time
+
+_started = time.perf_counter()
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', f'0.0.0.0:{os.environ.get("PORT", "8000")}')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', cpu_count * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1))
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# Перезапуск процессов ограничивает рост памяти, разброс не дает им
+# перезапуститься одновременно.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+forwarded_allow_ips = os.environ.get('GUNICORN_FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+warmup_paths = [path for path in os.environ.get('WARMUP_PATHS', '/').split(',') if path]
+
+
+def _warm_process(log):
+    from core.warmup import build_matching_index, compile_templates, populate_urls
+
+    started = time.perf_counter()
+    count, errors = compile_templates()
+    for error in errors:
+        log.error('Шаблон не компилируется: %s', error)
+    patterns = populate_urls()
+    resumes = build_matching_index()
+    log.info(
+        'Прогрев: %d шаблонов, %d адресов, %d резюме в матрице подбора за %.0f мс',
+        count, patterns, resumes, (time.perf_counter() - started) * 1000
+    )
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from core.warmup import close_connections
+
+        _warm_process(server.log)
+        close_connections()
+    server.log.info(
+        'Холодный старт %.0f мс: %d процессов %s по %d потоков',
+        (time.perf_counter() - _started) * 1000, server.num_workers, server.cfg.worker_class_str, server.cfg.threads
+    )
+
+
+def post_worker_init(worker):
+    from core.warmup import open_connections, warm_request
+
+    if not worker.cfg.preload_app:
+        _warm_process(worker.log)
+    open_connections()
+    for path in warmup_paths:
+        status, elapsed = warm_request(worker.wsgi, path)
+        worker.log.info('Процесс %s: первый запрос %s -> %d за %.1f мс', worker.pid, path, status, elapsed)
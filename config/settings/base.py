@@ -23,6 +23,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,8 +70,59 @@ MEDIA_URL = '/media/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# LocMemCache живет в памяти одного процесса: сброс кэша после изменений
+# не доходит до других процессов, поэтому он годится только для разработки.
+# В production используется общий memcached, см. production.py.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='it-hunter'),
+    }
+}
+
+# Время хранения готовых страниц для анонимных посетителей, 0 — не кэшировать.
+PAGE_CACHE_SECONDS = config('PAGE_CACHE_SECONDS', default=300, cast=int)
+
+# Очередь откликов, которую разбирает команда process_applications.
+APPLICATION_SPOOL_DIR = config('APPLICATION_SPOOL_DIR', default=os.path.join(BASE_DIR, 'spool', 'applications'))
+APPLICATION_SPOOL_LIMIT = config('APPLICATION_SPOOL_LIMIT', default=10000, cast=int)
+
+# Карта сайта и снимки страниц, которые отдает nginx (команды build_sitemaps и build_snapshots).
+SITE_URL = config('SITE_URL', default='http://localhost')
+SITEMAP_ROOT = config('SITEMAP_ROOT', default=os.path.join(BASE_DIR, 'public', 'sitemaps'))
+SNAPSHOT_ROOT = config('SNAPSHOT_ROOT', default=os.path.join(BASE_DIR, 'public', 'snapshots'))
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Алиасы реплик из DATABASES. Пустой список — все запросы идут в default.
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+REPLICA_PIN_COOKIE = 'primary_pin'
+
 LOGOUT_REDIRECT_URL = '/'
 LOGIN_URL = '/login'
 LOGIN_REDIRECT_URL = '/'
 
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
+
+SERVER_TIMING_HEADER = config('SERVER_TIMING_HEADER', default=True, cast=bool)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'raw': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'raw',
+        },
+    },
+    'loggers': {
+        'core.requests': {
+            'handlers': ['requests'],
+            'level': config('REQUEST_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -40,3 +40,16 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'sqlite3'),
     }
 }
+
+# Для проверки маршрутизации локально: копия базы во втором файле SQLite,
+# например DB_REPLICA_NAME=sqlite3-replica.
+if config('DB_REPLICA_NAME', default=''):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, config('DB_REPLICA_NAME')),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+
+# runserver сам пишет строку на каждый запрос, JSON-лог включается через REQUEST_LOG_LEVEL=INFO.
+LOGGING['loggers']['core.requests']['level'] = config('REQUEST_LOG_LEVEL', default='WARNING')
@@ -1,9 +1,14 @@
+from decouple import Csv
+
 from .base import *
 
 DEBUG = config('DEBUG', cast=bool)
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
+# Имена с хэшем содержимого и сжатые копии для nginx, см. core/storage.py.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -26,6 +31,21 @@ DATABASES = {
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
-        'PORT': '5432'
+        'PORT': '5432',
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
     }
 }
+
+# Общий для всех процессов кэш: версии пространств имен из core/cache.py,
+# сбрасываемые сигналами, должны видеть все воркеры gunicorn и process_applications.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.memcached.PyMemcacheCache'),
+        'LOCATION': config('CACHE_LOCATION', default='memcached:11211'),
+    }
+}
+
+# Реплики только для чтения: DB_REPLICA_HOSTS=10.0.0.2,10.0.0.3
+for number, host in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    DATABASES[f'replica_{number}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{number}')
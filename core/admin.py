@@ -1,9 +1,10 @@
 from django.contrib import admin
 
-from .models import Company, Vacancy, Specialty, Application, Resume
+from .models import Company, Vacancy, Specialty, Application, Resume, Skill
 
 admin.site.register(Vacancy)
 admin.site.register(Company)
 admin.site.register(Specialty)
 admin.site.register(Application)
 admin.site.register(Resume)
+admin.site.register(Skill)
@@ -0,0 +1,249 @@
+"""Поиск недостающих индексов по планам запросов.
+
+Во время запроса к странице запоминается каждый выполненный SELECT вместе
+с компилятором Django, который его построил. Для каждого запроса база
+возвращает план (EXPLAIN QUERY PLAN в SQLite, EXPLAIN (FORMAT JSON) в
+PostgreSQL). Полный просмотр и сортировка во временной структуре на
+больших таблицах считаются проблемой. По условиям WHERE и ORDER BY
+запроса предлагается составной индекс: сначала поля сравнения на
+равенство, затем поля сортировки, иначе первое поле с диапазоном.
+"""
+import json
+import re
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models.expressions import Col, OrderBy
+from django.db.models.lookups import Lookup
+from django.db.models.sql import compiler as sql_compiler
+from django.db.models.sql.where import AND, WhereNode
+
+EQUALITY_LOOKUPS = {'exact', 'iexact', 'in', 'isnull'}
+MAX_INDEX_FIELDS = 3
+
+Problem = namedtuple('Problem', ['kind', 'table', 'detail'])
+CapturedQuery = namedtuple('CapturedQuery', ['sql', 'params', 'compiler'])
+
+_sqlite_scan = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$')
+_sqlite_sort = re.compile(r'^USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT|RIGHT PART OF ORDER BY)')
+
+
+@contextmanager
+def capture_queries(connection):
+    """Запоминает SELECT-запросы на соединении вместе с компилятором,
+    который их выполнил. Возвращает список CapturedQuery."""
+
+    captured = []
+    compilers = []
+    original = sql_compiler.SQLCompiler.execute_sql
+
+    def execute_sql(compiler, *args, **kwargs):
+        compilers.append(compiler)
+        try:
+            return original(compiler, *args, **kwargs)
+        finally:
+            compilers.pop()
+
+    def record(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            captured.append(CapturedQuery(sql, params, compilers[-1] if compilers else None))
+        return execute(sql, params, many, context)
+
+    sql_compiler.SQLCompiler.execute_sql = execute_sql
+    try:
+        with connection.execute_wrapper(record):
+            yield captured
+    finally:
+        sql_compiler.SQLCompiler.execute_sql = original
+
+
+def capture_page_queries(connection, client, url, params=None):
+    """Запросы страницы url. Кэш очищается после прогревочного запроса,
+    иначе страницу отдал бы кэш страниц, не обращаясь к базе."""
+
+    client.get(url, params or {})
+    cache.clear()
+    with capture_queries(connection) as captured:
+        client.get(url, params or {})
+    return captured
+
+
+def _sqlite_plan(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+    problems = []
+    for row in rows:
+        detail = row[-1]
+        scan = _sqlite_scan.match(detail)
+        if scan:
+            problems.append(Problem('scan', scan.group(2) or scan.group(1), detail))
+        elif _sqlite_sort.match(detail):
+            problems.append(Problem('sort', None, detail))
+    return problems
+
+
+def _postgresql_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _postgresql_nodes(child)
+
+
+def _postgresql_plan(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    problems = []
+    for node in _postgresql_nodes(plan[0]['Plan']):
+        if node['Node Type'] == 'Seq Scan':
+            detail = f'Seq Scan on {node["Relation Name"]}'
+            if 'Filter' in node:
+                detail += f' (Filter: {node["Filter"]})'
+            problems.append(Problem('scan', node.get('Alias', node['Relation Name']), detail))
+        elif node['Node Type'] in ('Sort', 'Incremental Sort'):
+            problems.append(Problem('sort', None, f'{node["Node Type"]} by {", ".join(node.get("Sort Key", []))}'))
+    return problems
+
+
+PLANNERS = {
+    'sqlite': _sqlite_plan,
+    'postgresql': _postgresql_plan,
+}
+
+
+def explain(connection, sql, params):
+    """Проблемы плана запроса: [Problem(вид, таблица или псевдоним, описание)]."""
+
+    try:
+        planner = PLANNERS[connection.vendor]
+    except KeyError:
+        raise NotImplementedError(f'EXPLAIN не поддерживается для {connection.vendor}')
+    return planner(connection, sql, params)
+
+
+def _where_columns(node, negated=False):
+    """Столбцы условий WHERE: [(псевдоним, поле, сравнение на равенство)].
+    Столбцы под OR и NOT считаются диапазоном."""
+
+    if isinstance(node, WhereNode):
+        loose = negated or node.negated or (node.connector != AND and len(node.children) > 1)
+        for child in node.children:
+            yield from _where_columns(child, loose)
+    elif isinstance(node, Lookup) and isinstance(node.lhs, Col):
+        yield node.lhs.alias, node.lhs.target, not negated and node.lookup_name in EQUALITY_LOOKUPS
+
+
+def _order_columns(compiler):
+    columns = []
+    for expression, _ in compiler.get_order_by():
+        if not isinstance(expression, OrderBy) or not isinstance(expression.expression, Col):
+            return None
+        columns.append((expression.expression.alias, expression.expression.target, expression.descending))
+    return columns
+
+
+def _table_aliases(compiler):
+    return {alias: join.table_name for alias, join in compiler.query.alias_map.items()}
+
+
+def _base_alias(compiler):
+    return compiler.query.get_initial_alias() if compiler.query.alias_map else None
+
+
+def suggest_fields(compiler, alias):
+    """Поля индекса для таблицы с псевдонимом alias по условиям и сортировке
+    запроса или пустой список, если предложить нечего."""
+
+    equal, ranges = [], []
+    for column_alias, field, is_equal in _where_columns(compiler.query.where):
+        if column_alias == alias:
+            target = equal if is_equal else ranges
+            if field.name not in target:
+                target.append(field.name)
+    fields = list(equal)
+    order = _order_columns(compiler)
+    if order and all(column_alias == alias for column_alias, _, _ in order):
+        fields += [f'-{field.name}' if descending else field.name for _, field, descending in order
+                   if field.name not in equal]
+    elif ranges:
+        fields.append(ranges[0])
+    return fields[:MAX_INDEX_FIELDS]
+
+
+def core_model(table):
+    for model in apps.get_app_config('core').get_models():
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def covered(model, fields):
+    """Есть ли у модели индекс, начинающийся с полей fields."""
+
+    names = [name.lstrip('-') for name in fields]
+    opts = model._meta
+    if names == [opts.pk.name]:
+        return True
+    existing = [list(index.fields) for index in opts.indexes]
+    existing += [list(fields) for fields in opts.unique_together + opts.index_together]
+    existing += [[field.name] for field in opts.concrete_fields if field.db_index or field.unique]
+    return any(
+        [name.lstrip('-') for name in index[:len(names)]] == names for index in existing
+    )
+
+
+def index_name(model, fields):
+    name = '_'.join([model._meta.model_name] + [field.lstrip('-') for field in fields] + ['idx'])
+    return name[:26].rstrip('_') + '_idx' if len(name) > 30 else name
+
+
+def analyze(connection, captured, table_sizes, min_rows):
+    """Разбирает выполненные запросы. Возвращает список словарей с текстом
+    запроса, проблемами плана и предложенным индексом."""
+
+    findings = []
+    seen = set()
+    for query in captured:
+        if query.sql in seen:
+            continue
+        seen.add(query.sql)
+        aliases = _table_aliases(query.compiler) if query.compiler else {}
+        for problem in explain(connection, query.sql, query.params):
+            alias = problem.table
+            if alias is None and query.compiler is not None:
+                alias = _base_alias(query.compiler)
+            table = aliases.get(alias, alias)
+            if table is None or table_sizes.get(table, 0) < min_rows:
+                continue
+            finding = {'sql': query.sql, 'kind': problem.kind, 'table': table, 'detail': problem.detail,
+                       'rows': table_sizes[table], 'model': None, 'fields': []}
+            model = core_model(table)
+            if model is not None and query.compiler is not None and alias in aliases:
+                fields = suggest_fields(query.compiler, alias)
+                finding['model'] = model._meta.label
+                if fields and not covered(model, fields):
+                    finding['fields'] = fields
+            findings.append(finding)
+    return findings
+
+
+def table_sizes(connection):
+    """Число строк в таблицах приложения core."""
+
+    sizes = {}
+    for model in apps.get_app_config('core').get_models():
+        if model._meta.managed and not model._meta.proxy:
+            sizes[model._meta.db_table] = model._base_manager.using(connection.alias).count()
+            for field in model._meta.local_many_to_many:
+                through = field.remote_field.through
+                sizes[through._meta.db_table] = through._base_manager.using(connection.alias).count()
+    return sizes
+
+
+def index_definition(model_label, fields):
+    model = apps.get_model(model_label)
+    return f"models.Index(fields={fields!r}, name='{index_name(model, fields)}')"
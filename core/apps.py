@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ItHunterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import signals  # noqa: F401
@@ -0,0 +1,226 @@
+"""Подсказки для строки поиска.
+
+Навыки и названия вакансий хранятся в префиксном дереве в памяти процесса.
+Каждый узел дерева помнит лучшие подсказки своего поддерева, поэтому ответ
+на запрос — это спуск по символам префикса без обращения к базе. Вес
+подсказки — число вакансий с этим навыком или названием. Термин доступен
+по началу любого своего слова: «Python-разработчик» находится и по «раз».
+
+Изменения вакансий применяются к дереву по одному термину. Каждая пачка
+изменений получает номер версии пространства имен autocomplete и
+сохраняется в кэше, откуда ее забирают остальные процессы. Если процесс
+отстал настолько, что изменений в кэше уже нет, дерево строится заново.
+"""
+import re
+import threading
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.cache import bump_namespace, namespace_version
+from core.models import Skill, Vacancy
+
+AUTOCOMPLETE_NAMESPACE = 'autocomplete'
+MAX_SUGGESTIONS = 10
+CHANGES_TIMEOUT = 60 * 60 * 24
+MAX_CHANGES_GAP = 100
+SKILL, TITLE = 'skill', 'title'
+
+_word_start = re.compile(r'(?<!\w)\w')
+
+
+def normalize(text):
+    return ' '.join(text.lower().replace('ё', 'е').split())
+
+
+def _rank(item):
+    (text, kind), weight = item
+    return -weight, text, kind
+
+
+class Node:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = {}
+        self.top = []
+
+    def update_top(self, limit):
+        candidates = dict(self.entries)
+        for child in self.children.values():
+            for term, weight in child.top:
+                if weight > candidates.get(term, 0):
+                    candidates[term] = weight
+        self.top = sorted(candidates.items(), key=_rank)[:limit]
+
+
+class PrefixTrie:
+    """Префиксное дерево терминов (текст, вид) с весами."""
+
+    def __init__(self, limit=MAX_SUGGESTIONS):
+        self.limit = limit
+        self.root = Node()
+        self.weights = {}
+
+    @staticmethod
+    def keys(text):
+        normalized = normalize(text)
+        return {normalized[match.start():] for match in _word_start.finditer(normalized)}
+
+    def _path(self, key, create=False):
+        path = [self.root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                if not create:
+                    return None
+                node = path[-1].children[char] = Node()
+            path.append(node)
+        return path
+
+    def _put(self, term, weight):
+        for key in self.keys(term[0]):
+            path = self._path(key, create=True)
+            if weight > 0:
+                path[-1].entries[term] = weight
+            else:
+                path[-1].entries.pop(term, None)
+            yield key, path
+
+    def set(self, text, kind, weight):
+        """Задает вес термина. Термин с нулевым весом удаляется."""
+
+        term = (text, kind)
+        if weight > 0:
+            self.weights[term] = weight
+        elif self.weights.pop(term, None) is None:
+            return
+        for key, path in list(self._put(term, weight)):
+            for depth in range(len(key), -1, -1):
+                node = path[depth]
+                if depth and not node.entries and not node.children:
+                    path[depth - 1].children.pop(key[depth - 1], None)
+                else:
+                    node.update_top(self.limit)
+
+    def build(self, terms):
+        """Заполняет дерево парами ((текст, вид), вес) за один проход."""
+
+        for term, weight in terms:
+            if weight > 0:
+                self.weights[term] = weight
+                for _ in self._put(term, weight):
+                    pass
+        stack = [(self.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                node.update_top(self.limit)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+        return self
+
+    def complete(self, prefix, limit=MAX_SUGGESTIONS):
+        path = self._path(normalize(prefix))
+        if path is None or len(path) == 1:
+            return []
+        return path[-1].top[:limit]
+
+
+def skill_weights(using='default'):
+    return Skill.objects.using(using).filter(vacancy_count__gt=0).values_list('name', 'vacancy_count')
+
+
+def title_weights(titles=None, using='default'):
+    vacancies = Vacancy.objects.using(using)
+    if titles is not None:
+        vacancies = vacancies.filter(title__in=titles)
+    return vacancies.order_by().values_list('title').annotate(total=Count('pk'))
+
+
+def load_terms(using='default'):
+    for name, weight in skill_weights(using):
+        yield (name, SKILL), weight
+    for title, weight in title_weights(using=using):
+        yield (title, TITLE), weight
+
+
+class AutocompleteIndex:
+    """Дерево подсказок процесса, синхронизируемое через кэш."""
+
+    def __init__(self):
+        self.trie = None
+        self.version = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def changes_key(version):
+        return f'{AUTOCOMPLETE_NAMESPACE}:changes:{version}'
+
+    def rebuild(self):
+        version = namespace_version(AUTOCOMPLETE_NAMESPACE)
+        self.trie = PrefixTrie().build(load_terms())
+        self.version = version
+
+    def _catch_up(self, version):
+        if self.trie is None or version < self.version or version - self.version > MAX_CHANGES_GAP:
+            return self.rebuild()
+        batches = cache.get_many([self.changes_key(number) for number in range(self.version + 1, version + 1)])
+        if len(batches) != version - self.version:
+            return self.rebuild()
+        for number in range(self.version + 1, version + 1):
+            for text, kind, weight in batches[self.changes_key(number)]:
+                self.trie.set(text, kind, weight)
+        self.version = version
+
+    def get_trie(self):
+        version = namespace_version(AUTOCOMPLETE_NAMESPACE)
+        if self.trie is None or version != self.version:
+            with self.lock:
+                if self.trie is None or version != self.version:
+                    self._catch_up(version)
+        return self.trie
+
+    def publish(self, changes):
+        """Сохраняет пачку изменений [(текст, вид, вес)] в кэше для всех
+        процессов и применяет ее к своему дереву."""
+
+        if not changes:
+            return
+        version = bump_namespace(AUTOCOMPLETE_NAMESPACE)
+        cache.set(self.changes_key(version), changes, CHANGES_TIMEOUT)
+        with self.lock:
+            if self.trie is not None and self.version == version - 1:
+                for text, kind, weight in changes:
+                    self.trie.set(text, kind, weight)
+                self.version = version
+
+    def complete(self, prefix, limit=MAX_SUGGESTIONS):
+        return self.get_trie().complete(prefix, limit)
+
+
+index = AutocompleteIndex()
+
+
+def suggest(prefix, limit=MAX_SUGGESTIONS):
+    """Подсказки для префикса: [{'text', 'kind', 'count'}] по убыванию веса."""
+
+    return [
+        {'text': text, 'kind': kind, 'count': weight}
+        for (text, kind), weight in index.complete(prefix, limit)
+    ]
+
+
+def refresh_terms(titles=(), skill_pks=(), using='default'):
+    """Перечитывает веса изменившихся названий и навыков и публикует их."""
+
+    changes = []
+    if titles:
+        counts = dict(title_weights(titles, using))
+        changes.extend((title, TITLE, counts.get(title, 0)) for title in titles)
+    if skill_pks:
+        skills = Skill.objects.using(using).filter(pk__in=skill_pks).values_list('name', 'vacancy_count')
+        changes.extend((name, SKILL, weight) for name, weight in skills)
+    index.publish(changes)
@@ -0,0 +1,222 @@
+"""Замеры производительности страниц для команды bench.
+
+Для каждого адреса из core/urls.py измеряются задержка ответа, число
+SQL-запросов и число строк, прочитанных из базы. Результаты сравниваются
+с сохраненным эталоном.
+"""
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, reverse
+
+from core.models import Company, Resume, Skill, Specialty, Vacancy
+
+User = get_user_model()
+
+# Адреса, которые нельзя вызывать при замерах: они меняют состояние клиента.
+SKIPPED_URLS = {'logout'}
+BENCH_USERNAME = 'bench_user'
+URL_PARAMS = {
+    'search': {'q': 'python'},
+    'autocomplete': {'q': 'py'},
+}
+
+
+class RowCountingCursorWrapper(CursorWrapper):
+    """Курсор, считающий строки, полученные из базы."""
+
+    def __init__(self, cursor, db, stats):
+        super().__init__(cursor, db)
+        self.stats = stats
+
+    def _count(self, rows):
+        self.stats['rows'] += len(rows)
+        return rows
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.stats['rows'] += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        return self._count(self.cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._count(self.cursor.fetchall())
+
+    def __iter__(self):
+        for row in self.cursor:
+            self.stats['rows'] += 1
+            yield row
+
+
+@contextmanager
+def capture_sql(connection):
+    """Считает запросы и прочитанные строки на соединении. Возвращает
+    словарь {'queries': ..., 'rows': ...}, заполняемый по ходу работы."""
+
+    stats = {'queries': 0, 'rows': 0}
+
+    def count_query(execute, sql, params, many, context):
+        stats['queries'] += 1
+        return execute(sql, params, many, context)
+
+    connection.make_cursor = lambda cursor: RowCountingCursorWrapper(cursor, connection, stats)
+    try:
+        with connection.execute_wrapper(count_query):
+            yield stats
+    finally:
+        del connection.make_cursor
+
+
+def iter_url_patterns(patterns, prefix=''):
+    """Обходит urlpatterns, возвращая (имя, шаблон адреса, класс представления)."""
+
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name and pattern.name not in SKIPPED_URLS:
+            yield pattern.name, prefix + str(pattern.pattern), getattr(pattern.callback, 'view_class', None)
+
+
+def requires_login(view_class):
+    return view_class is not None and issubclass(view_class, LoginRequiredMixin)
+
+
+@contextmanager
+def benchmark_database():
+    """Временная тестовая база, на которой страницы обслуживаются без
+    панели отладки: она искажает замеры."""
+
+    middleware = [name for name in settings.MIDDLEWARE if not name.startswith('debug_toolbar')]
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(MIDDLEWARE=middleware):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_database(target, seed):
+    """Догенерирует данные до target вакансий."""
+
+    missing = target - Vacancy.objects.count()
+    if missing > 0:
+        call_command(
+            'generate_data', vacancies=missing, companies=max(1, missing // 50),
+            resumes=missing // 2, applications=missing * 2, users=max(1, missing // 10),
+            seed=seed, stdout=StringIO()
+        )
+
+
+def bench_user():
+    """Пользователь с компанией и резюме для страниц, требующих входа."""
+
+    user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+    if not Company.objects.filter(owner=user).exists():
+        company = Company.objects.filter(owner=None).order_by('-vacancy_count').first()
+        company.owner = user
+        company.save()
+    if not Resume.objects.filter(user=user).exists():
+        Resume.objects.create(
+            user=user, name='Bench', surname='User', status='2', salary=150000,
+            specialty=Specialty.objects.first(), grade='2', education='-', portfolio='-'
+        )
+    return user
+
+
+def sample_kwargs(user):
+    """Аргументы адресов с параметрами: самые нагруженные объекты базы."""
+
+    vacancy = Vacancy.objects.order_by('-application_count').first()
+    own_vacancy = Vacancy.objects.filter(company__owner=user).order_by('-application_count').first()
+    return {
+        'vacancies_by_specialties': {'code': Specialty.objects.order_by('-vacancy_count').first().code},
+        'vacancies_by_skill': {'code': Skill.objects.first().code},
+        'vacancy_detail': {'pk': vacancy.pk},
+        'company_detail': {'pk': vacancy.company_id},
+        'resume_detail': {'pk': Resume.objects.order_by('pk').first().pk},
+        'my_vacancy': {'pk': own_vacancy.pk},
+        'my_vacancy_applications': {'pk': own_vacancy.pk},
+    }
+
+
+def iter_view_requests(patterns, on_skip):
+    """Обходит адреса из patterns и возвращает (имя, адрес, параметры, клиент).
+    Для адресов без примера аргументов вызывается on_skip(имя)."""
+
+    user = bench_user()
+    samples = sample_kwargs(user)
+    anonymous, logged_in = Client(), Client()
+    logged_in.force_login(user)
+    for name, route, view_class in iter_url_patterns(patterns):
+        kwargs = samples.get(name, {})
+        if '<' in route and not kwargs:
+            on_skip(name)
+            continue
+        client = logged_in if requires_login(view_class) else anonymous
+        yield name, reverse(name, kwargs=kwargs), URL_PARAMS.get(name), client
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[round((len(ordered) - 1) * fraction)]
+
+
+def measure(client, url, connection, repeat, params=None, before_request=cache.clear):
+    """Выполняет запрос repeat раз после одного прогревочного и возвращает
+    перцентили задержки в миллисекундах, запросы и строки последнего вызова.
+    По умолчанию кэш очищается перед каждым запросом, иначе страницу отдал
+    бы кэш страниц и замер не касался бы базы; before_request=None замеряет
+    ответы из кэша."""
+
+    client.get(url, params or {})
+    timings = []
+    for _ in range(repeat):
+        if before_request is not None:
+            before_request()
+        with capture_sql(connection) as stats:
+            started = time.perf_counter()
+            response = client.get(url, params or {})
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': stats['queries'],
+        'rows': stats['rows'],
+    }
+
+
+def compare(results, baseline, threshold):
+    """Возвращает список регрессий относительно эталона. Задержка и строки
+    сравниваются с допуском threshold, число запросов — строго."""
+
+    regressions = []
+    for size, views in results.items():
+        for name, current in views.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            label = f'{name} [{size}]'
+            if current['queries'] > previous['queries']:
+                regressions.append(f'{label}: запросов {previous["queries"]} -> {current["queries"]}')
+            for metric in ('p95_ms', 'rows'):
+                if current[metric] > previous[metric] * (1 + threshold) and current[metric] - previous[metric] > 1:
+                    regressions.append(f'{label}: {metric} {previous[metric]} -> {current[metric]}')
+    return regressions
@@ -0,0 +1,106 @@
+"""Массовая загрузка вакансий в обход сигналов модели.
+
+bulk_create не отправляет post_save, поэтому теги навыков и поисковый
+индекс для вставленных вакансий заполняются здесь же пачками, а счетчики,
+кэш главной страницы и подсказки поиска обновляются один раз в
+finish_bulk_load. Там же вставленные вакансии ставятся в очередь пересчета
+рекомендаций и удаляются снимки страниц, на которых они появятся. При небольших загрузках в работающую базу счетчики
+вместо полного пересчета увеличиваются в count_created_vacancies.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+from core.autocomplete import AUTOCOMPLETE_NAMESPACE
+from core.cache import FACETS_NAMESPACE, HOMEPAGE_NAMESPACE, bump_namespace
+from core.conditional import LISTINGS_NAMESPACE
+from core.counters import COUNTED_RELATIONS, adjust_counter, recount_counters
+from core.models import Vacancy
+from core.publish import discard_snapshots, snapshot_paths
+from core.recommendations import request_many_recommendations
+from core.search import get_backend
+from core.skills import adjust_skill_counts, bulk_sync_skills
+
+
+@contextmanager
+def explicit_published_at():
+    """Позволяет задать Vacancy.published_at при bulk_create вместо текущего времени.
+
+    Меняет поле модели на весь процесс: Vacancy.save() в другом потоке в это
+    время получит published_at=None. Только для команд управления, которые
+    работают в отдельном процессе (generate_data), но не для представлений."""
+
+    field = Vacancy._meta.get_field('published_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def bulk_create_vacancies(vacancies, using='default', batch_size=1000):
+    """Вставляет вакансии, проставляет им первичные ключи, теги навыков
+    и записи поискового индекса.
+
+    Базы, не возвращающие ключи из bulk_create (SQLite), отдают их выборкой
+    последних id. Вставка идет в транзакции: первый INSERT захватывает
+    блокировку записи до фиксации, поэтому параллельные вставки не попадут
+    между нашими строками, и последние len(vacancies) ключей принадлежат им."""
+
+    if not vacancies:
+        return vacancies
+    with transaction.atomic(using=using):
+        Vacancy.objects.using(using).bulk_create(vacancies, batch_size=batch_size)
+        if vacancies[0].pk is None:
+            pks = Vacancy.objects.using(using).order_by('-pk').values_list('pk', flat=True)[:len(vacancies)]
+            for vacancy, pk in zip(vacancies, reversed(list(pks))):
+                vacancy.pk = pk
+        bulk_sync_skills(vacancies, using, batch_size)
+        get_backend(using).index(vacancies)
+    return vacancies
+
+
+def count_created_vacancies(vacancies, using='default'):
+    """Увеличивает счетчики компаний, специализаций и навыков на только что
+    вставленные вакансии."""
+
+    for attname, model, field in COUNTED_RELATIONS[Vacancy]:
+        for pk, count in Counter(getattr(vacancy, attname) for vacancy in vacancies).items():
+            adjust_counter(model, pk, field, count, using)
+    through = Vacancy.skill_tags.through
+    skill_counts = Counter(through.objects.using(using).filter(
+        vacancy_id__in=[vacancy.pk for vacancy in vacancies]
+    ).values_list('skill_id', flat=True))
+    skills_by_delta = defaultdict(list)
+    for pk, count in skill_counts.items():
+        skills_by_delta[count].append(pk)
+    for delta, pks in skills_by_delta.items():
+        adjust_skill_counts(pks, delta, using)
+
+
+def invalidate_vacancy_caches(vacancy_pks, specialty_pks=None, using='default'):
+    """Ставит вставленные вакансии vacancy_pks в очередь пересчета
+    рекомендаций. После фиксации транзакции сбрасывает кэш главной страницы,
+    дерево подсказок, значения фасетов и ETag списков вакансий и удаляет
+    снимки списка и страниц специализаций specialty_pks (все снимки, если
+    специализации не указаны)."""
+
+    request_many_recommendations('vacancy', vacancy_pks, using)
+    for namespace in (HOMEPAGE_NAMESPACE, AUTOCOMPLETE_NAMESPACE, FACETS_NAMESPACE, LISTINGS_NAMESPACE):
+        transaction.on_commit(lambda namespace=namespace: bump_namespace(namespace), using=using)
+    if specialty_pks is None:
+        transaction.on_commit(lambda: discard_snapshots(settings.SNAPSHOT_ROOT), using=using)
+    else:
+        transaction.on_commit(
+            lambda: discard_snapshots(settings.SNAPSHOT_ROOT, snapshot_paths(specialty_pks, using)), using=using
+        )
+
+
+def finish_bulk_load(vacancy_pks, using='default'):
+    """Пересчитывает счетчики и сбрасывает кэши после загрузки вакансий
+    vacancy_pks."""
+
+    recount_counters(using)
+    invalidate_vacancy_caches(vacancy_pks, using=using)
@@ -0,0 +1,99 @@
+"""Вспомогательные функции кэширования.
+
+Кэшированные значения группируются в пространства имен. Ключ включает
+текущую версию пространства, поэтому сброс кэша — это увеличение версии,
+а не удаление ключей по шаблону. Одновременные промахи по одному ключу
+объединяются: значение строит только один поток или процесс, остальные
+ждут его результата.
+"""
+import threading
+import time
+import zlib
+
+from django.core.cache import cache
+
+from core.routers import primary_reads
+
+DEFAULT_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+HOMEPAGE_NAMESPACE = 'homepage'
+FACETS_NAMESPACE = 'facets'
+
+_MISSING = object()
+_local_locks = [threading.Lock() for _ in range(64)]
+
+
+def _local_lock(key):
+    return _local_locks[zlib.crc32(key.encode()) % len(_local_locks)]
+
+
+def initial_version():
+    """Начальная версия пространства имен — время в микросекундах. Если ключ
+    версии вытеснен или memcached перезапущен, версия не начнется заново
+    с уже использованного числа, и записи под старыми ключами не вернутся,
+    пока сбросов меньше одного в микросекунду."""
+
+    return time.time_ns() // 1000
+
+
+def namespace_version(namespace):
+    """Текущая версия пространства имен."""
+
+    key = f'ns:{namespace}'
+    version = cache.get(key)
+    if version is None:
+        version = initial_version()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_namespace(namespace):
+    """Сбрасывает все ключи пространства имен, увеличивая его версию.
+    Возвращает новую версию."""
+
+    key = f'ns:{namespace}'
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = initial_version()
+        cache.set(key, version, None)
+        return version
+
+
+def namespaced_key(namespace, key):
+    return f'{namespace}:{namespace_version(namespace)}:{key}'
+
+
+def get_or_build(key, builder, timeout=DEFAULT_TIMEOUT):
+    """Возвращает значение из кэша, а при промахе строит его один раз
+    для всех одновременных запросов, читая данные с основной базы."""
+
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    with _local_lock(key):
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock_key = f'{key}:lock'
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                with primary_reads():
+                    value = builder()
+                cache.set(key, value, timeout)
+            finally:
+                cache.delete(lock_key)
+            return value
+
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        with primary_reads():
+            return builder()
@@ -0,0 +1,49 @@
+"""Валидаторы условных GET-запросов (ETag и Last-Modified).
+
+Валидатор страницы строится до выполнения основного запроса представления
+из дешевых источников: версии пространства кэша LISTINGS_NAMESPACE для
+списков вакансий или времени изменения самого объекта для страниц
+вакансии и компании. Если браузер или поисковый робот прислал совпадающий
+If-None-Match, представление отвечает 304 без выборки списка и отрисовки
+шаблона.
+
+Страницы содержат имя пользователя и CSRF-токен, поэтому ETag включает
+пользователя и CSRF-куку, а Last-Modified, который их не различает, эти
+страницы не выдают. Пока в хранилище есть непоказанные сообщения,
+валидаторы не выдаются: иначе сообщение не попало бы на страницу.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils import timezone
+
+from core.cache import namespace_version
+
+LISTINGS_NAMESPACE = 'listings'
+
+
+def has_pending_messages(request):
+    # len() не помечает сообщения показанными, в отличие от перебора.
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def make_etag(request, *parts):
+    """ETag страницы из частей, от которых зависит ее содержимое, или None,
+    если ответ 304 сейчас недопустим."""
+
+    if has_pending_messages(request):
+        return None
+    user = request.user.pk if hasattr(request, 'user') else None
+    csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    value = ':'.join(str(part) for part in (*parts, user, csrf))
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def listing_etag(request):
+    """ETag списков вакансий. Меняется при любом изменении вакансий,
+    компаний, специализаций и навыков, а также раз в час: от текущего
+    времени зависят фасет «Опубликована» и фильтр по давности."""
+
+    hour = timezone.now().strftime('%Y%m%d%H')
+    return make_etag(request, namespace_version(LISTINGS_NAMESPACE), hour)
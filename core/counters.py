@@ -0,0 +1,77 @@
+"""Денормализованные счетчики.
+
+Company.vacancy_count, Specialty.vacancy_count и Vacancy.application_count
+обновляются выражениями F() из обработчиков сигналов в той же транзакции,
+что и изменение вакансии или отклика. Команда recount_counters
+пересчитывает их одним UPDATE на таблицу, если счетчики разошлись.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core.models import Application, Company, Specialty, Vacancy
+from core.skills import recount_skill_counts
+
+# Модель-источник: [(внешний ключ, модель со счетчиком, поле счетчика)].
+COUNTED_RELATIONS = {
+    Vacancy: [
+        ('company_id', Company, 'vacancy_count'),
+        ('specialty_id', Specialty, 'vacancy_count'),
+    ],
+    Application: [
+        ('vacancy_id', Vacancy, 'application_count'),
+    ],
+}
+
+
+def adjust_counter(model, pk, field, delta, using='default'):
+    if pk is not None and delta:
+        model.objects.using(using).filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def counted_object_saved(instance, created, using='default'):
+    """Увеличивает счетчики для нового объекта или переносит их при смене
+    внешнего ключа."""
+
+    loaded = getattr(instance, '_loaded_relations', {})
+    for attname, model, field in COUNTED_RELATIONS[type(instance)]:
+        current = getattr(instance, attname)
+        if created:
+            adjust_counter(model, current, field, 1, using)
+        elif attname in loaded and loaded[attname] != current:
+            adjust_counter(model, loaded[attname], field, -1, using)
+            adjust_counter(model, current, field, 1, using)
+    instance.remember_relations()
+
+
+def counted_object_deleted(instance, using='default'):
+    for attname, model, field in COUNTED_RELATIONS[type(instance)]:
+        adjust_counter(model, getattr(instance, attname), field, -1, using)
+
+
+def count_subquery(source, fk_name):
+    counts = source.objects.filter(
+        **{fk_name: OuterRef('pk')}
+    ).order_by().values(fk_name).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def recount_counter(model, pks, field, source, fk_name, using='default'):
+    """Пересчитывает счетчик у объектов pks. Нужен, когда неизвестно, сколько
+    строк на самом деле вставлено, например после bulk_create(ignore_conflicts=True)."""
+
+    return model.objects.using(using).filter(pk__in=pks).update(**{field: count_subquery(source, fk_name)})
+
+
+@transaction.atomic
+def recount_counters(using='default'):
+    """Пересчитывает все счетчики. Возвращает {поле: число обновленных строк}."""
+
+    result = {}
+    for source, relations in COUNTED_RELATIONS.items():
+        for attname, model, field in relations:
+            fk_name = attname[:-len('_id')]
+            updated = model.objects.using(using).update(**{field: count_subquery(source, fk_name)})
+            result[f'{model._meta.label}.{field}'] = updated
+    result['core.Skill.vacancy_count'] = recount_skill_counts(using)
+    return result
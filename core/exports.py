@@ -0,0 +1,160 @@
+"""Выгрузка данных без загрузки всей выборки в память.
+
+Строки читаются из базы через QuerySet.iterator(chunk_size=...) (в
+PostgreSQL — серверным курсором) и сразу превращаются в строки CSV или
+JSON Lines, поэтому расход памяти не зависит от размера выгрузки.
+
+Отклики для работодателя выгружаются в CSV для табличных редакторов:
+с BOM и с экранированием апострофом ячеек, похожих на формулу. Выгрузки
+для хранилища данных (команда export_data) пишутся без изменений значений.
+Для инкрементальной выгрузки у каждой модели есть поле времени изменения;
+выгружаются строки с временем из [since, until), и until становится
+следующим since. until отстает от текущего времени на EXPORT_SAFETY_LAG:
+время изменения ставится при сохранении, а строка становится видна только
+после фиксации транзакции, и без запаса она могла бы попасть в уже
+выгруженное окно. Денормализованные счетчики (application_count,
+vacancy_count) обновляются через UPDATE без сдвига времени изменения и
+поэтому не выгружаются: хранилище считает их по выгруженным строкам.
+Удаленные вакансии, компании, резюме и отклики записываются сигналом в
+таблицу Deletion и попадают в выгрузку deletions: (выгрузка, id, время).
+"""
+import csv
+import datetime
+import json
+
+from django.db.models import Q
+
+from core.models import Application, Company, Deletion, Resume, Vacancy
+
+EXPORT_CHUNK_SIZE = 2000
+# Запас в секундах на транзакции, зафиксированные позже времени изменения строки.
+EXPORT_SAFETY_LAG = 300
+# Метка порядка байтов, чтобы Excel открывал UTF-8 с кириллицей.
+CSV_BOM = '\ufeff'
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+APPLICATION_COLUMNS = [
+    ('pk', 'Номер'),
+    ('user__username', 'Пользователь'),
+    ('written_username', 'Имя'),
+    ('written_phone', 'Телефон'),
+    ('written_cover_letter', 'Сопроводительное письмо'),
+]
+# Поля, которые прошли проверку формата и не экранируются.
+TRUSTED_FIELDS = {'pk', 'written_phone'}
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def safe_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(header, rows, trusted=()):
+    """Строки CSV: заголовок и записи rows. Колонки с номерами из trusted
+    не экранируются."""
+
+    writer = csv.writer(Echo())
+    yield CSV_BOM + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([
+            value if number in trusted else safe_cell(value) for number, value in enumerate(row)
+        ])
+
+
+def application_lines(applications, chunk_size=EXPORT_CHUNK_SIZE):
+    """Отклики queryset applications в виде строк CSV."""
+
+    fields = [field for field, _ in APPLICATION_COLUMNS]
+    rows = applications.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    trusted = {number for number, field in enumerate(fields) if field in TRUSTED_FIELDS}
+    return csv_lines([title for _, title in APPLICATION_COLUMNS], rows, trusted)
+
+
+# Имя выгрузки: (модель, поля values_list, поле времени изменения,
+# времена изменения связанных объектов, чьи поля входят в выгрузку).
+DATA_EXPORTS = {
+    'vacancies': (Vacancy, [
+        'id', 'title', 'specialty_id', 'specialty__code', 'specialty__title', 'company_id', 'company__name',
+        'company__location', 'skills', 'description', 'salary_min', 'salary_max', 'published_at',
+        'updated_at',
+    ], 'updated_at', ['company__updated_at']),
+    'companies': (Company, [
+        'id', 'name', 'location', 'description', 'employee_count', 'owner_id', 'updated_at',
+    ], 'updated_at', []),
+    'resumes': (Resume, [
+        'id', 'user_id', 'name', 'surname', 'status', 'salary', 'specialty_id', 'specialty__code', 'grade',
+        'education', 'experience', 'description', 'portfolio', 'phone', 'updated_at',
+    ], 'updated_at', []),
+    'applications': (Application, [
+        'id', 'vacancy_id', 'user_id', 'written_username', 'written_phone', 'written_cover_letter', 'created_at',
+    ], 'created_at', []),
+    'deletions': (Deletion, ['export', 'object_id', 'deleted_at'], 'deleted_at', []),
+}
+# Выгрузки, удаления строк которых записываются в Deletion.
+DELETED_EXPORTS = {
+    model: name for name, (model, _, _, _) in DATA_EXPORTS.items() if model is not Deletion
+}
+EXPORT_FORMATS = ('jsonl', 'csv')
+
+
+def export_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def export_columns(name):
+    return [field.replace('__', '_') for field in DATA_EXPORTS[name][1]]
+
+
+def export_rows(name, until, since=None, using='default', chunk_size=EXPORT_CHUNK_SIZE):
+    """Кортежи значений выгрузки name, измененные в [since, until)."""
+
+    model, fields, watermark, related = DATA_EXPORTS[name]
+    queryset = model.objects.using(using).filter(**{f'{watermark}__lt': until})
+    if since is None:
+        queryset = queryset.order_by('pk')
+    else:
+        changed = Q(**{f'{watermark}__gte': since})
+        for field in related:
+            changed |= Q(**{f'{field}__gte': since})
+        queryset = queryset.filter(changed).order_by(watermark, 'pk')
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def jsonl_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=export_value) + '\n'
+
+
+def plain_csv_lines(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([export_value(value) for value in row])
+
+
+def write_export(file, name, export_format, until, since=None, using='default', chunk_size=EXPORT_CHUNK_SIZE):
+    """Пишет выгрузку name в текстовый файл file. Возвращает число строк."""
+
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for count, row in enumerate(rows, start=1):
+            yield row
+
+    columns = export_columns(name)
+    rows = counted(export_rows(name, until, since, using, chunk_size))
+    lines = jsonl_lines(columns, rows) if export_format == 'jsonl' else plain_csv_lines(columns, rows)
+    for line in lines:
+        file.write(line)
+    return count
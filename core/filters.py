@@ -0,0 +1,150 @@
+"""Фильтры и фасеты списка вакансий.
+
+Каждый фасет — это параметр строки запроса и набор значений с условием
+для каждого. Количество вакансий для значения фасета считается с учетом
+всех остальных выбранных фильтров, кроме фильтра самого фасета, поэтому
+выбор одного значения не скрывает соседние. Все счетчики, включая общее
+количество, считаются одним запросом с условными агрегатами и кэшируются
+на короткое время.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from core.cache import FACETS_NAMESPACE, get_or_build, namespaced_key
+from core.forms import VacancyFilterForm
+from core.models import Company, Specialty
+from core.pagination import COUNT_CACHE_TIMEOUT
+
+SALARY_STEPS = (50000, 100000, 150000, 200000, 300000)
+MAX_LOCATIONS = 20
+FACET_TITLES = {
+    'specialty': 'Специализация',
+    'location': 'Город',
+    'salary': 'Зарплата',
+    'age': 'Опубликована',
+}
+
+
+def build_facet_choices():
+    return {
+        'specialty': list(Specialty.objects.order_by('title').values_list('code', 'title', 'pk')),
+        'location': list(
+            Company.objects.values_list('location', flat=True).annotate(
+                total=Sum('vacancy_count')
+            ).filter(total__gt=0).order_by('-total', 'location')[:MAX_LOCATIONS]
+        ),
+    }
+
+
+def facet_choices():
+    """Значения фасетов специализации и города. Кэшируются до изменения
+    вакансий, компаний или специализаций."""
+
+    return get_or_build(namespaced_key(FACETS_NAMESPACE, 'choices'), build_facet_choices)
+
+
+def facet_values(name, choices):
+    """Значения фасета: [(значение параметра, подпись, условие)]."""
+
+    if name == 'specialty':
+        return [(code, title, Q(specialty_id=pk)) for code, title, pk in choices['specialty']]
+    if name == 'location':
+        return [(location, location, Q(company__location=location)) for location in choices['location']]
+    if name == 'salary':
+        return [(step, f'от {step:,}'.replace(',', ' '), Q(salary_max__gte=step)) for step in SALARY_STEPS]
+    if name == 'age':
+        now = timezone.now()
+        return [(days, label, Q(published_at__gte=now - timedelta(days=days)))
+                for days, label in VacancyFilterForm.AGE_CHOICES]
+    raise ValueError(name)
+
+
+def filter_conditions(filters, choices):
+    """Условия выбранных фильтров по фасетам: {фасет: Q}."""
+
+    conditions = {}
+    if 'specialty' in filters:
+        pks = [pk for code, title, pk in choices['specialty'] if code == filters['specialty']]
+        conditions['specialty'] = Q(specialty_id__in=pks)
+    if 'location' in filters:
+        conditions['location'] = Q(company__location=filters['location'])
+    salary = Q()
+    if 'salary_from' in filters:
+        salary &= Q(salary_max__gte=filters['salary_from'])
+    if 'salary_to' in filters:
+        salary &= Q(salary_min__lte=filters['salary_to'])
+    if salary:
+        conditions['salary'] = salary
+    if 'age' in filters:
+        conditions['age'] = Q(published_at__gte=timezone.now() - timedelta(days=filters['age']))
+    return conditions
+
+
+def combine(conditions, exclude=None):
+    result = Q()
+    for name, condition in conditions.items():
+        if name != exclude:
+            result &= condition
+    return result
+
+
+def count(condition):
+    return Count('pk', filter=condition) if condition else Count('pk')
+
+
+def facet_counts(queryset, facets, filters, choices):
+    """Общее количество и счетчики всех значений фасетов одним запросом:
+    {'total': ..., 'specialty': [...], ...} в порядке facet_values."""
+
+    key = 'facets:' + hashlib.md5(
+        f'{queryset.db}:{queryset.query}:{json.dumps(filters, sort_keys=True)}:{facets}:{choices}'.encode()
+    ).hexdigest()
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    conditions = filter_conditions(filters, choices)
+    aggregates = {'total': count(combine(conditions))}
+    for name in facets:
+        others = combine(conditions, exclude=name)
+        for number, (value, label, condition) in enumerate(facet_values(name, choices)):
+            aggregates[f'{name}_{number}'] = count(others & condition)
+    result = queryset.order_by().aggregate(**aggregates)
+
+    counts = {'total': result['total'] or 0}
+    for name in facets:
+        counts[name] = [result[f'{name}_{number}'] or 0 for number in range(len(facet_values(name, choices)))]
+    cache.set(key, counts, COUNT_CACHE_TIMEOUT)
+    return counts
+
+
+def facet_groups(facets, filters, choices, counts, params):
+    """Фасеты для шаблона со ссылками, включающими или снимающими значение.
+    Значения без вакансий не показываются, если они не выбраны."""
+
+    params = params.copy()
+    params.pop('cursor', None)
+    groups = []
+    for name in facets:
+        param = 'salary_from' if name == 'salary' else name
+        options = []
+        for (value, label, condition), total in zip(facet_values(name, choices), counts[name]):
+            active = filters.get(param) == value
+            if not total and not active:
+                continue
+            option_params = params.copy()
+            if active:
+                option_params.pop(param, None)
+            else:
+                option_params[param] = value
+            options.append({
+                'label': label, 'count': total, 'active': active, 'querystring': option_params.urlencode(),
+            })
+        if options:
+            groups.append({'title': FACET_TITLES[name], 'options': options})
+    return groups
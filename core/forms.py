@@ -3,9 +3,10 @@ from crispy_forms.layout import Submit
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 
-from core.models import Application, Vacancy, Company, Resume
+from core.models import Application, Vacancy, Company, Resume, Specialty
 
 User = get_user_model()
 
@@ -116,6 +117,69 @@ class VacancyForm(forms.ModelForm):
         }
 
 
+class SpecialtyCodeField(forms.ModelChoiceField):
+    """Специализация по коду из заранее загруженного словаря {код: Specialty},
+    без запроса к базе на каждое значение."""
+
+    def __init__(self, specialties, **kwargs):
+        super().__init__(queryset=Specialty.objects.none(), to_field_name='code', **kwargs)
+        self.specialties = specialties
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.specialties[str(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class BulkVacancyForm(VacancyForm):
+    """Проверка одной строки загружаемого файла по правилам VacancyForm.
+    Специализация указывается кодом."""
+
+    def __init__(self, *args, specialties, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['specialty'] = SpecialtyCodeField(specialties, label='Специализация')
+
+    def _get_validation_exclusions(self):
+        # Специализация уже найдена в словаре, ForeignKey.validate повторил бы запрос.
+        return [*super()._get_validation_exclusions(), 'specialty']
+
+
+class VacancyUploadForm(forms.Form):
+    """Форма загрузки файла с вакансиями."""
+
+    file = forms.FileField(
+        label='Файл CSV или JSON',
+        help_text='Колонки: title, specialty (код специализации), skills, description, salary_min, salary_max.'
+    )
+
+
+class VacancyFilterForm(forms.Form):
+    """Фильтры списка вакансий из строки запроса. Неверные значения
+    отбрасываются, остальные фильтры продолжают действовать."""
+
+    AGE_CHOICES = (
+        (1, 'За сутки'),
+        (3, 'За 3 дня'),
+        (7, 'За неделю'),
+        (30, 'За месяц'),
+    )
+
+    salary_from = forms.IntegerField(label='Зарплата от', min_value=0, required=False)
+    salary_to = forms.IntegerField(label='Зарплата до', min_value=0, required=False)
+    specialty = forms.CharField(label='Специализация', max_length=50, required=False)
+    location = forms.CharField(label='Город', max_length=50, required=False)
+    age = forms.TypedChoiceField(label='Опубликована', choices=AGE_CHOICES, coerce=int, required=False)
+
+    def get_filters(self):
+        """Значения фильтров, прошедшие проверку, без пустых."""
+
+        self.is_valid()
+        return {name: value for name, value in self.cleaned_data.items() if value not in (None, '')}
+
+
 class ResumeForm(forms.ModelForm):
     """Форма для создания своего резюме."""
 
@@ -0,0 +1,67 @@
+"""Кэш разметки карточек вакансий и компаний.
+
+Ключ карточки включает первичный ключ объекта, время его изменения
+updated_at и значения, которые меняются без сохранения объекта (счетчик
+вакансий компании, логотип компании у вакансии). Поэтому сбрасывать
+карточки при изменении не нужно: измененный объект просто получает новый
+ключ, а старая разметка вытесняется по таймауту. Названия специализаций
+и навыков входят в карточку вакансии, но у них нет updated_at: их
+изменение увеличивает версию пространства CARDS_NAMESPACE.
+
+Список карточек читается из кэша одним get_many, недостающие карточки
+рендерятся одним проходом и записываются одним set_many.
+"""
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from core.cache import namespace_version
+
+CARDS_NAMESPACE = 'cards'
+CARD_TIMEOUT = 24 * 60 * 60
+
+
+def _stamp(value):
+    return int(value.timestamp() * 1000000) if value else 0
+
+
+def vacancy_card_key(vacancy):
+    return f'{vacancy.pk}:{_stamp(vacancy.updated_at)}:{_stamp(vacancy.company.updated_at)}'
+
+
+def company_card_key(company):
+    return f'{company.pk}:{_stamp(company.updated_at)}:{company.vacancy_count}'
+
+
+def prefetch_vacancy_cards(vacancies):
+    prefetch_related_objects(vacancies, 'skill_tags')
+
+
+# Вид карточки: (шаблон, имя объекта в контексте, ключ объекта, подготовка промахов).
+CARDS = {
+    'vacancy': ('inc/_vacancy_card.html', 'vacancy', vacancy_card_key, prefetch_vacancy_cards),
+    'company': ('inc/_company_card.html', 'company', company_card_key, None),
+    'company_tile': ('inc/_company_tile.html', 'company', company_card_key, None),
+}
+
+
+def render_cards(objects, kind):
+    """Разметка карточек объектов, склеенная в одну строку. Связанные
+    объекты для карточек, которых нет в кэше, загружаются только для них."""
+
+    template_name, context_name, object_key, prepare = CARDS[kind]
+    objects = list(objects)
+    version = namespace_version(CARDS_NAMESPACE)
+    keys = [f'card:{kind}:{version}:{object_key(obj)}' for obj in objects]
+    cached = cache.get_many(keys)
+
+    missing = [(key, obj) for key, obj in zip(keys, objects) if key not in cached]
+    if missing:
+        if prepare is not None:
+            prepare([obj for key, obj in missing])
+        template = get_template(template_name)
+        rendered = {key: template.render({context_name: obj}) for key, obj in missing}
+        cache.set_many(rendered, CARD_TIMEOUT)
+        cached.update(rendered)
+    return mark_safe(''.join(cached[key] for key in keys))
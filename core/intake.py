@@ -0,0 +1,189 @@
+"""Отложенная запись откликов на вакансии.
+
+Отклик из формы не вставляется в базу в запросе, а пишется отдельным
+файлом в локальную очередь APPLICATION_SPOOL_DIR: файл сначала создается
+во временном каталоге, сбрасывается на диск и атомарно переименовывается.
+Имя файла — пара (пользователь, вакансия), поэтому повторный отклик того
+же пользователя на ту же вакансию заменяет предыдущий, пока его не
+забрали. Очередь ограничена APPLICATION_SPOOL_LIMIT файлами; если она
+заполнена, отклик сохраняется сразу.
+
+Команда process_applications забирает файлы пачками в каталог processing,
+отбрасывает отклики, которые уже есть в базе или ссылаются на удаленные
+вакансии и пользователей, вставляет остальные через bulk_create и
+пересчитывает Vacancy.application_count. Ограничение application_unique
+не дает задвоить отклик, сохраненный формой в обход очереди. Файлы
+удаляются после фиксации транзакции, а забранные, но не записанные при
+сбое файлы возвращаются в очередь при следующем запуске; повторная
+обработка ничего не задвоит.
+"""
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from core.counters import recount_counter
+from core.models import Application, Vacancy
+
+User = get_user_model()
+
+QUEUE = 'queue'
+PROCESSING = 'processing'
+TEMPORARY = 'tmp'
+APPLICATION_FIELDS = ('written_username', 'written_phone', 'written_cover_letter')
+BATCH_SIZE = 500
+
+
+def spool_path(*names):
+    return os.path.join(settings.APPLICATION_SPOOL_DIR, *names)
+
+
+def entry_name(user_pk, vacancy_pk):
+    return f'{user_pk}-{vacancy_pk}.json'
+
+
+def sync_directory(path):
+    """Сбрасывает на диск запись каталога после переименования файла."""
+
+    if hasattr(os, 'O_DIRECTORY'):
+        descriptor = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def pending_count(limit=None):
+    """Число откликов в очереди; при заданном limit счет останавливается на нем."""
+
+    count = 0
+    try:
+        with os.scandir(spool_path(QUEUE)) as entries:
+            for _ in entries:
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+    except FileNotFoundError:
+        pass
+    return count
+
+
+def enqueue_application(user_pk, vacancy_pk, data):
+    """Кладет отклик в очередь. Возвращает False, если очередь заполнена."""
+
+    queue = spool_path(QUEUE)
+    name = entry_name(user_pk, vacancy_pk)
+    limit = settings.APPLICATION_SPOOL_LIMIT
+    if not os.path.exists(os.path.join(queue, name)) and pending_count(limit) >= limit:
+        return False
+    temporary = spool_path(TEMPORARY)
+    os.makedirs(temporary, exist_ok=True)
+    os.makedirs(queue, exist_ok=True)
+
+    entry = {'user': user_pk, 'vacancy': vacancy_pk}
+    entry.update((field, data.get(field, '')) for field in APPLICATION_FIELDS)
+    descriptor, path = tempfile.mkstemp(dir=temporary, suffix='.json')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(entry, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path, os.path.join(queue, name))
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    sync_directory(queue)
+    return True
+
+
+def claim_entries(limit):
+    """Переносит до limit файлов из очереди в processing и возвращает их пути."""
+
+    queue, processing = spool_path(QUEUE), spool_path(PROCESSING)
+    try:
+        names = sorted(os.listdir(queue))[:limit]
+    except FileNotFoundError:
+        return []
+    os.makedirs(processing, exist_ok=True)
+    claimed = []
+    for name in names:
+        try:
+            os.replace(os.path.join(queue, name), os.path.join(processing, name))
+        except FileNotFoundError:
+            continue
+        claimed.append(os.path.join(processing, name))
+    return claimed
+
+
+def recover_claimed():
+    """Возвращает в очередь файлы, забранные до сбоя обработчика. Если в
+    очереди уже есть более новый отклик той же пары, старый удаляется."""
+
+    queue, processing = spool_path(QUEUE), spool_path(PROCESSING)
+    try:
+        names = os.listdir(processing)
+    except FileNotFoundError:
+        return 0
+    os.makedirs(queue, exist_ok=True)
+    for name in names:
+        if os.path.exists(os.path.join(queue, name)):
+            os.remove(os.path.join(processing, name))
+        else:
+            os.replace(os.path.join(processing, name), os.path.join(queue, name))
+    return len(names)
+
+
+def read_entries(paths):
+    entries = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            entry = json.load(file)
+        entries[(entry['user'], entry['vacancy'])] = entry
+    return entries
+
+
+def write_applications(entries, using='default'):
+    """Вставляет новые отклики из {(пользователь, вакансия): данные}.
+    Возвращает число вставленных."""
+
+    user_pks = {user_pk for user_pk, _ in entries}
+    vacancy_pks = {vacancy_pk for _, vacancy_pk in entries}
+    existing = set(Application.objects.using(using).filter(
+        user_id__in=user_pks, vacancy_id__in=vacancy_pks
+    ).values_list('user_id', 'vacancy_id'))
+    users = set(User.objects.using(using).filter(pk__in=user_pks).values_list('pk', flat=True))
+    vacancies = set(Vacancy.objects.using(using).filter(pk__in=vacancy_pks).values_list('pk', flat=True))
+
+    applications = [
+        Application(user_id=user_pk, vacancy_id=vacancy_pk, **{field: entry[field] for field in APPLICATION_FIELDS})
+        for (user_pk, vacancy_pk), entry in sorted(entries.items())
+        if (user_pk, vacancy_pk) not in existing and user_pk in users and vacancy_pk in vacancies
+    ]
+    # Отклик мог появиться после проверки existing, если очередь была полна
+    # и форма сохранила его сразу: такие строки пропускает ограничение
+    # application_unique, а счетчики затронутых вакансий пересчитываются.
+    with transaction.atomic(using=using):
+        Application.objects.using(using).bulk_create(applications, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        recount_counter(
+            Vacancy, {application.vacancy_id for application in applications}, 'application_count',
+            Application, 'vacancy', using
+        )
+    return len(applications)
+
+
+def flush_applications(using='default', batch_size=BATCH_SIZE):
+    """Записывает в базу все отклики из очереди пачками по batch_size.
+    Возвращает число вставленных откликов."""
+
+    total = 0
+    while True:
+        paths = claim_entries(batch_size)
+        if not paths:
+            return total
+        total += write_applications(read_entries(paths), using)
+        for path in paths:
+            os.remove(path)
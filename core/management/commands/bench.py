@@ -0,0 +1,85 @@
+import json
+
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core import urls
+from core.benchmark import benchmark_database, compare, iter_view_requests, measure, seed_database
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку, число SQL-запросов и прочитанных строк для всех страниц '
+            'на тестовой базе возрастающего размера и сравнивает результат с эталоном')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000', help='Размеры базы в вакансиях через запятую')
+        parser.add_argument('--repeat', type=int, default=10, help='Количество замеров на страницу')
+        parser.add_argument('--output', default='bench-results.json', help='Файл для результатов')
+        parser.add_argument('--baseline', default=None, help='Эталон для сравнения')
+        parser.add_argument('--save-baseline', action='store_true', help='Сохранить результат как эталон')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Допустимый рост задержки и строк')
+        parser.add_argument('--warm', action='store_true',
+                            help='Не очищать кэш перед запросами и замерять ответы из кэша')
+        parser.add_argument('--seed', type=int, default=1, help='Зерно генератора данных')
+
+    def _run_size(self, size, options):
+        seed_database(size, options['seed'])
+        results = {}
+        requests = iter_view_requests(
+            urls.urlpatterns,
+            lambda name: self.stdout.write(self.style.WARNING(f'{name}: нет примера аргументов, пропущено'))
+        )
+        for name, url, params, client in requests:
+            results[name] = measure(
+                client, url, connection, options['repeat'],
+                params=params, before_request=None if options['warm'] else cache.clear
+            )
+            self._print_row(name, results[name])
+        return results
+
+    def _print_row(self, name, row):
+        self.stdout.write(
+            f'{name:<28} {row["status"]:>4} {row["p50_ms"]:>9.2f} {row["p95_ms"]:>9.2f} '
+            f'{row["queries"]:>8} {row["rows"]:>8}'
+        )
+
+    def _benchmark(self, sizes, options):
+        results = {}
+        for size in sizes:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Вакансий: {size}'))
+            self.stdout.write(f'{"view":<28} {"code":>4} {"p50, ms":>9} {"p95, ms":>9} {"queries":>8} {"rows":>8}')
+            results[str(size)] = self._run_size(size, options)
+        return results
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        with benchmark_database():
+            results = self._benchmark(sizes, options)
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Результаты сохранены в {options["output"]}'))
+
+        if not options['baseline']:
+            return
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as file:
+                json.dump(report, file, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'Эталон сохранен в {options["baseline"]}'))
+            return
+        with open(options['baseline']) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline['results'], options['threshold'])
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(f'Найдено регрессий: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий не найдено'))
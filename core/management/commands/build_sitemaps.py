@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core.publish import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Обновляет карту сайта (индекс и части до 50 000 адресов), если изменились опубликованные вакансии'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=settings.SITEMAP_ROOT, help='Каталог карты сайта')
+        parser.add_argument('--base-url', default=settings.SITE_URL, help='Адрес сайта для ссылок в карте')
+        parser.add_argument('--force', action='store_true', help='Собрать карту, даже если данные не менялись')
+
+    def handle(self, *args, **options):
+        result = build_sitemaps(options['output_dir'], options['base_url'], options['force'])
+        if result is None:
+            self.stdout.write('Вакансии не менялись, карта сайта актуальна')
+            return
+        written, removed = result
+        self.stdout.write(self.style.SUCCESS(f'Записано частей карты: {written}, удалено: {removed}'))
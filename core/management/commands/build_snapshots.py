@@ -0,0 +1,27 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core.publish import build_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Обновляет HTML-снимки списка вакансий и страниц специализаций, данные которых изменились'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=settings.SNAPSHOT_ROOT, help='Каталог снимков')
+        parser.add_argument('--host', default=urlsplit(settings.SITE_URL).hostname,
+                            help='Заголовок Host для отрисовки, должен входить в ALLOWED_HOSTS')
+        parser.add_argument('--force', action='store_true', help='Отрисовать все страницы заново')
+
+    def _skipped(self, path, response):
+        self.stdout.write(self.style.WARNING(f'{path}: ответ {response.status_code} нельзя отдавать всем, снимок не сохранен'))
+
+    def handle(self, *args, **options):
+        rendered, written, removed = build_snapshots(
+            options['output_dir'], options['host'], options['force'], on_skip=self._skipped
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Отрисовано страниц: {rendered}, изменилось файлов: {written}, удалено: {removed}'
+        ))
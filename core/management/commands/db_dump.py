@@ -1,5 +1,8 @@
 from django.core.management import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
 
+from core.bulk import bulk_create_vacancies, finish_bulk_load
 from core.models import Company, Vacancy, Specialty
 from data import jobs, specialties, companies
 
@@ -9,57 +12,70 @@ class Command(BaseCommand):
 
     def _populating_company(self, item_list=None):
         if isinstance(item_list, list) and item_list:
-            count = 0
-            for item in item_list:
-                obj, created = Company.objects.update_or_create(
-                    id=item['id'],
+            existing = set(Company.objects.filter(
+                id__in=[int(item['id']) for item in item_list]
+            ).values_list('id', flat=True))
+            created = Company.objects.bulk_create([
+                Company(
+                    id=int(item['id']),
                     name=item['title'],
                     location=item['location'],
                     logo='/company_images/' + item['logo'],
                     description=item['description'],
                     employee_count=int(item['employee_count'])
                 )
-                if created:
-                    count += 1
-            self.stdout.write(self.style.SUCCESS(f'{count} компаний было добавлено'))
+                for item in item_list if int(item['id']) not in existing
+            ])
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Company]):
+                    cursor.execute(sql)
+            self.stdout.write(self.style.SUCCESS(f'{len(created)} компаний было добавлено'))
         else:
             self.stdout.write(self.style.ERROR('Произошла ошибка при создании компаний'))
 
     def _populating_specialty(self, item_list=None):
         if isinstance(item_list, list) and item_list:
-            count = 0
-            for item in item_list:
-                obj, created = Specialty.objects.update_or_create(
+            existing = set(Specialty.objects.values_list('code', flat=True))
+            created = Specialty.objects.bulk_create([
+                Specialty(
                     code=item['code'],
                     title=item['title'],
                     picture='/specialties_images/' + item['logo'],
                 )
-                if created:
-                    count += 1
-            self.stdout.write(self.style.SUCCESS(f'{count} специальностей было добавлено'))
+                for item in item_list if item['code'] not in existing
+            ])
+            self.stdout.write(self.style.SUCCESS(f'{len(created)} специальностей было добавлено'))
         else:
             self.stdout.write(self.style.ERROR('При создании специальностей произошла ошибка'))
 
     def _populating_vacancy(self, item_list=None):
         if isinstance(item_list, list) and item_list:
-            count = 0
-            for item in item_list:
-                obj, created = Vacancy.objects.update_or_create(
+            specialty_ids = dict(Specialty.objects.values_list('code', 'id'))
+            company_ids = set(Company.objects.values_list('id', flat=True))
+            existing = set(Vacancy.objects.values_list('title', 'company_id'))
+            vacancies = [
+                Vacancy(
                     title=item['title'],
-                    specialty=Specialty.objects.get(code=item['specialty']),
-                    company=Company.objects.get(pk=item['company']),
+                    specialty_id=specialty_ids[item['specialty']],
+                    company_id=int(item['company']),
                     skills=item['skills'],
                     description=item['description'],
                     salary_min=int(item['salary_from']),
                     salary_max=int(item['salary_to'])
                 )
-                if created:
-                    count += 1
-            self.stdout.write(self.style.SUCCESS(f'{count} вакансий было добавлено'))
-        else:
-            self.stdout.write(self.style.ERROR('При создании вакансий произошла ошибка'))
+                for item in item_list
+                if (item['title'], int(item['company'])) not in existing
+                and item['specialty'] in specialty_ids and int(item['company']) in company_ids
+            ]
+            bulk_create_vacancies(vacancies)
+            self.stdout.write(self.style.SUCCESS(f'{len(vacancies)} вакансий было добавлено'))
+            return vacancies
+        self.stdout.write(self.style.ERROR('При создании вакансий произошла ошибка'))
+        return []
 
+    @transaction.atomic
     def handle(self, *args, **options):
         self._populating_company(companies)
         self._populating_specialty(specialties)
-        self._populating_vacancy(jobs)
+        vacancies = self._populating_vacancy(jobs)
+        finish_bulk_load([vacancy.pk for vacancy in vacancies])
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.exports import DATA_EXPORTS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_SAFETY_LAG, write_export
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class Command(BaseCommand):
+    help = ('Выгружает вакансии, компании, резюме, отклики и удаления в JSON Lines или CSV по файлу на модель. '
+            'С --since выгружаются только строки, измененные после водяного знака прошлой выгрузки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default='export', help='Каталог для файлов выгрузки')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl', help='Формат файлов')
+        parser.add_argument('--models', default=','.join(DATA_EXPORTS), help='Выгрузки через запятую')
+        parser.add_argument('--since', default=None,
+                            help='Время изменения ISO 8601, с которого выгружать (until из manifest.json прошлой выгрузки)')
+        parser.add_argument('--safety-lag', type=int, default=EXPORT_SAFETY_LAG,
+                            help='На сколько секунд until отстает от текущего времени')
+        parser.add_argument('--gzip', action='store_true', help='Сжимать файлы gzip')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Строк в одном чтении курсора')
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+
+    def _parse_since(self, value):
+        if value is None:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            raise CommandError(f'Неверное время --since: {value}')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def _open(self, path, compress):
+        if compress:
+            return gzip.open(path, 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    def handle(self, *args, **options):
+        names = [name for name in options['models'].split(',') if name]
+        unknown = set(names) - set(DATA_EXPORTS)
+        if unknown:
+            raise CommandError(f'Неизвестные выгрузки: {", ".join(sorted(unknown))}')
+        since = self._parse_since(options['since'])
+        until = timezone.now() - timedelta(seconds=options['safety_lag'])
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+
+        files = {}
+        for name in names:
+            filename = f'{name}.{options["format"]}' + ('.gz' if options['gzip'] else '')
+            path = os.path.join(output_dir, filename)
+            # Файл появляется под своим именем только целиком.
+            with self._open(path + '.part', options['gzip']) as file:
+                rows = write_export(
+                    file, name, options['format'], until, since, options['database'], options['chunk_size']
+                )
+            os.replace(path + '.part', path)
+            files[name] = {'file': filename, 'rows': rows}
+            self.stdout.write(self.style.SUCCESS(f'{name}: {rows} строк в {path}'))
+
+        manifest = {
+            'since': since.isoformat() if since else None,
+            'until': until.isoformat(),
+            'format': options['format'],
+            'files': files,
+        }
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Следующая выгрузка: --since {until.isoformat()}')
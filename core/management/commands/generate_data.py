@@ -0,0 +1,188 @@
+import random
+import time
+import uuid
+from array import array
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.bulk import bulk_create_vacancies, explicit_published_at, finish_bulk_load
+from core.models import Application, Company, Resume, Specialty, Vacancy
+from data import jobs, specialties, companies
+
+User = get_user_model()
+
+NAMES = ['Александр', 'Мария', 'Дмитрий', 'Анна', 'Сергей', 'Елена', 'Иван', 'Ольга', 'Павел', 'Наталья']
+SURNAMES = ['Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Соколов', 'Лебедева', 'Козлов', 'Новикова']
+EDUCATIONS = ['МГУ, факультет ВМК', 'СПбГУ, матмех', 'НГУ, ФИТ', 'Самообразование, онлайн-курсы']
+COVER_LETTERS = [
+    'Здравствуйте! Меня заинтересовала ваша вакансия, готов обсудить детали.',
+    'Добрый день. Опыт работы с указанным стеком более трех лет.',
+    'Хочу расти вместе с вашей командой, резюме во вложении.',
+]
+LOCATIONS = sorted({company['location'] for company in companies})
+SKILL_POOL = sorted({skill.strip() for job in jobs for skill in job['skills'].split(',')})
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Генерирует большой объем правдоподобных данных на основе шаблонов из data.py'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=10000, help='Количество вакансий')
+        parser.add_argument('--companies', type=int, default=1000, help='Количество компаний')
+        parser.add_argument('--resumes', type=int, default=10000, help='Количество резюме')
+        parser.add_argument('--applications', type=int, default=50000, help='Количество откликов')
+        parser.add_argument('--users', type=int, default=1000, help='Количество пользователей-соискателей')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Размер пачки для bulk_create')
+        parser.add_argument('--days', type=int, default=365, help='Разброс дат публикации в днях')
+        parser.add_argument('--seed', type=int, default=None, help='Зерно генератора случайных чисел')
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+
+    def _report(self, label, count, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'{label}: {count} за {elapsed:.1f} с'))
+
+    def _ensure_specialties(self):
+        existing = set(Specialty.objects.using(self.using).values_list('code', flat=True))
+        Specialty.objects.using(self.using).bulk_create([
+            Specialty(code=item['code'], title=item['title'], picture='/specialties_images/' + item['logo'])
+            for item in specialties if item['code'] not in existing
+        ])
+        return array('q', Specialty.objects.using(self.using).values_list('id', flat=True))
+
+    def _create(self, model, rows, return_pks=True, ignore_conflicts=False):
+        """Вставляет объекты пачками и возвращает компактный массив их первичных ключей.
+        С ignore_conflicts повторы пропускаются, а возвращается число вставленных строк."""
+
+        manager = model.objects.using(self.using)
+        last_pk = manager.order_by('-pk').values_list('pk', flat=True).first() or 0
+        count = 0
+        for batch in batched(rows, self.batch_size):
+            manager.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=ignore_conflicts)
+            count += len(batch)
+        if ignore_conflicts:
+            return manager.filter(pk__gt=last_pk).count()
+        if not return_pks:
+            return count
+        return array('q', manager.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:count])
+
+    def _companies(self, count):
+        for number in range(count):
+            template = self.random.choice(companies)
+            yield Company(
+                name=f'{template["title"].strip()} {number}'[:50],
+                location=self.random.choice(LOCATIONS),
+                logo='/company_images/' + template['logo'],
+                description=template['description'],
+                employee_count=self.random.randint(5, 5000),
+            )
+
+    def _users(self, count):
+        password = make_password(None)
+        for number in range(count):
+            yield User(username=f'gen_{self.run}_{number}', password=password)
+
+    def _resumes(self, count, specialty_ids):
+        for _ in range(count):
+            yield Resume(
+                name=self.random.choice(NAMES),
+                surname=self.random.choice(SURNAMES),
+                status=self.random.choice(Resume.STATUS)[0],
+                salary=self.random.randrange(30000, 400000, 5000),
+                specialty_id=self.random.choice(specialty_ids),
+                grade=self.random.choice(Resume.GRADE)[0],
+                education=self.random.choice(EDUCATIONS),
+                experience=self.random.choice(jobs)['description'],
+                description='',
+                portfolio='https://github.com',
+                phone=f'+7{self.random.randint(9000000000, 9999999999)}',
+            )
+
+    def _vacancies(self, count, specialty_ids, company_ids):
+        now = timezone.now()
+        for _ in range(count):
+            template = self.random.choice(jobs)
+            salary_min = int(int(template['salary_from']) * self.random.uniform(0.7, 1.5)) // 1000 * 1000
+            skills = template['skills'].split(', ') + self.random.sample(SKILL_POOL, 2)
+            yield Vacancy(
+                title=template['title'],
+                specialty_id=self.random.choice(specialty_ids),
+                company_id=self.random.choice(company_ids),
+                skills=', '.join(dict.fromkeys(skills))[:255],
+                description=template['description'],
+                salary_min=salary_min,
+                salary_max=salary_min + self.random.randrange(0, 100000, 5000),
+                published_at=now - timedelta(seconds=self.random.randint(0, self.days * 86400)),
+            )
+
+    def _applications(self, count, vacancy_ids, user_ids):
+        # Пользователь откликается на вакансию не больше одного раза.
+        seen = set()
+        count = min(count, len(vacancy_ids) * len(user_ids))
+        while len(seen) < count:
+            pair = (self.random.choice(user_ids), self.random.choice(vacancy_ids))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            yield Application(
+                written_username=self.random.choice(NAMES),
+                written_phone=f'+7{self.random.randint(9000000000, 9999999999)}',
+                written_cover_letter=self.random.choice(COVER_LETTERS),
+                user_id=pair[0],
+                vacancy_id=pair[1],
+            )
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.days = options['days']
+        self.random = random.Random(options['seed'])
+        self.run = uuid.uuid4().hex[:8]
+
+        with transaction.atomic(using=self.using), explicit_published_at():
+            started = time.monotonic()
+            specialty_ids = self._ensure_specialties()
+
+            company_ids = self._create(Company, self._companies(options['companies']))
+            if not company_ids:
+                company_ids = array('q', Company.objects.using(self.using).values_list('id', flat=True))
+            if not company_ids:
+                raise CommandError('Нет компаний для вакансий, укажите --companies')
+            self._report('Компании', options['companies'], started)
+
+            user_ids = self._create(User, self._users(options['users'] if options['applications'] else 0))
+            self._report('Пользователи', len(user_ids), started)
+
+            self._create(Resume, self._resumes(options['resumes'], specialty_ids))
+            self._report('Резюме', options['resumes'], started)
+
+            vacancy_ids = array('q')
+            for batch in batched(self._vacancies(options['vacancies'], specialty_ids, company_ids), self.batch_size):
+                bulk_create_vacancies(batch, self.using, self.batch_size)
+                vacancy_ids.extend(vacancy.pk for vacancy in batch)
+            self._report('Вакансии', len(vacancy_ids), started)
+
+            if vacancy_ids and user_ids:
+                # Отклики прошлых запусков пропускает ограничение application_unique.
+                count = self._create(
+                    Application, self._applications(options['applications'], vacancy_ids, user_ids),
+                    return_pks=False, ignore_conflicts=True
+                )
+                self._report('Отклики', count, started)
+
+            finish_bulk_load(vacancy_ids, self.using)
+            self._report('Готово, счетчики пересчитаны', len(vacancy_ids), started)
@@ -0,0 +1,29 @@
+from django.core.management import BaseCommand
+
+from core.models import Company, Resume, Specialty
+from core.thumbnails import VARIANTS, generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Создает уменьшенные копии и WebP-версии для уже загруженных изображений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Пересоздать существующие варианты')
+
+    def handle(self, *args, **options):
+        models = {model._meta.label: model for model in (Company, Resume, Specialty)}
+        processed = set()
+        written = 0
+        for key in VARIANTS:
+            label, field_name = key.rsplit('.', 1)
+            queryset = models[label].objects.only(field_name).order_by('pk')
+            for instance in queryset.iterator():
+                field_file = getattr(instance, field_name)
+                if field_file.name in processed:
+                    continue
+                processed.add(field_file.name)
+                try:
+                    written += generate_variants(field_file, force=options['force'])
+                except (OSError, ValueError) as error:
+                    self.stdout.write(self.style.ERROR(f'{field_file.name}: {error}'))
+        self.stdout.write(self.style.SUCCESS(f'{written} файлов создано для {len(processed)} изображений'))
@@ -0,0 +1,63 @@
+from collections import Counter, defaultdict
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from core import urls
+from core.advisor import analyze, capture_page_queries, index_definition, table_sizes
+from core.benchmark import benchmark_database, iter_view_requests, seed_database
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов каждой страницы на тестовой базе, находит полные '
+            'просмотры и сортировки больших таблиц и предлагает индексы для моделей core')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Размер базы в вакансиях')
+        parser.add_argument('--min-rows', type=int, default=1000, help='Минимальный размер таблицы для проверки')
+        parser.add_argument('--seed', type=int, default=1, help='Зерно генератора данных')
+        parser.add_argument('--verbose-sql', action='store_true', help='Выводить текст проблемных запросов')
+        parser.add_argument('--repeat-threshold', type=int, default=5,
+                            help='Сколько одинаковых запросов на странице считать проблемой N+1')
+        parser.add_argument('--check', action='store_true', help='Завершиться с ошибкой, если есть предложения')
+
+    def _inspect(self, options):
+        seed_database(options['size'], options['seed'])
+        sizes = table_sizes(connection)
+        suggestions = defaultdict(set)
+        requests = iter_view_requests(
+            urls.urlpatterns,
+            lambda name: self.stdout.write(self.style.WARNING(f'{name}: нет примера аргументов, пропущено'))
+        )
+        for name, url, params, client in requests:
+            captured = capture_page_queries(connection, client, url, params)
+            try:
+                findings = analyze(connection, captured, sizes, options['min_rows'])
+            except NotImplementedError as error:
+                raise CommandError(error)
+            status = self.style.SUCCESS('ok') if not findings else self.style.WARNING(f'{len(findings)} проблем')
+            self.stdout.write(f'{name:<28} {len(captured):>4} запросов  {status}')
+            for finding in findings:
+                self.stdout.write(f'    {finding["table"]} ({finding["rows"]} строк): {finding["detail"]}')
+                if options['verbose_sql']:
+                    self.stdout.write(f'        {finding["sql"]}')
+                if finding['fields']:
+                    suggestions[finding['model'], tuple(finding['fields'])].add(name)
+            sql, repeats = max(Counter(query.sql for query in captured).items(), key=lambda item: item[1], default=('', 0))
+            if repeats >= options['repeat_threshold']:
+                self.stdout.write(self.style.WARNING(f'    запрос повторяется {repeats} раз (N+1): {sql[:120]}'))
+        return suggestions
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            suggestions = self._inspect(options)
+
+        if not suggestions:
+            self.stdout.write(self.style.SUCCESS('Предложений по индексам нет'))
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING('Предлагаемые индексы (Meta.indexes):'))
+        for (model, fields), views in sorted(suggestions.items()):
+            self.stdout.write(f'{model}: {index_definition(model, list(fields))}')
+            self.stdout.write(f'    страницы: {", ".join(sorted(views))}')
+        if options['check']:
+            raise CommandError(f'Предложено индексов: {len(suggestions)}')
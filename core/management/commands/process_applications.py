@@ -0,0 +1,30 @@
+import time
+
+from django.core.management import BaseCommand
+
+from core.intake import BATCH_SIZE, flush_applications, recover_claimed
+
+
+class Command(BaseCommand):
+    help = 'Записывает в базу отклики из очереди. Должен работать в одном экземпляре'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Откликов в одной вставке')
+        parser.add_argument('--interval', type=float, default=1.0, help='Пауза между проверками очереди, секунд')
+        parser.add_argument('--once', action='store_true', help='Разобрать очередь один раз и завершиться')
+
+    def handle(self, *args, **options):
+        recovered = recover_claimed()
+        if recovered:
+            self.stdout.write(self.style.WARNING(f'Возвращено в очередь после сбоя: {recovered}'))
+        while True:
+            created = flush_applications(options['database'], options['batch_size'])
+            if created:
+                self.stdout.write(self.style.SUCCESS(f'Записано откликов: {created}'))
+            if options['once']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
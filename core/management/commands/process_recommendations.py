@@ -0,0 +1,29 @@
+import time
+
+from django.core.management import BaseCommand
+
+from core.recommendations import TASK_BATCH_SIZE, process_tasks
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации резюме и вакансий, сохраненных пользователями'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+        parser.add_argument('--batch-size', type=int, default=TASK_BATCH_SIZE, help='Задач за один проход')
+        parser.add_argument('--interval', type=float, default=1.0, help='Пауза между проверками очереди, секунд')
+        parser.add_argument('--once', action='store_true', help='Разобрать очередь один раз и завершиться')
+
+    def handle(self, *args, **options):
+        while True:
+            done = process_tasks(options['database'], options['batch_size'])
+            if done:
+                self.stdout.write(self.style.SUCCESS(f'Пересчитано задач: {done}'))
+            if done == options['batch_size']:
+                continue
+            if options['once']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
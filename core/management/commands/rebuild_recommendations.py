@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from core.models import Resume
+from core.recommendations import recommend_for_resume
+
+
+class Command(BaseCommand):
+    help = 'Заново строит рекомендации вакансий для всех резюме'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        pks = list(Resume.objects.using(using).order_by('pk').values_list('pk', flat=True))
+        total = sum(recommend_for_resume(pk, using) for pk in pks)
+        self.stdout.write(self.style.SUCCESS(f'{total} рекомендаций для {len(pks)} резюме'))
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс вакансий'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Размер пачки')
+
+    def handle(self, *args, **options):
+        total = rebuild_index(using=options['database'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} вакансий проиндексировано'))
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from core.counters import recount_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счетчики вакансий, откликов и навыков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Алиас базы данных')
+
+    def handle(self, *args, **options):
+        for field, updated in recount_counters(using=options['database']).items():
+            self.stdout.write(self.style.SUCCESS(f'{field}: пересчитано {updated} записей'))
@@ -0,0 +1,337 @@
+"""Подбор резюме, подходящих к вакансии.
+
+Признаки всех резюме хранятся в памяти процесса в массивах NumPy: строка
+матрицы — одно резюме, столбцы — специализация, квалификация, желаемая
+зарплата и признак активного поиска. Навыки резюме, найденные в тексте
+опыта и описания, хранятся парами (строка, навык). Оценка всех резюме
+для вакансии считается несколькими векторными операциями, а лучшие
+кандидаты выбираются через argpartition без сортировки всей матрицы.
+
+Изменения резюме применяются к матрице по строкам. Как и в подсказках
+поиска, пачки изменений нумеруются версией пространства имен matching и
+хранятся в кэше для остальных процессов, поэтому кэш должен быть общим
+для всех процессов (memcached в production). Матрица строится заново, если
+процесс отстал или она старше MATRIX_MAX_AGE: так учитываются навыки,
+появившиеся после построения. Первую матрицу gunicorn строит при прогреве
+(core/warmup.py), последующие перестроения идут в фоновом потоке, а
+запросы тем временем используют прежнюю матрицу.
+"""
+import logging
+import re
+import threading
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from core.cache import bump_namespace, namespace_version
+from core.models import Resume, Skill
+
+MATCHING_NAMESPACE = 'matching'
+MATCH_LIMIT = 10
+CHANGES_TIMEOUT = 60 * 60 * 24
+MAX_CHANGES_GAP = 100
+MATRIX_MAX_AGE = 6 * 60 * 60
+MAX_SKILL_WORDS = 3
+INACTIVE_STATUS = '0'
+UNKNOWN_GRADE = -1
+
+WEIGHTS = {
+    'specialty': 0.35,
+    'skills': 0.35,
+    'salary': 0.2,
+    'grade': 0.1,
+}
+GRADE_WORDS = {
+    0: ('стажер', 'стажёр', 'intern', 'trainee'),
+    1: ('junior', 'джуниор', 'младший'),
+    2: ('middle', 'мидл'),
+    3: ('senior', 'сеньор', 'старший', 'ведущий'),
+    4: ('lead', 'лид', 'тимлид', 'teamlead', 'руководитель'),
+}
+MAX_GRADE = max(GRADE_WORDS)
+
+logger = logging.getLogger(__name__)
+
+_separators = re.compile(r'[,;/()\[\]«»"•]')
+
+
+def text_words(text):
+    words = _separators.sub(' ', text.lower()).split()
+    return [word.rstrip('.:!?') for word in words]
+
+
+def text_skill_codes(text, multiword_starts=None):
+    """Возможные коды навыков в тексте: слова и сочетания до
+    MAX_SKILL_WORDS слов подряд. Если задано multiword_starts, сочетания
+    строятся только от первых слов навыков из нескольких слов."""
+
+    words = text_words(text)
+    codes = set(words)
+    for start, word in enumerate(words):
+        if multiword_starts is None or word in multiword_starts:
+            codes.update(' '.join(words[start:start + size]) for size in range(2, MAX_SKILL_WORDS + 1))
+    codes.discard('')
+    return codes
+
+
+def target_grade(title):
+    """Квалификация, указанная в названии вакансии, или UNKNOWN_GRADE."""
+
+    words = set(text_words(title))
+    for grade, grade_words in GRADE_WORDS.items():
+        if words.intersection(grade_words):
+            return grade
+    return UNKNOWN_GRADE
+
+
+def load_features(pks=None, using='default'):
+    """Признаки резюме: [(pk, специализация, квалификация, зарплата,
+    активно, [pk навыков])]. Без pks загружаются все резюме."""
+
+    skill_pks = dict(Skill.objects.using(using).values_list('code', 'pk'))
+    multiword_starts = {code.split()[0] for code in skill_pks if ' ' in code}
+    resumes = Resume.objects.using(using).order_by()
+    if pks is not None:
+        resumes = resumes.filter(pk__in=pks)
+    features = []
+    for pk, specialty_id, grade, salary, status, experience, description in resumes.values_list(
+        'pk', 'specialty_id', 'grade', 'salary', 'status', 'experience', 'description'
+    ).iterator(chunk_size=2000):
+        codes = text_skill_codes(f'{experience or ""}\n{description or ""}', multiword_starts)
+        grade = int(grade) if grade and grade.isdigit() else UNKNOWN_GRADE
+        features.append((
+            pk, specialty_id, grade, salary, status != INACTIVE_STATUS,
+            [skill_pks[code] for code in codes if code in skill_pks],
+        ))
+    return features
+
+
+def match_scores(same_specialty, overlap, skill_count, salary, salary_min, salary_max, resume_grade, vacancy_grade):
+    """Оценка пар резюме и вакансия от 0 до 1. Аргументы — массивы NumPy
+    одной длины или числа: со стороны резюме и со стороны вакансии может
+    быть как одна запись, так и много."""
+
+    score = WEIGHTS['specialty'] * np.asarray(same_specialty, dtype=np.float64)
+    score = score + WEIGHTS['skills'] * np.minimum(overlap / np.maximum(skill_count, 1), 1.0)
+    # Зарплата в вилке подходит полностью. Выше вилки оценка падает до
+    # нуля при двукратном превышении верхней границы, ниже — не более
+    # чем вдвое: кандидат может быть слабее, чем нужно.
+    excess = np.maximum(salary - salary_max, 0) / np.maximum(salary_max, 1)
+    shortfall = np.maximum(salary_min - salary, 0) / np.maximum(salary_min, 1)
+    score = score + WEIGHTS['salary'] * np.clip(1 - excess - shortfall / 2, 0, 1)
+    resume_grade = np.asarray(resume_grade, dtype=np.int64)
+    vacancy_grade = np.asarray(vacancy_grade, dtype=np.int64)
+    known = (resume_grade != UNKNOWN_GRADE) & (vacancy_grade != UNKNOWN_GRADE)
+    distance = np.abs(resume_grade - vacancy_grade)
+    return score + WEIGHTS['grade'] * np.where(known, 1 - distance / MAX_GRADE, 0)
+
+
+class ResumeMatrix:
+    """Признаки резюме в массивах NumPy."""
+
+    def __init__(self, features=()):
+        self.rows = {}
+        self.pks = np.zeros(0, dtype=np.int64)
+        self.specialties = np.zeros(0, dtype=np.int64)
+        self.grades = np.zeros(0, dtype=np.int8)
+        self.salaries = np.zeros(0, dtype=np.float64)
+        self.active = np.zeros(0, dtype=bool)
+        self.pair_rows = np.zeros(0, dtype=np.int64)
+        self.pair_skills = np.zeros(0, dtype=np.int64)
+        self.max_skill = 0
+        self.update(features)
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def update(self, features, deleted_pks=()):
+        """Заменяет строки измененных резюме, добавляет новые и выключает
+        строки удаленных."""
+
+        for pk in deleted_pks:
+            if pk in self.rows:
+                self.active[self.rows[pk]] = False
+        if not features:
+            return
+
+        new = [feature for feature in features if feature[0] not in self.rows]
+        if new:
+            start = len(self.pks)
+            for offset, feature in enumerate(new):
+                self.rows[feature[0]] = start + offset
+            self.pks = np.concatenate([self.pks, np.zeros(len(new), dtype=np.int64)])
+            self.specialties = np.concatenate([self.specialties, np.zeros(len(new), dtype=np.int64)])
+            self.grades = np.concatenate([self.grades, np.zeros(len(new), dtype=np.int8)])
+            self.salaries = np.concatenate([self.salaries, np.zeros(len(new), dtype=np.float64)])
+            self.active = np.concatenate([self.active, np.zeros(len(new), dtype=bool)])
+
+        rows = np.array([self.rows[feature[0]] for feature in features], dtype=np.int64)
+        pks, specialties, grades, salaries, active, skills = zip(*features)
+        self.pks[rows] = pks
+        self.specialties[rows] = specialties
+        self.grades[rows] = grades
+        self.salaries[rows] = salaries
+        self.active[rows] = active
+
+        keep = ~np.isin(self.pair_rows, rows)
+        counts = [len(skill_pks) for skill_pks in skills]
+        self.pair_rows = np.concatenate([self.pair_rows[keep], np.repeat(rows, counts)])
+        self.pair_skills = np.concatenate([
+            self.pair_skills[keep], np.fromiter((pk for skill_pks in skills for pk in skill_pks), dtype=np.int64)
+        ])
+        self.max_skill = int(self.pair_skills.max()) if len(self.pair_skills) else 0
+
+    def skill_overlap(self, skill_pks):
+        """Число навыков из skill_pks в каждой строке."""
+
+        # Таблица «навык нужен вакансии» по pk навыка быстрее np.isin.
+        wanted = np.zeros(self.max_skill + 1, dtype=bool)
+        wanted[[pk for pk in skill_pks if pk <= self.max_skill]] = True
+        return np.bincount(self.pair_rows[wanted[self.pair_skills]], minlength=len(self.pks))
+
+    def affected_rows(self, specialty_id, skill_pks):
+        """Строки активных резюме той же специализации или хотя бы с одним
+        из навыков: списки резюме по специализации и по навыку."""
+
+        return np.flatnonzero(self.active & ((self.specialties == specialty_id) | (self.skill_overlap(skill_pks) > 0)))
+
+    def scores(self, specialty_id, grade, salary_min, salary_max, skill_pks):
+        """Оценки всех строк от 0 до 1 и число совпавших навыков."""
+
+        overlap = self.skill_overlap(skill_pks)
+        score = match_scores(
+            self.specialties == specialty_id, overlap, len(skill_pks),
+            self.salaries, salary_min, salary_max, self.grades, grade,
+        )
+        return np.where(self.active, score, -1.0), overlap
+
+    def top(self, specialty_id, grade, salary_min, salary_max, skill_pks, limit=MATCH_LIMIT):
+        """Лучшие резюме: [(pk, оценка, число совпавших навыков)]."""
+
+        if not len(self.pks):
+            return []
+        score, overlap = self.scores(specialty_id, grade, salary_min, salary_max, skill_pks)
+        limit = min(limit, len(score))
+        best = np.argpartition(-score, limit - 1)[:limit]
+        best = best[np.lexsort((self.pks[best], -score[best]))]
+        return [
+            (int(self.pks[row]), float(score[row]), int(overlap[row]))
+            for row in best if score[row] > 0
+        ]
+
+
+class MatchingIndex:
+    """Матрица признаков процесса, согласованная с остальными процессами
+    через пачки изменений в кэше."""
+
+    def __init__(self):
+        self.matrix = None
+        self.version = None
+        self.built_at = 0
+        self.rebuilding = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def changes_key(version):
+        return f'{MATCHING_NAMESPACE}:changes:{version}'
+
+    def _install(self, version, matrix):
+        self.matrix = matrix
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def rebuild(self):
+        version = namespace_version(MATCHING_NAMESPACE)
+        matrix = ResumeMatrix(load_features())
+        with self.lock:
+            self._install(version, matrix)
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Матрица подбора резюме не построена')
+        finally:
+            self.rebuilding = False
+            connection.close()
+
+    def start_rebuild(self):
+        """Перестраивает матрицу в фоновом потоке, если он еще не запущен."""
+
+        if not self.rebuilding:
+            self.rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def apply(self, pks):
+        features = load_features(pks)
+        found = {feature[0] for feature in features}
+        self.matrix.update(features, [pk for pk in pks if pk not in found])
+
+    def _catch_up(self, version):
+        if (version < self.version or version - self.version > MAX_CHANGES_GAP
+                or time.monotonic() - self.built_at > MATRIX_MAX_AGE):
+            return self.start_rebuild()
+        batches = cache.get_many([self.changes_key(number) for number in range(self.version + 1, version + 1)])
+        if len(batches) != version - self.version:
+            return self.start_rebuild()
+        self.apply({pk for batch in batches.values() for pk in batch})
+        self.version = version
+
+    def get_matrix(self):
+        """Текущая матрица. Без прогрева первый вызов в процессе строит ее
+        сам, отставшая матрица отдается до конца фонового перестроения."""
+
+        if self.matrix is None:
+            with self.lock:
+                if self.matrix is None:
+                    self._install(namespace_version(MATCHING_NAMESPACE), ResumeMatrix(load_features()))
+            return self.matrix
+        version = namespace_version(MATCHING_NAMESPACE)
+        if version != self.version or time.monotonic() - self.built_at > MATRIX_MAX_AGE:
+            with self.lock:
+                if version != self.version or time.monotonic() - self.built_at > MATRIX_MAX_AGE:
+                    self._catch_up(version)
+        return self.matrix
+
+    def publish(self, pks):
+        """Сохраняет первичные ключи измененных резюме в кэше для всех
+        процессов и обновляет свою матрицу."""
+
+        pks = list(pks)
+        if not pks:
+            return
+        version = bump_namespace(MATCHING_NAMESPACE)
+        cache.set(self.changes_key(version), pks, CHANGES_TIMEOUT)
+        with self.lock:
+            if self.matrix is not None and self.version == version - 1:
+                self.apply(pks)
+                self.version = version
+
+
+index = MatchingIndex()
+
+
+def refresh_resumes(pks):
+    index.publish(pks)
+
+
+def matching_resumes(vacancy, limit=MATCH_LIMIT):
+    """Резюме, лучше всего подходящие к вакансии, по убыванию оценки.
+    У каждого резюме заполнены атрибуты match_score (в процентах)
+    и matched_skills."""
+
+    skill_pks = set(vacancy.skill_tags.values_list('pk', flat=True))
+    top = index.get_matrix().top(
+        vacancy.specialty_id, target_grade(vacancy.title), vacancy.salary_min, vacancy.salary_max, skill_pks, limit
+    )
+    resumes = Resume.objects.select_related('specialty').in_bulk([pk for pk, score, overlap in top])
+    result = []
+    for pk, score, overlap in top:
+        if pk in resumes:
+            resume = resumes[pk]
+            resume.match_score = round(score * 100)
+            resume.matched_skills = overlap
+            result.append(resume)
+    return result
@@ -0,0 +1,126 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+from core.routers import has_written, replicas, reset_pinning
+
+logger = logging.getLogger('core.requests')
+
+
+class RequestTimingMiddleware:
+    """Замеряет время обработки запроса: число и длительность SQL-запросов,
+    время представления и отрисовки шаблона. Результат добавляется в
+    заголовок Server-Timing и пишется одной JSON-строкой в лог core.requests.
+    Должен стоять первым в MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request._timing = {'queries': 0, 'db': 0.0, 'template': 0.0, 'view': 0.0}
+
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timing['queries'] += 1
+                timing['db'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        timing['total'] = finished - started
+        if 'view_started' in timing:
+            timing['view'] = finished - timing.pop('view_started')
+
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = self.server_timing(timing)
+        self.log(request, response, timing)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing['view_started'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = request._timing
+        render_started = time.perf_counter()
+        timing['view'] = render_started - timing.pop('view_started', render_started)
+
+        def rendered(response):
+            timing['template'] = time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def server_timing(timing):
+        return ', '.join([
+            f'db;dur={timing["db"] * 1000:.1f};desc="{timing["queries"]} queries"',
+            f'view;dur={timing["view"] * 1000:.1f}',
+            f'tpl;dur={timing["template"] * 1000:.1f}',
+            f'total;dur={timing["total"] * 1000:.1f}',
+        ])
+
+    @staticmethod
+    def log(request, response, timing):
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'url_name': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timing['queries'],
+            'db_ms': round(timing['db'] * 1000, 2),
+            'view_ms': round(timing['view'] * 1000, 2),
+            'template_ms': round(timing['template'] * 1000, 2),
+            'total_ms': round(timing['total'] * 1000, 2),
+        }, ensure_ascii=False))
+
+
+class ReplicaPinningMiddleware:
+    """Направляет чтение на основную базу в запросах, изменяющих данные,
+    и в течение REPLICA_PIN_SECONDS после них. Окно хранится в подписанной
+    куке, поэтому работает при любом числе процессов. Должен стоять до
+    SessionMiddleware, чтобы сессия тоже читалась с основной базы."""
+
+    salt = 'core.routers.pin'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _pinned(self, request):
+        value = request.COOKIES.get(settings.REPLICA_PIN_COOKIE)
+        if not value:
+            return False
+        try:
+            signing.loads(value, salt=self.salt, max_age=settings.REPLICA_PIN_SECONDS)
+        except signing.BadSignature:
+            return False
+        return True
+
+    def __call__(self, request):
+        if not replicas():
+            return self.get_response(request)
+
+        unsafe = request.method not in self.safe_methods
+        reset_pinning(unsafe or self._pinned(request))
+        try:
+            response = self.get_response(request)
+            if unsafe or has_written():
+                response.set_cookie(
+                    settings.REPLICA_PIN_COOKIE, signing.dumps(1, salt=self.salt),
+                    max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+                )
+        finally:
+            reset_pinning()
+        return response
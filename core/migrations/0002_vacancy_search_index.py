@@ -0,0 +1,123 @@
+import re
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# Индекс и стеммер зафиксированы здесь на момент миграции: core/search.py
+# может меняться, а миграция должна строить индекс всегда одинаково.
+FTS_TABLE = 'core_vacancy_fts'
+BATCH_SIZE = 2000
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(skills, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+
+_PERFECTIVE_GROUND = re.compile(r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+_REFLEXIVE = re.compile(r'(с[яь])$')
+_ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$'
+)
+_PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+_VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)'
+    r'|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+_NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+_RV = re.compile(r'^(.*?[аеиоуыэюя])(.*)$')
+_DERIVATIONAL = re.compile(r'.*[^аеиоуыэюя]+[аеиоуыэюя].*ость?$')
+_DER = re.compile(r'ость?$')
+_SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+_I = re.compile(r'и$')
+_SOFT_SIGN = re.compile(r'ь$')
+_NN = re.compile(r'нн$')
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    match = _RV.match(word)
+    if match is None:
+        return word
+    prefix, rv = match.groups()
+
+    temp = _PERFECTIVE_GROUND.sub('', rv, 1)
+    if temp == rv:
+        rv = _REFLEXIVE.sub('', rv, 1)
+        temp = _ADJECTIVE.sub('', rv, 1)
+        if temp != rv:
+            rv = _PARTICIPLE.sub('', temp, 1)
+        else:
+            temp = _VERB.sub('', rv, 1)
+            rv = _NOUN.sub('', rv, 1) if temp == rv else temp
+    else:
+        rv = temp
+
+    rv = _I.sub('', rv, 1)
+    if _DERIVATIONAL.match(rv):
+        rv = _DER.sub('', rv, 1)
+
+    temp = _SOFT_SIGN.sub('', rv, 1)
+    if temp == rv:
+        rv = _SUPERLATIVE.sub('', rv, 1)
+        rv = _NN.sub('н', rv, 1)
+    else:
+        rv = temp
+    return prefix + rv
+
+
+def stemmed_text(text):
+    return ' '.join(stem(token) for token in TOKEN_RE.findall(strip_tags(text or '')))
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE core_vacancy ADD COLUMN search_vector tsvector')
+        schema_editor.execute(f'UPDATE core_vacancy SET search_vector = {VECTOR_SQL}')
+        schema_editor.execute(
+            'CREATE INDEX core_vacancy_search_vector_gin ON core_vacancy USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, skills, description, tokenize='unicode61')"
+        )
+        Vacancy = apps.get_model('core', 'Vacancy')
+        vacancies = Vacancy.objects.using(schema_editor.connection.alias).order_by('pk').values_list(
+            'pk', 'title', 'skills', 'description'
+        )
+        rows = []
+        with schema_editor.connection.cursor() as cursor:
+            for pk, title, skills, description in vacancies.iterator(chunk_size=BATCH_SIZE):
+                rows.append((pk, stemmed_text(title), stemmed_text(skills), stemmed_text(description)))
+                if len(rows) >= BATCH_SIZE:
+                    cursor.executemany(
+                        f'INSERT INTO {FTS_TABLE} (rowid, title, skills, description) VALUES (%s, %s, %s, %s)', rows
+                    )
+                    rows = []
+            if rows:
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, skills, description) VALUES (%s, %s, %s, %s)', rows
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS core_vacancy_search_vector_gin')
+        schema_editor.execute('ALTER TABLE core_vacancy DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.9 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_vacancy_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['-published_at', 'id'], name='vacancy_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['specialty', '-published_at', 'id'], name='vacancy_specialty_pub_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.9 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_vacancy_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True, verbose_name='Код')),
+                ('name', models.CharField(max_length=50, verbose_name='Навык')),
+                ('vacancy_count', models.PositiveIntegerField(default=0, verbose_name='Количество вакансий')),
+            ],
+            options={
+                'ordering': ['-vacancy_count', 'code'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['-vacancy_count', 'code'], name='skill_popularity_idx'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='skill_tags',
+            field=models.ManyToManyField(
+                blank=True,
+                editable=False,
+                related_name='vacancies',
+                to='core.Skill',
+                verbose_name='Теги навыков'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+# Копия разбора из core/skills.py на момент миграции: изменения разбора
+# не должны менять то, что миграция заполняет в новой базе.
+def parse_skills(skills, max_length):
+    result = {}
+    for name in skills.split(','):
+        name = ' '.join(name.split())[:max_length]
+        if name:
+            result.setdefault(' '.join(name.split()).lower(), name)
+    return result
+
+
+def backfill_skills(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Vacancy = apps.get_model('core', 'Vacancy')
+    Skill = apps.get_model('core', 'Skill')
+    VacancySkill = Vacancy.skill_tags.through
+    max_length = Skill._meta.get_field('name').max_length
+
+    parsed = {}
+    names = {}
+    for pk, skills in Vacancy.objects.using(db_alias).values_list('pk', 'skills').iterator():
+        parsed[pk] = parse_skills(skills, max_length)
+        for code, name in parsed[pk].items():
+            names.setdefault(code, name)
+
+    Skill.objects.using(db_alias).bulk_create(
+        [Skill(code=code, name=name) for code, name in names.items()],
+        batch_size=1000, ignore_conflicts=True
+    )
+    skill_ids = dict(Skill.objects.using(db_alias).values_list('code', 'pk'))
+
+    counts = {}
+    links = []
+    for vacancy_id, skills in parsed.items():
+        for code in skills:
+            links.append(VacancySkill(vacancy_id=vacancy_id, skill_id=skill_ids[code]))
+            counts[code] = counts.get(code, 0) + 1
+    VacancySkill.objects.using(db_alias).bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+    skills = list(Skill.objects.using(db_alias).filter(code__in=counts))
+    for skill in skills:
+        skill.vacancy_count = counts[skill.code]
+    Skill.objects.using(db_alias).bulk_update(skills, ['vacancy_count'], batch_size=1000)
+
+
+def clear_skills(apps, schema_editor):
+    apps.get_model('core', 'Skill').objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_skill'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_skills, clear_skills),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.9 on 2026-10-18 07:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(source, fk_name):
+    counts = source.objects.filter(
+        **{fk_name: OuterRef('pk')}
+    ).order_by().values(fk_name).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Company = apps.get_model('core', 'Company')
+    Specialty = apps.get_model('core', 'Specialty')
+    Vacancy = apps.get_model('core', 'Vacancy')
+    Application = apps.get_model('core', 'Application')
+    Company.objects.using(db_alias).update(vacancy_count=count_subquery(Vacancy, 'company'))
+    Specialty.objects.using(db_alias).update(vacancy_count=count_subquery(Vacancy, 'specialty'))
+    Vacancy.objects.using(db_alias).update(application_count=count_subquery(Application, 'vacancy'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_backfill_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='vacancy_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество вакансий'),
+        ),
+        migrations.AddField(
+            model_name='specialty',
+            name='vacancy_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество вакансий'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество откликов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.9 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['location'], name='company_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['salary_min', 'salary_max'], name='vacancy_salary_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['company', '-published_at'], name='vacancy_company_pub_idx'),
+        ),
+    ]
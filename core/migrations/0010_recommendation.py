@@ -0,0 +1,37 @@
+# Generated by Django 3.2.9 on 2026-10-18 08:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+                ('resume', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='recommendations',
+                    to='core.resume', verbose_name='Резюме'
+                )),
+                ('vacancy', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='recommendations',
+                    to='core.vacancy', verbose_name='Вакансия'
+                )),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['resume', '-score'], name='recommendation_resume_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendation',
+            constraint=models.UniqueConstraint(fields=('resume', 'vacancy'), name='recommendation_unique'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.9 on 2026-10-18 08:45
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Создано'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Изменено'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['created_at', 'id'], name='application_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['updated_at', 'id'], name='company_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['updated_at', 'id'], name='resume_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['updated_at', 'id'], name='vacancy_updated_idx'),
+        ),
+    ]
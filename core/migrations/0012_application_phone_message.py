@@ -0,0 +1,24 @@
+# Generated by Django 3.2.9 on 2026-10-18 08:57
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_export_watermarks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='written_phone',
+            field=models.CharField(
+                blank=True,
+                max_length=17,
+                validators=[django.core.validators.RegexValidator(
+                    message="Телефонный номер должен быть в формате: '+999999999'", regex='^\\+?1?\\d{9,15}$')],
+                verbose_name='Телефон '),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.9 on 2026-10-18 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_application_phone_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('resume', 'Резюме'), ('vacancy', 'Вакансия')], max_length=10, verbose_name='Тип')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Первичный ключ')),
+                ('requested_at', models.DateTimeField(verbose_name='Запрошено')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='recommendationtask',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='recommendation_task_unique'),
+        ),
+    ]
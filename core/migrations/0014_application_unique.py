@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def delete_duplicates(apps, schema_editor):
+    """Оставляет у каждой пары (пользователь, вакансия) самый ранний отклик
+    и пересчитывает число откликов затронутых вакансий."""
+
+    using = schema_editor.connection.alias
+    Application = apps.get_model('core', 'Application')
+    Vacancy = apps.get_model('core', 'Vacancy')
+    applications = Application.objects.using(using)
+    duplicates = list(applications.order_by().values('user_id', 'vacancy_id').annotate(
+        first=Min('pk'), total=Count('pk')
+    ).filter(total__gt=1).values_list('user_id', 'vacancy_id', 'first'))
+    for user_id, vacancy_id, first in duplicates:
+        applications.filter(user_id=user_id, vacancy_id=vacancy_id).exclude(pk=first).delete()
+    counts = Application.objects.filter(vacancy_id=OuterRef('pk')).order_by().values('vacancy_id').annotate(
+        total=Count('pk')
+    ).values('total')
+    vacancy_pks = sorted({vacancy_id for _, vacancy_id, _ in duplicates})
+    for start in range(0, len(vacancy_pks), 500):
+        Vacancy.objects.using(using).filter(pk__in=vacancy_pks[start:start + 500]).update(
+            application_count=Coalesce(Subquery(counts), Value(0))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_recommendation_task'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('user', 'vacancy'), name='application_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.9 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_application_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export', models.CharField(max_length=20, verbose_name='Выгрузка')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Первичный ключ')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Удалено')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='deletion',
+            index=models.Index(fields=['deleted_at', 'id'], name='deletion_deleted_idx'),
+        ),
+    ]
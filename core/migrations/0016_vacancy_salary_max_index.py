@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_deletion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['salary_max'], name='vacancy_salary_max_idx'),
+        ),
+    ]
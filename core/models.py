@@ -1,12 +1,55 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, router, transaction
 
 
 User = get_user_model()
 
 
-class Vacancy(models.Model):
+class TrackedRelationsMixin:
+    """Запоминает значения внешних ключей и других полей, загруженные из
+    базы, чтобы сигналы могли пересчитать счетчики при переносе объекта. Сохранение
+    выполняется в транзакции вместе с обработчиками post_save."""
+
+    tracked_relations = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_relations()
+        return instance
+
+    def remember_relations(self):
+        self._loaded_relations = {
+            name: self.__dict__[name] for name in self.tracked_relations if name in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class CounterFieldsMixin:
+    """Счетчики из counter_fields меняются только выражениями F() (см.
+    core/counters.py). Сохранение уже существующего объекта их не записывает,
+    иначе значения, загруженные в начале запроса, затерли бы увеличения,
+    сделанные за это время другими процессами."""
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not args and not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Vacancy(TrackedRelationsMixin, CounterFieldsMixin, models.Model):
     title = models.CharField(
         'Название вакансии',
         max_length=50
@@ -28,21 +71,50 @@ class Vacancy(models.Model):
         max_length=255
     )
     description = models.TextField('Текст')
+    skill_tags = models.ManyToManyField(
+        'Skill',
+        related_name='vacancies',
+        blank=True,
+        editable=False,
+        verbose_name='Теги навыков'
+    )
     salary_min = models.PositiveIntegerField('Зарплата от')
     salary_max = models.PositiveIntegerField('Зарплата до')
     published_at = models.DateTimeField(
         'Опубликованно',
         auto_now_add=True
     )
+    application_count = models.PositiveIntegerField(
+        'Количество откликов',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+
+    tracked_relations = ('company_id', 'specialty_id', 'title')
+    counter_fields = ('application_count',)
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            models.Index(fields=['-published_at', 'id'], name='vacancy_published_idx'),
+            models.Index(fields=['specialty', '-published_at', 'id'], name='vacancy_specialty_pub_idx'),
+            models.Index(fields=['salary_min', 'salary_max'], name='vacancy_salary_idx'),
+            # Фильтр «Зарплата от» сравнивает только salary_max, а по второму
+            # полю составного индекса выше база искать не может.
+            models.Index(fields=['salary_max'], name='vacancy_salary_max_idx'),
+            models.Index(fields=['company', '-published_at'], name='vacancy_company_pub_idx'),
+            models.Index(fields=['updated_at', 'id'], name='vacancy_updated_idx'),
+        ]
 
 
-class Company(models.Model):
+class Company(TrackedRelationsMixin, CounterFieldsMixin, models.Model):
     name = models.CharField(
         'Название компании',
         max_length=50
@@ -65,12 +137,30 @@ class Company(models.Model):
         null=True,
         verbose_name='Владелец'
     )
+    vacancy_count = models.PositiveIntegerField(
+        'Количество вакансий',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+
+    tracked_relations = ('logo',)
+    counter_fields = ('vacancy_count',)
 
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['location'], name='company_location_idx'),
+            models.Index(fields=['updated_at', 'id'], name='company_updated_idx'),
+        ]
+
 
-class Specialty(models.Model):
+class Specialty(TrackedRelationsMixin, CounterFieldsMixin, models.Model):
     code = models.SlugField(
         'Код',
         unique=True,
@@ -84,12 +174,47 @@ class Specialty(models.Model):
         upload_to='specialties_images',
         default='https://place-hold.it/100x60'
     )
+    vacancy_count = models.PositiveIntegerField(
+        'Количество вакансий',
+        default=0,
+        editable=False
+    )
+
+    tracked_relations = ('picture',)
+    counter_fields = ('vacancy_count',)
 
     def __str__(self):
         return self.title
 
 
-class Application(models.Model):
+class Skill(CounterFieldsMixin, models.Model):
+    code = models.CharField(
+        'Код',
+        max_length=50,
+        unique=True,
+    )
+    name = models.CharField(
+        'Навык',
+        max_length=50
+    )
+    vacancy_count = models.PositiveIntegerField(
+        'Количество вакансий',
+        default=0
+    )
+
+    counter_fields = ('vacancy_count',)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['-vacancy_count', 'code']
+        indexes = [
+            models.Index(fields=['-vacancy_count', 'code'], name='skill_popularity_idx'),
+        ]
+
+
+class Application(TrackedRelationsMixin, models.Model):
     written_username = models.CharField('Имя', max_length=50)
     phone_regex = RegexValidator(
         regex=r'^\+?1?\d{9,15}$',
@@ -114,12 +239,26 @@ class Application(models.Model):
         related_name='applications',
         verbose_name='Пользователь'
     )
+    created_at = models.DateTimeField(
+        'Создано',
+        auto_now_add=True
+    )
+
+    tracked_relations = ('vacancy_id',)
 
     def __str__(self):
         return self.written_username
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'vacancy'], name='application_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='application_created_idx'),
+        ]
+
 
-class Resume(models.Model):
+class Resume(TrackedRelationsMixin, models.Model):
     STATUS = [
         ('0', 'Не ищу работу'),
         ('1', 'Рассматриваю предложения'),
@@ -180,9 +319,94 @@ class Resume(models.Model):
         max_length=17,
         blank=True
     )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+
+    tracked_relations = ('photo',)
 
     def __str__(self):
         return f'{self.name} {self.surname}'
 
     class Meta:
         ordering = ['-pk']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='resume_updated_idx'),
+        ]
+
+
+class Recommendation(models.Model):
+    """Вакансия, рекомендованная владельцу резюме. Таблица заполняется
+    из core/recommendations.py и хранит не больше RECOMMENDATION_LIMIT
+    лучших вакансий на резюме."""
+
+    resume = models.ForeignKey(
+        Resume,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Резюме'
+    )
+    vacancy = models.ForeignKey(
+        Vacancy,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Вакансия'
+    )
+    score = models.FloatField('Оценка')
+
+    def __str__(self):
+        return f'{self.resume} — {self.vacancy}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resume', 'vacancy'], name='recommendation_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['resume', '-score'], name='recommendation_resume_idx'),
+        ]
+
+
+class RecommendationTask(models.Model):
+    """Резюме или вакансия, рекомендации для которых нужно пересчитать.
+    Записывается сигналами в транзакции сохранения и разбирается командой
+    process_recommendations."""
+
+    KIND = [
+        ('resume', 'Резюме'),
+        ('vacancy', 'Вакансия')
+    ]
+
+    kind = models.CharField(
+        'Тип',
+        choices=KIND,
+        max_length=10
+    )
+    object_id = models.PositiveBigIntegerField('Первичный ключ')
+    requested_at = models.DateTimeField('Запрошено')
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.object_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='recommendation_task_unique'),
+        ]
+
+
+class Deletion(models.Model):
+    """Удаленная строка одной из выгрузок export_data. Записывается сигналом
+    post_delete, чтобы инкрементальная выгрузка передала удаление в
+    хранилище данных."""
+
+    export = models.CharField('Выгрузка', max_length=20)
+    object_id = models.PositiveBigIntegerField('Первичный ключ')
+    deleted_at = models.DateTimeField('Удалено', auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.export} {self.object_id}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='deletion_deleted_idx'),
+        ]
@@ -0,0 +1,80 @@
+"""Кэш готовых страниц для анонимных посетителей.
+
+Анонимные посетители получают одинаковый HTML, поэтому ответ целиком
+сохраняется в кэше под ключом из пути и нормализованной строки запроса.
+Ключ включает версию пространства имен, которое сбрасывается сигналами
+при изменении вакансий, компаний и специализаций, поэтому удалять
+страницы по шаблону не нужно.
+
+Кэш не используется для авторизованных пользователей и при непоказанных
+сообщениях. Ответы, которые ставят куки или используют CSRF-токен, не
+сохраняются: токен в общем HTML не совпал бы с кукой другого посетителя.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from core.cache import namespace_version
+from core.conditional import has_pending_messages
+
+CACHED_HEADERS = ('Content-Type', 'Content-Language')
+
+
+def is_cacheable_request(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.PAGE_CACHE_SECONDS > 0
+        and not request.user.is_authenticated
+        and not has_pending_messages(request)
+    )
+
+
+def normalized_query(query_dict):
+    """Строка запроса с отсортированными параметрами без пустых значений."""
+
+    return urlencode(sorted(
+        (key, value) for key, values in query_dict.lists() for value in values if value
+    ))
+
+
+def page_key(request, namespace):
+    # Путь тоже хэшируется: memcached не принимает ключи длиннее 250 байт,
+    # с пробелами и не-ASCII символами.
+    url = hashlib.md5(f'{request.path}?{normalized_query(request.GET)}'.encode()).hexdigest()
+    return f'page:{namespace}:{namespace_version(namespace)}:{url}'
+
+
+def is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def cached_page(key):
+    """Ответ из кэша или None."""
+
+    page = cache.get(key)
+    if page is None:
+        return None
+    content, headers = page
+    response = HttpResponse(content)
+    for name, value in headers:
+        response[name] = value
+    return response
+
+
+def store_page(key, request, response):
+    """Сохраняет ответ под ключом, полученным до выполнения представления:
+    если версия пространства сменилась во время отрисовки, страница
+    останется под старой версией и не будет показана."""
+
+    if is_cacheable_response(request, response):
+        headers = [(name, response[name]) for name in CACHED_HEADERS if response.has_header(name)]
+        cache.set(key, (response.content, headers), settings.PAGE_CACHE_SECONDS)
+    return response
@@ -0,0 +1,209 @@
+"""Постраничный вывод по ключу (keyset pagination) и кэшируемые счетчики.
+
+Вместо OFFSET страница выбирается условием на значения полей сортировки
+последней показанной записи, поэтому стоимость любой страницы зависит
+только от ее размера. Общее количество записей берется из кэша или,
+для больших таблиц PostgreSQL, из статистики планировщика.
+"""
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+
+COUNT_CACHE_TIMEOUT = 60
+ESTIMATE_THRESHOLD = 10000
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _serialize(value):
+    # float записывается в JSON через repr и читается обратно без потерь,
+    # поэтому ранг поиска в курсоре совпадает с вычисленным базой.
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+class KeysetPage:
+    """Страница выборки. Повторяет интерфейс django.core.paginator.Page,
+    необходимый шаблонам."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous, params):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def _querystring(self, cursor):
+        params = self.params.copy()
+        params[self.paginator.cursor_query_param] = cursor
+        return params.urlencode()
+
+    @property
+    def next_querystring(self):
+        if self._has_next:
+            return self._querystring(self.paginator.encode_cursor(self.object_list[-1], 'next'))
+        return ''
+
+    @property
+    def previous_querystring(self):
+        if self._has_previous:
+            return self._querystring(self.paginator.encode_cursor(self.object_list[0], 'previous'))
+        return ''
+
+
+class KeysetPaginator:
+    """Разбивает queryset на страницы по значениям полей сортировки.
+    Последнее поле в ordering должно быть уникальным (обычно id или pk)."""
+
+    cursor_query_param = 'cursor'
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [_serialize(getattr(obj, name)) for name, _ in self.ordering]
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _to_python(self, name, value):
+        opts = self.queryset.model._meta
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction, values = payload['d'], payload['v']
+            if direction not in ('next', 'previous') or len(values) != len(self.ordering):
+                raise InvalidCursor(cursor)
+            return direction, [
+                self._to_python(name, value) for (name, _), value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, KeyError, binascii.Error, ValidationError):
+            raise InvalidCursor(cursor)
+
+    def _keyset_filter(self, values, reverse):
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _order_by(self, reverse):
+        return [
+            f'-{name}' if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+
+    def get_page(self, params):
+        cursor = params.get(self.cursor_query_param)
+        direction, values = self.decode_cursor(cursor) if cursor else ('next', None)
+        reverse = direction == 'previous'
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            return KeysetPage(rows, self, has_next=True, has_previous=has_more, params=params)
+        return KeysetPage(rows, self, has_next=has_more, has_previous=values is not None, params=params)
+
+
+def estimated_count(queryset):
+    """Возвращает оценку числа строк таблицы из pg_class или None,
+    если оценка недоступна либо таблица слишком мала для нее."""
+
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < ESTIMATE_THRESHOLD:
+        return None
+    return row[0]
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """Количество записей в queryset. Для больших таблиц без фильтров
+    используется оценка планировщика, в остальных случаях COUNT(*)
+    кэшируется по тексту запроса."""
+
+    estimate = estimated_count(queryset)
+    if estimate is not None:
+        return estimate
+    queryset = queryset.order_by()
+    sql, params = queryset.query.sql_with_params()
+    key = 'count:' + hashlib.md5(f'{queryset.db}:{sql}:{params}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class KeysetPaginationMixin:
+    """Миксин для ListView: постраничный вывод по ключу и кэшируемый
+    счетчик total_count в контексте."""
+
+    paginate_by = 20
+    keyset_ordering = ('-pk',)
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_total_count(self):
+        return cached_count(self.object_list)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.get_keyset_ordering())
+        try:
+            page = paginator.get_page(self.request.GET)
+        except InvalidCursor:
+            raise Http404('Страница не найдена')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['total_count'] = self.get_total_count()
+        return context
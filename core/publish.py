@@ -0,0 +1,254 @@
+"""Готовые файлы для nginx: карта сайта и снимки публичных страниц.
+
+Карта сайта — индекс sitemap.xml и файлы-части не больше SITEMAP_SHARD_SIZE
+адресов в SITEMAP_ROOT. В нее входят только страницы, открытые без входа:
+главная, список вакансий, вакансии по специализациям и навыкам. Страницы
+вакансий, компаний и резюме требуют входа и в карту не попадают. Дата
+изменения страницы — время публикации самой свежей вакансии на ней.
+Карта пересобирается, только если сменилось время последней публикации
+или число вакансий, специализаций и навыков, а на диск пишутся только
+части, содержимое которых изменилось.
+
+Снимки — HTML списка вакансий и страниц специализаций в том виде, в каком
+их получает анонимный посетитель, в SNAPSHOT_ROOT. nginx отдает их сам,
+если у запроса нет строки параметров и куки сессии. Для каждой страницы
+хранится отпечаток данных, от которых она зависит (вакансии, компании,
+популярные навыки и текущий час, как в listing_etag), и заново
+отрисовываются только страницы с изменившимся отпечатком. Страницы
+отрисовываются запросами RequestFactory через обработчик с тем же набором
+middleware, что и у сайта: без сессий, авторизации и сообщений шаблоны не
+отрисовать, а ответ должен совпадать с тем, что получил бы посетитель.
+
+Изменение вакансии, компании или специализации сразу удаляет затронутые
+снимки (discard_snapshots): до следующего build_snapshots nginx отдает эти
+страницы из Django, а не устаревший файл.
+"""
+import hashlib
+import json
+import os
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.db.models import Count, Max
+from django.core.handlers.base import BaseHandler
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Skill, Specialty, Vacancy
+from core.pagecache import is_cacheable_response
+
+SITEMAP_SHARD_SIZE = 50000
+SITEMAP_INDEX = 'sitemap.xml'
+STATE_FILE = 'state.json'
+SKILL_FACETS_LIMIT = 20
+
+
+def write_if_changed(path, content):
+    """Атомарно записывает байты content, если файл отличается. Возвращает
+    True, если файл записан. Неизменные файлы сохраняют время изменения,
+    по которому nginx отдает Last-Modified и ETag."""
+
+    try:
+        with open(path, 'rb') as file:
+            if file.read() == content:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.part', 'wb') as file:
+        file.write(content)
+    os.replace(path + '.part', path)
+    return True
+
+
+def read_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE), encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def write_state(root, state):
+    content = json.dumps(state, ensure_ascii=False, indent=2, default=str).encode()
+    write_if_changed(os.path.join(root, STATE_FILE), content)
+
+
+def lastmod(value):
+    return value.isoformat() if value else None
+
+
+def sitemap_sections():
+    """Разделы карты сайта: {имя: [(путь, дата изменения)]}."""
+
+    last_published = Vacancy.objects.aggregate(last=Max('published_at'))['last']
+    specialty_dates = dict(
+        Vacancy.objects.order_by().values_list('specialty_id').annotate(last=Max('published_at'))
+    )
+    through = Vacancy.skill_tags.through
+    skill_dates = dict(
+        through.objects.order_by().values_list('skill_id').annotate(last=Max('vacancy__published_at'))
+    )
+    return {
+        'pages': [(reverse('main'), last_published), (reverse('vacancies'), last_published)],
+        'specialties': [
+            (reverse('vacancies_by_specialties', kwargs={'code': code}), specialty_dates.get(pk))
+            for pk, code in Specialty.objects.order_by('pk').values_list('pk', 'code')
+        ],
+        'skills': [
+            (reverse('vacancies_by_skill', kwargs={'code': code}), skill_dates.get(pk))
+            for pk, code in Skill.objects.filter(vacancy_count__gt=0).order_by('pk').values_list('pk', 'code')
+        ],
+    }
+
+
+def sitemap_shard(base_url, urls):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for path, modified in urls:
+        entry = f'<url><loc>{escape(base_url + path)}</loc>'
+        if modified:
+            entry += f'<lastmod>{lastmod(modified)}</lastmod>'
+        lines.append(entry + '</url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines).encode()
+
+
+def sitemap_index(base_url, shards):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for name, modified in shards:
+        entry = f'<sitemap><loc>{escape(f"{base_url}/{name}")}</loc>'
+        if modified:
+            entry += f'<lastmod>{lastmod(modified)}</lastmod>'
+        lines.append(entry + '</sitemap>')
+    lines.append('</sitemapindex>')
+    return '\n'.join(lines).encode()
+
+
+def sitemap_watermark():
+    """Отпечаток данных, при неизменности которого карту не нужно собирать."""
+
+    vacancies = Vacancy.objects.aggregate(last=Max('published_at'), count=Count('pk'))
+    return [
+        lastmod(vacancies['last']), vacancies['count'],
+        Specialty.objects.count(), Skill.objects.filter(vacancy_count__gt=0).count(),
+    ]
+
+
+def build_sitemaps(root, base_url, force=False):
+    """Обновляет карту сайта в каталоге root. Возвращает (записано частей,
+    удалено частей) или None, если данные не менялись."""
+
+    base_url = base_url.rstrip('/')
+    state = read_state(root)
+    watermark = [base_url, *sitemap_watermark()]
+    if not force and state.get('watermark') == watermark:
+        return None
+
+    shards, written = [], 0
+    for section, urls in sitemap_sections().items():
+        iterator = iter(urls)
+        for number, chunk in enumerate(iter(lambda: list(islice(iterator, SITEMAP_SHARD_SIZE)), []), start=1):
+            name = f'sitemap-{section}-{number}.xml'
+            written += write_if_changed(os.path.join(root, name), sitemap_shard(base_url, chunk))
+            shards.append((name, max((modified for _, modified in chunk if modified), default=None)))
+
+    names = {name for name, _ in shards}
+    removed = [name for name in state.get('shards', []) if name not in names]
+    for name in removed:
+        os.remove(os.path.join(root, name))
+    write_if_changed(os.path.join(root, SITEMAP_INDEX), sitemap_index(base_url, shards))
+    write_state(root, {'watermark': watermark, 'shards': sorted(names)})
+    return written, len(removed)
+
+
+def snapshot_stamps():
+    """Отпечатки данных снимков: {путь: отпечаток}."""
+
+    hour = timezone.now().strftime('%Y%m%d%H')
+    facets = list(Skill.objects.filter(vacancy_count__gt=0).values_list('pk', 'vacancy_count')[:SKILL_FACETS_LIMIT])
+    specialties = list(Specialty.objects.order_by('pk').values_list('pk', 'code', 'title'))
+    changes = {
+        specialty_pk: [count, lastmod(updated), lastmod(company_updated)]
+        for specialty_pk, count, updated, company_updated in Vacancy.objects.order_by().values_list(
+            'specialty_id'
+        ).annotate(Count('pk'), Max('updated_at'), Max('company__updated_at'))
+    }
+    common = [hour, facets]
+    stamps = {reverse('vacancies'): [*common, specialties, sorted(changes.items())]}
+    for pk, code, title in specialties:
+        stamps[reverse('vacancies_by_specialties', kwargs={'code': code})] = [*common, title, changes.get(pk)]
+    return {path: hashlib.md5(json.dumps(stamp, default=str).encode()).hexdigest() for path, stamp in stamps.items()}
+
+
+def snapshot_file(root, path):
+    """Файл снимка для пути: /vacancies/ — vacancies/index.html,
+    /vacancies/cat/backend — vacancies/cat/backend.html."""
+
+    name = path.lstrip('/') + ('index.html' if path.endswith('/') else '.html')
+    return os.path.join(root, *name.split('/'))
+
+
+def snapshot_paths(specialty_pks, using='default'):
+    """Пути снимков, которые зависят от вакансий специализаций specialty_pks."""
+
+    codes = Specialty.objects.using(using).filter(pk__in=specialty_pks).values_list('code', flat=True)
+    return [reverse('vacancies'), *(reverse('vacancies_by_specialties', kwargs={'code': code}) for code in codes)]
+
+
+def discard_snapshots(root, paths=None):
+    """Удаляет снимки путей paths, а без paths — все снимки из последней сборки."""
+
+    if paths is None:
+        paths = read_state(root).get('pages', {})
+    for path in paths:
+        try:
+            os.remove(snapshot_file(root, path))
+        except FileNotFoundError:
+            pass
+
+
+def render_pages(host):
+    """Функция, отрисовывающая путь анонимным GET-запросом. Возвращает
+    (запрос, ответ)."""
+
+    factory = RequestFactory(HTTP_HOST=host)
+    handler = BaseHandler()
+    handler.load_middleware()
+
+    def render(path):
+        request = factory.get(path)
+        return request, handler.get_response(request)
+    return render
+
+
+def build_snapshots(root, host, force=False, on_skip=None):
+    """Отрисовывает снимки страниц с изменившимися данными в каталог root.
+    Возвращает (отрисовано, записано, удалено). Страницы, которые нельзя
+    отдавать всем посетителям (не 200, ставят куки), пропускаются с вызовом
+    on_skip(путь, ответ)."""
+
+    state = read_state(root)
+    previous = state.get('pages', {})
+    stamps = snapshot_stamps()
+    render = render_pages(host)
+    rendered = written = 0
+    pages = {}
+    for path, stamp in stamps.items():
+        if not force and previous.get(path) == stamp and os.path.exists(snapshot_file(root, path)):
+            pages[path] = stamp
+            continue
+        request, response = render(path)
+        rendered += 1
+        if not is_cacheable_response(request, response):
+            if on_skip is not None:
+                on_skip(path, response)
+            continue
+        written += write_if_changed(snapshot_file(root, path), response.content)
+        pages[path] = stamp
+
+    removed = [path for path in previous if path not in pages]
+    for path in removed:
+        if os.path.exists(snapshot_file(root, path)):
+            os.remove(snapshot_file(root, path))
+    write_state(root, {'pages': pages})
+    return rendered, written, len(removed)
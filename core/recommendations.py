@@ -0,0 +1,190 @@
+"""Рекомендации вакансий владельцам резюме.
+
+Для каждого резюме в таблице Recommendation хранятся RECOMMENDATION_LIMIT
+лучших вакансий с оценкой из core/matching.py, поэтому страница резюме
+читает рекомендации одним запросом по индексу (resume, -score).
+
+При сохранении вакансии пересчитываются только затронутые резюме: той же
+специализации или с общими навыками. Их находят по спискам матрицы
+признаков резюме, а вакансия попадает в рекомендации резюме, если она
+лучше худшей из сохраненных. При сохранении резюме его рекомендации
+строятся заново по вакансиям той же специализации и вакансиям с его
+навыками. У резюме, владелец которого не ищет работу, рекомендаций нет.
+
+Пересчет не выполняется в запросе: сигналы записывают RecommendationTask
+в транзакции сохранения, а задачи разбирает команда process_recommendations.
+Если объект сохранили еще раз, пока задача в работе, время задачи
+обновляется, и она остается в очереди.
+"""
+import logging
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from core.matching import index, load_features, match_scores, target_grade
+from core.models import Recommendation, RecommendationTask, Vacancy
+
+RECOMMENDATION_LIMIT = 10
+MIN_SCORE = 0.4
+CANDIDATE_LIMIT = 2000
+BATCH_SIZE = 500
+TASK_BATCH_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def vacancy_skill_pairs(pks, using='default'):
+    through = Vacancy.skill_tags.through
+    return list(through.objects.using(using).filter(vacancy_id__in=pks).values_list('vacancy_id', 'skill_id'))
+
+
+def candidate_vacancies(specialty_id, skill_pks, using='default'):
+    """Первичные ключи свежих вакансий той же специализации и с общими навыками."""
+
+    pks = set(Vacancy.objects.using(using).filter(specialty_id=specialty_id).order_by(
+        '-published_at', '-id'
+    ).values_list('pk', flat=True)[:CANDIDATE_LIMIT])
+    if skill_pks:
+        through = Vacancy.skill_tags.through
+        pks.update(through.objects.using(using).filter(skill_id__in=skill_pks).order_by(
+            '-vacancy_id'
+        ).values_list('vacancy_id', flat=True)[:CANDIDATE_LIMIT])
+    return pks
+
+
+def score_vacancies(feature, pks, using='default'):
+    """Оценки вакансий pks для признаков резюме: [(pk вакансии, оценка)]."""
+
+    resume_pk, specialty_id, grade, salary, active, skill_pks = feature
+    if not active:
+        return []
+    rows = list(Vacancy.objects.using(using).filter(pk__in=pks).values_list(
+        'pk', 'specialty_id', 'title', 'salary_min', 'salary_max'
+    ))
+    if not rows:
+        return []
+    positions = {row[0]: number for number, row in enumerate(rows)}
+    skill_count = np.zeros(len(rows), dtype=np.int64)
+    overlap = np.zeros(len(rows), dtype=np.int64)
+    skill_pks = set(skill_pks)
+    for vacancy_pk, skill_pk in vacancy_skill_pairs(list(positions), using):
+        skill_count[positions[vacancy_pk]] += 1
+        overlap[positions[vacancy_pk]] += skill_pk in skill_pks
+
+    vacancy_pks, specialties, titles, salaries_min, salaries_max = zip(*rows)
+    score = match_scores(
+        np.array(specialties) == specialty_id, overlap, skill_count, salary,
+        np.array(salaries_min, dtype=np.float64), np.array(salaries_max, dtype=np.float64),
+        grade, np.array([target_grade(title) for title in titles]),
+    )
+    return [(pk, float(value)) for pk, value in zip(vacancy_pks, score) if value >= MIN_SCORE]
+
+
+def recommend_for_resume(resume_pk, using='default'):
+    """Строит рекомендации резюме заново. Возвращает их число."""
+
+    features = load_features([resume_pk], using)
+    if not features:
+        return 0
+    feature = features[0]
+    scored = score_vacancies(feature, candidate_vacancies(feature[1], feature[5], using), using)
+    scored.sort(key=lambda item: (-item[1], -item[0]))
+    with transaction.atomic(using=using):
+        Recommendation.objects.using(using).filter(resume_id=resume_pk).delete()
+        Recommendation.objects.using(using).bulk_create([
+            Recommendation(resume_id=resume_pk, vacancy_id=pk, score=score)
+            for pk, score in scored[:RECOMMENDATION_LIMIT]
+        ], ignore_conflicts=True)
+    return min(len(scored), RECOMMENDATION_LIMIT)
+
+
+def recommend_vacancy(vacancy_pk, using='default'):
+    """Добавляет сохраненную вакансию в рекомендации затронутых резюме,
+    вытесняя худшие, и убирает ее у остальных. Возвращает число резюме,
+    получивших вакансию."""
+
+    vacancy = Vacancy.objects.using(using).filter(pk=vacancy_pk).values_list(
+        'specialty_id', 'title', 'salary_min', 'salary_max'
+    ).first()
+    if vacancy is None:
+        return 0
+    specialty_id, title, salary_min, salary_max = vacancy
+    skill_pks = {skill_pk for _, skill_pk in vacancy_skill_pairs([vacancy_pk], using)}
+
+    matrix = index.get_matrix()
+    rows = matrix.affected_rows(specialty_id, skill_pks)
+    score, _ = matrix.scores(specialty_id, target_grade(title), salary_min, salary_max, skill_pks)
+    rows = rows[score[rows] >= MIN_SCORE]
+    candidates = dict(zip(matrix.pks[rows].tolist(), score[rows].tolist()))
+
+    added, evicted = [], []
+    resume_pks = list(candidates)
+    for start in range(0, len(resume_pks), BATCH_SIZE):
+        batch = resume_pks[start:start + BATCH_SIZE]
+        current = defaultdict(list)
+        for pk, resume_pk, current_score in Recommendation.objects.using(using).filter(
+            resume_id__in=batch
+        ).exclude(vacancy_id=vacancy_pk).values_list('pk', 'resume_id', 'score'):
+            current[resume_pk].append((current_score, pk))
+        for resume_pk in batch:
+            recommendations = current[resume_pk]
+            if len(recommendations) >= RECOMMENDATION_LIMIT:
+                worst_score, worst_pk = min(recommendations)
+                if candidates[resume_pk] <= worst_score:
+                    continue
+                evicted.append(worst_pk)
+            added.append(Recommendation(resume_id=resume_pk, vacancy_id=vacancy_pk, score=candidates[resume_pk]))
+
+    with transaction.atomic(using=using):
+        Recommendation.objects.using(using).filter(vacancy_id=vacancy_pk).delete()
+        for start in range(0, len(evicted), BATCH_SIZE):
+            Recommendation.objects.using(using).filter(pk__in=evicted[start:start + BATCH_SIZE]).delete()
+        Recommendation.objects.using(using).bulk_create(added, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(added)
+
+
+TASK_HANDLERS = {
+    'resume': recommend_for_resume,
+    'vacancy': recommend_vacancy,
+}
+
+
+def request_recommendations(kind, pk, using='default'):
+    """Ставит пересчет рекомендаций резюме или вакансии в очередь."""
+
+    now = timezone.now()
+    tasks = RecommendationTask.objects.using(using)
+    if not tasks.filter(kind=kind, object_id=pk).update(requested_at=now):
+        tasks.bulk_create([RecommendationTask(kind=kind, object_id=pk, requested_at=now)], ignore_conflicts=True)
+
+
+def request_many_recommendations(kind, pks, using='default'):
+    """Ставит в очередь пересчет рекомендаций объектов pks, вставленных
+    через bulk_create в обход сигналов."""
+
+    pks = list(pks)
+    now = timezone.now()
+    tasks = RecommendationTask.objects.using(using)
+    for start in range(0, len(pks), BATCH_SIZE):
+        chunk = pks[start:start + BATCH_SIZE]
+        tasks.filter(kind=kind, object_id__in=chunk).update(requested_at=now)
+        tasks.bulk_create(
+            [RecommendationTask(kind=kind, object_id=pk, requested_at=now) for pk in chunk], ignore_conflicts=True
+        )
+
+
+def process_tasks(using='default', batch_size=TASK_BATCH_SIZE):
+    """Выполняет задачи пересчета в порядке поступления. Возвращает число
+    выполненных задач. Задача, упавшая с ошибкой, пишется в лог и снимается:
+    ее повторит следующее сохранение объекта или rebuild_recommendations."""
+
+    tasks = list(RecommendationTask.objects.using(using).order_by('requested_at', 'pk')[:batch_size])
+    for task in tasks:
+        try:
+            TASK_HANDLERS[task.kind](task.object_id, using)
+        except Exception:
+            logger.exception('Рекомендации для %s не пересчитаны', task)
+        RecommendationTask.objects.using(using).filter(pk=task.pk, requested_at=task.requested_at).delete()
+    return len(tasks)
@@ -0,0 +1,88 @@
+"""Распределение запросов между основной базой и репликами.
+
+Запись всегда идет в default, чтение — в случайную реплику из
+settings.DATABASE_REPLICAS. Чтение возвращается на основную базу, пока
+открыта транзакция, после любой записи в текущем запросе и в течение
+REPLICA_PIN_SECONDS после запроса с записью: это окно задает кука,
+которую ставит ReplicaPinningMiddleware. Так пользователь сразу видит
+свои изменения, даже если реплика отстает. Кэш (get_or_build и страницы
+для анонимных посетителей) всегда заполняется с основной базы.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+def pin_primary():
+    """Направляет чтение текущего потока на основную базу."""
+
+    _state.pinned = True
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтение на основную базу внутри блока. Нужен при заполнении
+    кэша после сброса: иначе данные отстающей реплики попадут в кэш на все
+    время его жизни."""
+
+    pinned = is_pinned()
+    pin_primary()
+    try:
+        yield
+    finally:
+        _state.pinned = pinned or has_written()
+
+
+def reset_pinning(pinned=False):
+    """Сбрасывает состояние потока в начале запроса."""
+
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    """Была ли запись в основную базу после reset_pinning."""
+
+    return getattr(_state, 'wrote', False)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class PrimaryReplicaRouter:
+    """Маршрутизатор: запись в default, чтение из реплик."""
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Связанные объекты читаются из той же базы, что и исходный.
+            return instance._state.db
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему репликацией с основной базы.
+        return db not in replicas()
@@ -0,0 +1,233 @@
+"""Полнотекстовый поиск по вакансиям.
+
+В PostgreSQL вакансии индексируются в колонку tsvector с GIN-индексом
+и словарем russian. В SQLite используется виртуальная таблица FTS5,
+в которую текст попадает уже прошедшим через стеммер Портера для русского
+языка. Индекс обновляется сигналами из core/signals.py, а полностью
+перестраивается командой rebuild_search_index.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+from core.models import Vacancy
+
+SEARCH_WEIGHTS = {'title': 10.0, 'skills': 5.0, 'description': 1.0}
+FTS_TABLE = 'core_vacancy_fts'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_PERFECTIVE_GROUND = re.compile(r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+_REFLEXIVE = re.compile(r'(с[яь])$')
+_ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$'
+)
+_PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+_VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)'
+    r'|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+_NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+_RV = re.compile(r'^(.*?[аеиоуыэюя])(.*)$')
+_DERIVATIONAL = re.compile(r'.*[^аеиоуыэюя]+[аеиоуыэюя].*ость?$')
+_DER = re.compile(r'ость?$')
+_SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+_I = re.compile(r'и$')
+_SOFT_SIGN = re.compile(r'ь$')
+_NN = re.compile(r'нн$')
+
+
+def stem(word):
+    """Возвращает основу русского слова по алгоритму Портера.
+    Слова без русских гласных (латиница, числа) возвращаются в нижнем регистре."""
+
+    word = word.lower().replace('ё', 'е')
+    match = _RV.match(word)
+    if match is None:
+        return word
+    prefix, rv = match.groups()
+
+    temp = _PERFECTIVE_GROUND.sub('', rv, 1)
+    if temp == rv:
+        rv = _REFLEXIVE.sub('', rv, 1)
+        temp = _ADJECTIVE.sub('', rv, 1)
+        if temp != rv:
+            rv = _PARTICIPLE.sub('', temp, 1)
+        else:
+            temp = _VERB.sub('', rv, 1)
+            rv = _NOUN.sub('', rv, 1) if temp == rv else temp
+    else:
+        rv = temp
+
+    rv = _I.sub('', rv, 1)
+    if _DERIVATIONAL.match(rv):
+        rv = _DER.sub('', rv, 1)
+
+    temp = _SOFT_SIGN.sub('', rv, 1)
+    if temp == rv:
+        rv = _SUPERLATIVE.sub('', rv, 1)
+        rv = _NN.sub('н', rv, 1)
+    else:
+        rv = temp
+    return prefix + rv
+
+
+def tokenize(text):
+    """Разбивает текст на основы слов, предварительно удаляя html-теги."""
+
+    return [stem(token) for token in TOKEN_RE.findall(strip_tags(text or ''))]
+
+
+@lru_cache(maxsize=4096)
+def stemmed_text(text):
+    """Текст для индекса FTS5. Кэшируется, так как при массовой загрузке
+    описания вакансий часто повторяются."""
+
+    return ' '.join(tokenize(text))
+
+
+class BaseSearchBackend:
+    """Общий интерфейс поисковых движков."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, vacancies):
+        """Добавляет или обновляет вакансии в индексе."""
+
+    def remove(self, pks):
+        """Удаляет вакансии из индекса."""
+
+    def search(self, queryset, query):
+        """Фильтрует queryset по запросу и аннотирует его полем search_rank."""
+        raise NotImplementedError
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Поиск без индекса для баз данных, не поддерживающих полнотекстовый поиск."""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(skills__icontains=query) | Q(description__icontains=query)
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Поиск по колонке core_vacancy.search_vector с GIN-индексом."""
+
+    vector_sql = (
+        "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('russian', coalesce(skills, '')), 'B') || "
+        "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+    )
+
+    def index(self, vacancies):
+        pks = [vacancy.pk for vacancy in vacancies]
+        if not pks:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Vacancy._meta.db_table} SET search_vector = {self.vector_sql} WHERE id = ANY(%s)',
+                [pks]
+            )
+
+    def search(self, queryset, query):
+        table = Vacancy._meta.db_table
+        # ts_rank возвращает real: приведение к double precision нужно, чтобы
+        # значение из курсора страницы сравнивалось с рангом точно.
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f"ts_rank({table}.search_vector, plainto_tsquery('russian', %s))::float8", (query,)
+            )
+        ).extra(
+            where=[f"{table}.search_vector @@ plainto_tsquery('russian', %s)"],
+            params=[query],
+        ).order_by('-search_rank', '-published_at')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Поиск по виртуальной таблице FTS5 со стеммингом на стороне python."""
+
+    def index(self, vacancies):
+        rows = [
+            (
+                vacancy.pk,
+                stemmed_text(vacancy.title),
+                stemmed_text(vacancy.skills),
+                stemmed_text(vacancy.description),
+            )
+            for vacancy in vacancies
+        ]
+        if not rows:
+            return
+        self.remove([row[0] for row in rows])
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, skills, description) VALUES (%s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(pks))})', pks
+            )
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS.values())
+        table = Vacancy._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+                (match,)
+            )
+        ).order_by('-search_rank', '-published_at')
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_backend(using='default'):
+    connection = connections[using]
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)(connection)
+
+
+def search_vacancies(queryset, query):
+    """Возвращает вакансии, подходящие под запрос, отсортированные по релевантности."""
+
+    return get_backend(queryset.db).search(queryset, query.strip())
+
+
+def rebuild_index(using='default', batch_size=2000):
+    """Переиндексирует все вакансии пачками. Возвращает количество вакансий."""
+
+    backend = get_backend(using)
+    queryset = Vacancy.objects.using(using).only('title', 'skills', 'description').order_by('pk')
+    total = 0
+    batch = []
+    for vacancy in queryset.iterator(chunk_size=batch_size):
+        batch.append(vacancy)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            total += len(batch)
+            batch = []
+    backend.index(batch)
+    return total + len(batch)
@@ -0,0 +1,259 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.autocomplete import refresh_terms
+from core.cache import FACETS_NAMESPACE, HOMEPAGE_NAMESPACE, bump_namespace
+from core.conditional import LISTINGS_NAMESPACE
+from core.counters import counted_object_deleted, counted_object_saved
+from core.exports import DELETED_EXPORTS
+from core.fragments import CARDS_NAMESPACE
+from core.matching import refresh_resumes
+from core.models import Application, Company, Deletion, Resume, Skill, Specialty, Vacancy
+from core.publish import discard_snapshots, snapshot_paths
+from core.recommendations import request_recommendations
+from core.search import get_backend
+from core.skills import adjust_skill_counts, sync_vacancy_skills
+from core.thumbnails import delete_variants, generate_variants, image_fields
+
+
+@receiver(post_save, sender=Vacancy)
+def index_vacancy(sender, instance, using, **kwargs):
+    """Обновляет вакансию в поисковом индексе после сохранения."""
+
+    get_backend(using).index([instance])
+
+
+@receiver(post_delete, sender=Vacancy)
+def unindex_vacancy(sender, instance, using, **kwargs):
+    """Удаляет вакансию из поискового индекса."""
+
+    get_backend(using).remove([instance.pk])
+
+
+@receiver(post_save, sender=Vacancy)
+def update_vacancy_skills(sender, instance, using, raw=False, **kwargs):
+    """Разбирает строку навыков вакансии в теги."""
+
+    if not raw:
+        sync_vacancy_skills(instance, using)
+
+
+@receiver(m2m_changed, sender=Vacancy.skill_tags.through)
+def count_skill_tags(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Поддерживает Skill.vacancy_count при изменении тегов вакансий."""
+
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_vacancy_count = instance.vacancies.count()
+        else:
+            instance._cleared_skill_pks = set(instance.skill_tags.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        if reverse:
+            adjust_skill_counts([instance.pk], -instance._cleared_vacancy_count, using)
+        else:
+            adjust_skill_counts(instance._cleared_skill_pks, -1, using)
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        adjust_skill_counts([instance.pk], delta * len(pk_set), using)
+    else:
+        adjust_skill_counts(pk_set, delta, using)
+
+
+@receiver(pre_delete, sender=Vacancy)
+def release_vacancy_skills(sender, instance, using, **kwargs):
+    """Уменьшает счетчики навыков удаляемой вакансии."""
+
+    instance._released_skill_pks = list(instance.skill_tags.values_list('pk', flat=True))
+    adjust_skill_counts(instance._released_skill_pks, -1, using)
+
+
+@receiver(post_save, sender=Vacancy)
+@receiver(post_save, sender=Application)
+def increment_counters(sender, instance, created, using, raw=False, **kwargs):
+    """Обновляет счетчики вакансий и откликов при создании или переносе."""
+
+    if not raw:
+        counted_object_saved(instance, created, using)
+
+
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_delete, sender=Application)
+def decrement_counters(sender, instance, using, **kwargs):
+    """Уменьшает счетчики вакансий и откликов при удалении."""
+
+    counted_object_deleted(instance, using)
+
+
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Resume)
+@receiver(post_delete, sender=Application)
+def record_deletion(sender, instance, using, **kwargs):
+    """Записывает удаление для инкрементальной выгрузки export_data."""
+
+    Deletion.objects.using(using).create(export=DELETED_EXPORTS[sender], object_id=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Vacancy)
+@receiver([post_save, post_delete], sender=Company)
+@receiver([post_save, post_delete], sender=Specialty)
+def invalidate_homepage(sender, using, **kwargs):
+    """Сбрасывает кэш главной страницы после фиксации транзакции."""
+
+    transaction.on_commit(lambda: bump_namespace(HOMEPAGE_NAMESPACE), using=using)
+
+
+@receiver([post_save, post_delete], sender=Vacancy)
+@receiver([post_save, post_delete], sender=Company)
+@receiver([post_save, post_delete], sender=Specialty)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_listings(sender, using, **kwargs):
+    """Меняет ETag списков вакансий."""
+
+    transaction.on_commit(lambda: bump_namespace(LISTINGS_NAMESPACE), using=using)
+
+
+@receiver([post_save, post_delete], sender=Vacancy)
+@receiver([post_save, post_delete], sender=Company)
+@receiver([post_save, post_delete], sender=Specialty)
+def invalidate_facets(sender, using, **kwargs):
+    """Сбрасывает кэш значений фасетов списка вакансий. Вакансии меняют
+    набор городов, в которых они есть, только через счетчики F(), которые
+    сигналов не отправляют."""
+
+    transaction.on_commit(lambda: bump_namespace(FACETS_NAMESPACE), using=using)
+
+
+@receiver([post_save, post_delete], sender=Specialty)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_cards(sender, using, created=False, **kwargs):
+    """Сбрасывает кэш карточек вакансий при изменении названий специализаций
+    и навыков. Новые еще не входят ни в одну карточку."""
+
+    if not created:
+        transaction.on_commit(lambda: bump_namespace(CARDS_NAMESPACE), using=using)
+
+
+@receiver(pre_save, sender=Vacancy)
+def remember_snapshot_specialties(sender, instance, **kwargs):
+    """Запоминает специализации, страницы которых изменит сохранение вакансии."""
+
+    loaded = getattr(instance, '_loaded_relations', {}).get('specialty_id')
+    instance._snapshot_specialty_pks = {instance.specialty_id, loaded} - {None}
+
+
+@receiver([post_save, post_delete], sender=Vacancy)
+def discard_vacancy_snapshots(sender, instance, using, **kwargs):
+    """Удаляет снимки списка вакансий и страниц специализаций вакансии."""
+
+    specialty_pks = getattr(instance, '_snapshot_specialty_pks', {instance.specialty_id})
+    transaction.on_commit(
+        lambda: discard_snapshots(settings.SNAPSHOT_ROOT, snapshot_paths(specialty_pks, using)), using=using
+    )
+
+
+@receiver([post_save, post_delete], sender=Company)
+@receiver([post_save, post_delete], sender=Specialty)
+def discard_all_snapshots(sender, using, **kwargs):
+    """Удаляет все снимки: компания и специализация видны на любой из страниц."""
+
+    transaction.on_commit(lambda: discard_snapshots(settings.SNAPSHOT_ROOT), using=using)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Resume)
+@receiver(post_save, sender=Specialty)
+def create_thumbnails(sender, instance, using, raw=False, **kwargs):
+    """Создает уменьшенные копии загруженных изображений и удаляет копии
+    замененных, если прежний файл больше ни у кого не указан."""
+
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_relations', {})
+    for field_file in image_fields(instance):
+        field = field_file.field
+        previous = str(loaded.get(field.attname) or '')
+        if previous and previous != field_file.name:
+            if not sender._default_manager.using(using).filter(**{field.name: previous}).exists():
+                delete_variants(field_file, previous)
+        generate_variants(field_file)
+    instance.remember_relations()
+
+
+@receiver(pre_save, sender=Vacancy)
+def remember_vacancy_title(sender, instance, **kwargs):
+    """Запоминает названия, число вакансий с которыми изменится."""
+
+    loaded = getattr(instance, '_loaded_relations', {}).get('title')
+    if instance._state.adding or loaded != instance.title:
+        instance._changed_titles = {instance.title, loaded} - {None}
+    else:
+        instance._changed_titles = set()
+
+
+@receiver(post_save, sender=Vacancy)
+def refresh_title_suggestions(sender, instance, using, raw=False, **kwargs):
+    """Обновляет подсказки поиска для измененного названия вакансии."""
+
+    titles = instance._changed_titles
+    if titles and not raw:
+        transaction.on_commit(lambda: refresh_terms(titles=titles, using=using), using=using)
+
+
+@receiver(post_delete, sender=Vacancy)
+def refresh_deleted_suggestions(sender, instance, using, **kwargs):
+    """Обновляет подсказки поиска для названия и навыков удаленной вакансии."""
+
+    skill_pks = getattr(instance, '_released_skill_pks', ())
+    transaction.on_commit(
+        lambda: refresh_terms(titles={instance.title}, skill_pks=skill_pks, using=using), using=using
+    )
+
+
+@receiver(m2m_changed, sender=Vacancy.skill_tags.through)
+def refresh_skill_suggestions(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Обновляет подсказки поиска для навыков, у которых изменился счетчик."""
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        skill_pks = [instance.pk]
+    elif action == 'post_clear':
+        skill_pks = instance._cleared_skill_pks
+    else:
+        skill_pks = pk_set
+    if skill_pks:
+        transaction.on_commit(lambda: refresh_terms(skill_pks=set(skill_pks), using=using), using=using)
+
+
+@receiver([post_save, post_delete], sender=Resume)
+def refresh_resume_matrix(sender, instance, using, raw=False, **kwargs):
+    """Обновляет строку резюме в матрице подбора кандидатов."""
+
+    if not raw:
+        # После удаления Django обнуляет pk объекта раньше фиксации транзакции.
+        pk = instance.pk
+        transaction.on_commit(lambda: refresh_resumes([pk]), using=using)
+
+
+@receiver(post_save, sender=Resume)
+def update_resume_recommendations(sender, instance, using, raw=False, **kwargs):
+    """Ставит в очередь пересчет рекомендаций сохраненного резюме."""
+
+    if not raw:
+        request_recommendations('resume', instance.pk, using)
+
+
+@receiver(post_save, sender=Vacancy)
+def recommend_saved_vacancy(sender, instance, using, raw=False, **kwargs):
+    """Ставит в очередь добавление сохраненной вакансии в рекомендации
+    подходящих резюме."""
+
+    if not raw:
+        request_recommendations('vacancy', instance.pk, using)
@@ -0,0 +1,87 @@
+"""Теги навыков вакансий.
+
+Строка Vacancy.skills остается источником данных для формы, а ее
+разобранная копия хранится в таблице Skill со связью многие-ко-многим.
+Счетчик Skill.vacancy_count поддерживается сигналами m2m_changed
+и pre_delete из core/signals.py.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from core.models import Skill, Vacancy
+
+SKILL_SEPARATOR = ','
+
+
+def skill_code(name):
+    return ' '.join(name.split()).lower()
+
+
+def parse_skills(skills):
+    """Разбирает строку навыков через запятую в словарь {код: название}
+    без пустых значений и повторов."""
+
+    result = {}
+    for name in skills.split(SKILL_SEPARATOR):
+        name = ' '.join(name.split())[:Skill._meta.get_field('name').max_length]
+        if name:
+            result.setdefault(skill_code(name), name)
+    return result
+
+
+def get_or_create_skills(parsed, using='default'):
+    """Возвращает {код: Skill} для разобранных навыков, создавая недостающие
+    одним запросом."""
+
+    skills = {skill.code: skill for skill in Skill.objects.using(using).filter(code__in=parsed)}
+    missing = [Skill(code=code, name=name) for code, name in parsed.items() if code not in skills]
+    if missing:
+        Skill.objects.using(using).bulk_create(missing, ignore_conflicts=True)
+        skills = {skill.code: skill for skill in Skill.objects.using(using).filter(code__in=parsed)}
+    return skills
+
+
+def sync_vacancy_skills(vacancy, using='default'):
+    """Приводит теги вакансии в соответствие со строкой Vacancy.skills."""
+
+    skills = get_or_create_skills(parse_skills(vacancy.skills), using)
+    vacancy.skill_tags.set(skills.values())
+
+
+def adjust_skill_counts(pks, delta, using='default'):
+    if pks:
+        Skill.objects.using(using).filter(pk__in=pks).update(vacancy_count=F('vacancy_count') + delta)
+
+
+def bulk_sync_skills(vacancies, using='default', batch_size=1000):
+    """Создает теги для только что вставленных через bulk_create вакансий.
+    Счетчики навыков после этого нужно пересчитать."""
+
+    parsed = [(vacancy.pk, parse_skills(vacancy.skills)) for vacancy in vacancies]
+    names = {}
+    for _, skills in parsed:
+        names.update(skills)
+    skills = get_or_create_skills(names, using)
+    through = Vacancy.skill_tags.through
+    through.objects.using(using).bulk_create(
+        [
+            through(vacancy_id=pk, skill_id=skills[code].pk)
+            for pk, codes in parsed for code in codes
+        ],
+        batch_size=batch_size, ignore_conflicts=True
+    )
+
+
+@transaction.atomic
+def recount_skill_counts(using='default'):
+    """Пересчитывает Skill.vacancy_count одним агрегирующим запросом."""
+
+    through = Vacancy.skill_tags.through
+    counts = dict(
+        through.objects.using(using).values_list('skill_id').annotate(total=Count('vacancy_id'))
+    )
+    skills = list(Skill.objects.using(using).only('vacancy_count'))
+    for skill in skills:
+        skill.vacancy_count = counts.get(skill.pk, 0)
+    Skill.objects.using(using).bulk_update(skills, ['vacancy_count'], batch_size=1000)
+    return len(skills)
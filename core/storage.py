@@ -0,0 +1,63 @@
+"""Хранилище статических файлов с хэшем в имени и сжатыми копиями.
+
+ManifestStaticFilesStorage добавляет к имени файла хэш содержимого, поэтому
+измененный файл получает новый адрес, и nginx может отдавать статику с
+бессрочным кэшированием. После обработки collectstatic рядом с каждым
+текстовым файлом сохраняются копии .gz и .br, которые nginx отдает
+без сжатия на лету (gzip_static и brotli_static).
+"""
+import gzip
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.json', '.svg', '.txt', '.xml', '.html', '.ico', '.eot', '.otf', '.ttf',
+)
+MIN_COMPRESS_SIZE = 512
+
+
+def compressed_variants(content):
+    """Сжатые копии содержимого: {расширение: байты}. Копия, которая не
+    меньше исходного файла, не создается."""
+
+    variants = {
+        '.gz': gzip.compress(content, compresslevel=9, mtime=0),
+        '.br': brotli.compress(content, quality=11),
+    }
+    return {extension: data for extension, data in variants.items() if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage, который сжимает файлы с хэшем в имени."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name, hashed_name in hashed_names.items():
+            for compressed_name in self.compress(hashed_name):
+                yield name, compressed_name, True
+
+    def compress(self, name):
+        """Сохраняет сжатые копии файла. Возвращает их имена."""
+
+        if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            return []
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return []
+        names = []
+        for extension, data in compressed_variants(content).items():
+            compressed_name = name + extension
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(data))
+            names.append(compressed_name)
+        return names
@@ -1,5 +1,8 @@
 from django import template
 
+from core.fragments import render_cards
+from core.thumbnails import thumbnail_url
+
 register = template.Library()
 
 
@@ -11,5 +14,15 @@ def convert_digit(number):
     return f'{number:,}'
 
 
+def thumbnail(field_file, variant, image_format=None):
+    return thumbnail_url(field_file, variant, image_format)
+
+
+def cards(objects, kind):
+    return render_cards(objects, kind)
+
+
 register.filter('replace', replace)
 register.filter('convert_digit', convert_digit)
+register.simple_tag(thumbnail)
+register.simple_tag(cards)
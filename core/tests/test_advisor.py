@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from core.advisor import analyze, capture_page_queries, capture_queries, covered, explain, index_name, suggest_fields, table_sizes
+from core.models import Company, Resume, Skill, Specialty, Vacancy
+
+
+class IndexAdvisorTest(TestCase):
+    """Тестирует разбор планов запросов и предложение индексов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(
+            name='company_name', location='company_location',
+            description='company_description', employee_count=3
+        )
+
+    def capture(self, queryset):
+        with capture_queries(connection) as captured:
+            list(queryset)
+        self.assertEqual(len(captured), 1)
+        return captured[0]
+
+    def test_capture_queries_keeps_compiler(self):
+        query = self.capture(Vacancy.objects.filter(company=self.company))
+        self.assertIn('core_vacancy', query.sql)
+        self.assertEqual(query.compiler.query.model, Vacancy)
+
+    def test_suggest_fields(self):
+        query = self.capture(Vacancy.objects.filter(company=self.company, salary_min__gte=10))
+        self.assertEqual(suggest_fields(query.compiler, 'core_vacancy'), ['company', '-published_at'])
+        query = self.capture(Resume.objects.filter(grade='1', salary__gt=10).order_by())
+        self.assertEqual(suggest_fields(query.compiler, 'core_resume'), ['grade', 'salary'])
+        query = self.capture(Resume.objects.exclude(status='1'))
+        self.assertEqual(suggest_fields(query.compiler, 'core_resume'), ['-id'])
+
+    def test_covered(self):
+        self.assertTrue(covered(Vacancy, ['-id']))
+        self.assertTrue(covered(Vacancy, ['specialty', '-published_at']))
+        self.assertTrue(covered(Vacancy, ['company']))
+        self.assertFalse(covered(Resume, ['grade', 'salary']))
+
+    def test_index_name(self):
+        self.assertEqual(index_name(Resume, ['grade', '-salary']), 'resume_grade_salary_idx')
+        self.assertLessEqual(len(index_name(Vacancy, ['specialty', 'company', 'salary_max'])), 30)
+
+    def test_analyze_flags_full_scan(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('план проверяется на SQLite')
+        query = self.capture(Resume.objects.filter(grade='1', salary__gt=10).order_by())
+        self.assertEqual([problem.kind for problem in explain(connection, query.sql, query.params)], ['scan'])
+        sizes = table_sizes(connection)
+        self.assertEqual(sizes['core_vacancy'], 0)
+        self.assertEqual(analyze(connection, [query], sizes, min_rows=1), [])
+        findings = analyze(connection, [query], {'core_resume': 5000}, min_rows=1000)
+        self.assertEqual(findings[0]['model'], 'core.Resume')
+        self.assertEqual(findings[0]['fields'], ['grade', 'salary'])
+
+    def test_listing_queries_bypass_page_cache(self):
+        Vacancy.objects.create(
+            title='Python-разработчик', specialty=self.specialty, company=self.company, skills='Python',
+            description='-', salary_min=100000, salary_max=200000
+        )
+        pages = [
+            (reverse('main'), None), (reverse('search'), {'q': 'python'}), (reverse('vacancies'), None),
+            (reverse('vacancies_by_specialties', kwargs={'code': 'backend'}), None),
+            (reverse('vacancies_by_skill', kwargs={'code': Skill.objects.get().code}), None),
+        ]
+        for url, params in pages:
+            with self.subTest(url=url):
+                self.assertGreater(len(capture_page_queries(connection, self.client, url, params)), 0)
+
+    def test_salary_from_uses_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('план проверяется на SQLite')
+        query = self.capture(Vacancy.objects.filter(salary_max__gte=200000).order_by())
+        self.assertEqual(explain(connection, query.sql, query.params), [])
@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.autocomplete import SKILL, TITLE, AutocompleteIndex, PrefixTrie, index
+from core.models import Company, Specialty, Vacancy
+
+
+class PrefixTrieTest(SimpleTestCase):
+    """Тестирует префиксное дерево подсказок."""
+
+    def setUp(self):
+        self.trie = PrefixTrie(limit=3).build([
+            (('Python', SKILL), 5), (('PostgreSQL', SKILL), 7),
+            (('Python-разработчик', TITLE), 2), (('Java', SKILL), 1), (('JavaScript', SKILL), 4),
+        ])
+
+    def texts(self, prefix):
+        return [text for (text, kind), weight in self.trie.complete(prefix)]
+
+    def test_complete_orders_by_weight(self):
+        self.assertEqual(self.texts('p'), ['PostgreSQL', 'Python', 'Python-разработчик'])
+        self.assertEqual(self.texts('PY'), ['Python', 'Python-разработчик'])
+        self.assertEqual(self.texts('jav'), ['JavaScript', 'Java'])
+        self.assertEqual(self.texts('ruby'), [])
+        self.assertEqual(self.texts(' '), [])
+
+    def test_complete_by_word_start(self):
+        self.assertEqual(self.texts('раз'), ['Python-разработчик'])
+        self.assertEqual(self.texts('script'), [])
+
+    def test_set_updates_and_removes(self):
+        self.trie.set('Java', SKILL, 10)
+        self.assertEqual(self.texts('j'), ['Java', 'JavaScript'])
+        self.trie.set('Python-разработчик', TITLE, 0)
+        self.assertEqual(self.texts('p'), ['PostgreSQL', 'Python'])
+        self.assertEqual(self.texts('раз'), [])
+        self.assertNotIn('р', self.trie.root.children)
+        self.trie.set('Perl', SKILL, 6)
+        self.assertEqual(self.texts('p'), ['PostgreSQL', 'Perl', 'Python'])
+
+    def test_build_matches_incremental_updates(self):
+        terms = [(('Go', SKILL), 3), (('Go Go', TITLE), 2), (('Golang', SKILL), 8)]
+        incremental = PrefixTrie(limit=3)
+        for (text, kind), weight in terms:
+            incremental.set(text, kind, weight)
+        self.assertEqual(incremental.complete('go'), PrefixTrie(limit=3).build(terms).complete('go'))
+        incremental.set('Go Go', TITLE, 0)
+        self.assertEqual(incremental.complete('go'), [(('Golang', SKILL), 8), (('Go', SKILL), 3)])
+
+
+class AutocompleteIndexTest(TestCase):
+    """Тестирует обновление подсказок при изменении вакансий."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(
+            name='company_name', location='company_location',
+            description='company_description', employee_count=3
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def create_vacancy(self, title, skills):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Vacancy.objects.create(
+                title=title, specialty=self.specialty, company=self.company,
+                skills=skills, description='description', salary_min=1, salary_max=10
+            )
+
+    def suggestions(self, prefix, source=index):
+        return [(text, weight) for (text, kind), weight in source.complete(prefix)]
+
+    def test_index_follows_vacancy_changes(self):
+        self.create_vacancy('Python-разработчик', 'Python, Django')
+        self.assertEqual(self.suggestions('py'), [('Python', 1), ('Python-разработчик', 1)])
+
+        vacancy = self.create_vacancy('Python-разработчик', 'Python')
+        self.assertEqual(self.suggestions('py'), [('Python', 2), ('Python-разработчик', 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.title = 'Go-разработчик'
+            vacancy.skills = 'Go'
+            vacancy.save()
+        self.assertEqual(self.suggestions('py'), [('Python', 1), ('Python-разработчик', 1)])
+        self.assertEqual(self.suggestions('go'), [('Go', 1), ('Go-разработчик', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.delete()
+        self.assertEqual(self.suggestions('go'), [])
+
+    def test_other_process_catches_up_without_database(self):
+        other = AutocompleteIndex()
+        self.create_vacancy('Python-разработчик', 'Python')
+        other.get_trie()
+        self.create_vacancy('Python-разработчик', 'Django')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggestions('dj', other), [('Django', 1)])
+
+    def test_missing_changes_trigger_rebuild(self):
+        other = AutocompleteIndex()
+        other.get_trie()
+        self.create_vacancy('Python-разработчик', 'Python')
+        cache.delete(other.changes_key(other.version + 1))
+        self.assertEqual(self.suggestions('py', other), [('Python', 1), ('Python-разработчик', 1)])
+
+    def test_autocomplete_view(self):
+        self.create_vacancy('Python-разработчик', 'Python')
+        response = self.client.get(reverse('autocomplete'), {'q': 'pyt', 'limit': 1})
+        self.assertEqual(response.json(), {
+            'query': 'pyt',
+            'suggestions': [{'text': 'Python', 'kind': 'skill', 'count': 1}],
+        })
+        response = self.client.get(reverse('autocomplete'), {'q': '', 'limit': 'x'})
+        self.assertEqual(response.json()['suggestions'], [])
+        response = self.client.get(reverse('autocomplete'), {'q': 'pyt', 'limit': -1})
+        self.assertEqual(response.json()['suggestions'], [])
@@ -0,0 +1,42 @@
+from django.db import connection
+from django.test import TestCase
+
+from core import urls
+from core.benchmark import capture_sql, compare, iter_url_patterns, measure, percentile, requires_login
+from core.models import Specialty
+from core.views import MainView, ResumesList
+
+
+class BenchmarkTest(TestCase):
+    """Тестирует вспомогательные функции команды bench."""
+
+    def test_capture_sql_counts_queries_and_rows(self):
+        Specialty.objects.bulk_create([Specialty(code=f'code_{i}', title='title') for i in range(3)])
+        with capture_sql(connection) as stats:
+            list(Specialty.objects.all())
+            Specialty.objects.exists()
+        self.assertEqual(stats, {'queries': 2, 'rows': 4})
+
+    def test_iter_url_patterns(self):
+        patterns = {name: view for name, _, view in iter_url_patterns(urls.urlpatterns)}
+        self.assertNotIn('logout', patterns)
+        self.assertIs(patterns['main'], MainView)
+        self.assertTrue(requires_login(patterns['resumes']))
+        self.assertFalse(requires_login(patterns['main']))
+        self.assertIs(patterns['resumes'], ResumesList)
+
+    def test_measure(self):
+        result = measure(self.client, '/vacancies/', connection, repeat=2)
+        self.assertEqual(result['status'], 200)
+        self.assertGreater(result['queries'], 0)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 0.5), 3)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 0.95), 5)
+
+    def test_compare(self):
+        baseline = {'1000': {'main': {'p95_ms': 10.0, 'queries': 2, 'rows': 10}}}
+        same = {'1000': {'main': {'p95_ms': 11.0, 'queries': 2, 'rows': 10}}}
+        worse = {'1000': {'main': {'p95_ms': 20.0, 'queries': 3, 'rows': 10}}}
+        self.assertEqual(compare(same, baseline, 0.25), [])
+        self.assertEqual(len(compare(worse, baseline, 0.25)), 2)
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase, override_settings
+
+from core.cache import bump_namespace, get_or_build, namespaced_key
+from core.models import Specialty
+
+
+class GetOrBuildTest(SimpleTestCase):
+    """Тестирует объединение одновременных промахов кэша."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_build_once(self):
+        calls = []
+
+        def builder():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_build('key', builder)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+
+    def test_bump_namespace_changes_key(self):
+        key = namespaced_key('test', 'key')
+        bump_namespace('test')
+        self.assertNotEqual(key, namespaced_key('test', 'key'))
+
+    def test_lost_version_does_not_revive_old_entries(self):
+        cache.set(namespaced_key('test', 'key'), 'old')
+        bump_namespace('test')
+        cache.set(namespaced_key('test', 'key'), 'current')
+        cache.delete('ns:test')
+        self.assertIsNone(cache.get(namespaced_key('test', 'key')))
+        bump_namespace('test')
+        self.assertIsNone(cache.get(namespaced_key('test', 'key')))
+
+
+@override_settings(PAGE_CACHE_SECONDS=0)
+class HomepageCacheTest(TestCase):
+    """Тестирует кэш контекста главной страницы без кэша готовых страниц."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Specialty.objects.create(code='backend', title='Бэкенд')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_homepage_is_cached_and_invalidated(self):
+        self.client.get('')
+        with self.assertNumQueries(0):
+            response = self.client.get('')
+        self.assertEqual(len(response.context['specialties']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Specialty.objects.create(code='frontend', title='Фронтенд')
+        response = self.client.get('')
+        self.assertEqual(len(response.context['specialties']), 2)
@@ -0,0 +1,34 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from core.models import Application, Company, RecommendationTask, Resume, Skill, Vacancy
+from core.search import search_vacancies
+
+
+class GenerateDataCommandTest(TestCase):
+    """Тестирует генератор данных и загрузку mock-файла."""
+
+    def test_db_dump_is_idempotent(self):
+        call_command('db_dump', stdout=StringIO())
+        call_command('db_dump', stdout=StringIO())
+        self.assertEqual(Vacancy.objects.count(), 5)
+        self.assertEqual(Company.objects.aggregate(total=Sum('vacancy_count'))['total'], 5)
+        self.assertEqual(Skill.objects.get(code='python').vacancy_count, 4)
+
+    def test_generate_data(self):
+        call_command(
+            'generate_data', vacancies=120, companies=10, resumes=15, applications=200,
+            users=5, batch_size=50, seed=1, stdout=StringIO()
+        )
+        self.assertEqual(Vacancy.objects.count(), 120)
+        self.assertEqual(Resume.objects.count(), 15)
+        self.assertEqual(Application.objects.count(), 200)
+        self.assertEqual(Company.objects.aggregate(total=Sum('vacancy_count'))['total'], 120)
+        self.assertEqual(Vacancy.objects.aggregate(total=Sum('application_count'))['total'], 200)
+        self.assertEqual(RecommendationTask.objects.filter(kind='vacancy').count(), 120)
+        self.assertEqual(Vacancy.objects.filter(skill_tags__isnull=True).count(), 0)
+        self.assertGreater(search_vacancies(Vacancy.objects.all(), 'разработчик').count(), 0)
+        self.assertGreater(Vacancy.objects.values('published_at').distinct().count(), 1)
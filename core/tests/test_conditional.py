@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from core.models import Company, Specialty, Vacancy
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    """Тестирует ответы 304 на условные GET-запросы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        cls.vacancy = Vacancy.objects.create(
+            title='vacancy', specialty=cls.specialty, company=cls.company,
+            skills='Python', description='-', salary_min=1, salary_max=2
+        )
+        cls.user = User.objects.create_user(username='user', password='password')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_listing_not_modified_without_queries(self):
+        url = reverse('vacancies_by_specialties', kwargs={'code': 'backend'})
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vacancy.objects.create(
+                title='new', specialty=self.specialty, company=self.company,
+                skills='Git', description='-', salary_min=1, salary_max=2
+            )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_vacancy_detail_validators(self):
+        self.client.force_login(self.user)
+        url = reverse('vacancy_detail', kwargs={'pk': self.vacancy.pk})
+        # Первый ответ ставит CSRF-куку, от которой зависит ETag.
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date()).status_code, 200)
+
+        self.company.name = 'renamed'
+        self.company.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pending_message_is_shown(self):
+        self.client.force_login(self.user)
+        url = reverse('company_detail', kwargs={'pk': self.company.pk})
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        with override_settings(APPLICATION_SPOOL_LIMIT=0):
+            self.client.post(reverse('vacancy_detail', kwargs={'pk': self.vacancy.pk}), {
+                'written_username': 'name', 'written_phone': '+79990000000', 'written_cover_letter': 'letter'
+            })
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertContains(response, 'Отклик отправлен.')
+
+    def test_etag_depends_on_user(self):
+        url = reverse('vacancies')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_company_detail_after_vacancy_delete(self):
+        self.client.force_login(self.user)
+        url = reverse('company_detail', kwargs={'pk': self.company.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.vacancy.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_anonymous_is_redirected_to_login(self):
+        url = reverse('vacancy_detail', kwargs={'pk': self.vacancy.pk})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, 302)
@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.counters import recount_counters
+from core.models import Vacancy, Specialty, Company, Application
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    """Тестирует денормализованные счетчики."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('applicant', password='password')
+        cls.backend = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.frontend = Specialty.objects.create(code='frontend', title='Фронтенд')
+        cls.first = Company.objects.create(
+            name='first', location='location', description='description', employee_count=3
+        )
+        cls.second = Company.objects.create(
+            name='second', location='location', description='description', employee_count=3
+        )
+
+    def create_vacancy(self):
+        return Vacancy.objects.create(
+            title='vacancy_title', specialty=self.backend, company=self.first,
+            skills='Python', description='description', salary_min=1, salary_max=10
+        )
+
+    def apply(self, vacancy, user=None):
+        return Application.objects.create(
+            written_username='name', written_cover_letter='letter', vacancy=vacancy, user=user or self.user
+        )
+
+    def assertCounts(self, first, second, backend, frontend):
+        self.assertEqual(
+            [self.first.vacancy_count, self.second.vacancy_count,
+             self.backend.vacancy_count, self.frontend.vacancy_count],
+            [first, second, backend, frontend]
+        )
+
+    def refresh(self):
+        for obj in (self.first, self.second, self.backend, self.frontend):
+            obj.refresh_from_db()
+
+    def test_vacancy_counters(self):
+        vacancy = self.create_vacancy()
+        self.create_vacancy()
+        self.refresh()
+        self.assertCounts(2, 0, 2, 0)
+
+        vacancy = Vacancy.objects.get(pk=vacancy.pk)
+        vacancy.company = self.second
+        vacancy.specialty = self.frontend
+        vacancy.save()
+        vacancy.save()
+        self.refresh()
+        self.assertCounts(1, 1, 1, 1)
+
+        vacancy.delete()
+        self.refresh()
+        self.assertCounts(1, 0, 1, 0)
+
+    def test_application_counter(self):
+        vacancy = self.create_vacancy()
+        application = self.apply(vacancy)
+        self.apply(vacancy, User.objects.create_user('second_applicant', password='password'))
+        vacancy.refresh_from_db()
+        self.assertEqual(vacancy.application_count, 2)
+
+        application.delete()
+        vacancy.refresh_from_db()
+        self.assertEqual(vacancy.application_count, 1)
+
+    def test_save_keeps_concurrent_increments(self):
+        vacancy = self.create_vacancy()
+        company = Company.objects.get(pk=self.first.pk)
+        loaded = Vacancy.objects.get(pk=vacancy.pk)
+        self.apply(vacancy)
+        self.create_vacancy()
+
+        loaded.title = 'new_title'
+        loaded.save()
+        company.name = 'new_name'
+        company.save()
+        vacancy.refresh_from_db()
+        self.refresh()
+        self.assertEqual((vacancy.title, vacancy.application_count), ('new_title', 1))
+        self.assertEqual((self.first.name, self.first.vacancy_count), ('new_name', 2))
+
+    def test_recount_counters(self):
+        vacancy = self.create_vacancy()
+        self.apply(vacancy)
+        Company.objects.update(vacancy_count=10)
+        Vacancy.objects.update(application_count=10)
+        recount_counters()
+        self.refresh()
+        vacancy.refresh_from_db()
+        self.assertCounts(1, 0, 1, 0)
+        self.assertEqual(vacancy.application_count, 1)
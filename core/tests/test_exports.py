@@ -0,0 +1,184 @@
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Application, Company, Specialty, Vacancy
+
+User = get_user_model()
+
+
+class ApplicationsInboxTest(TestCase):
+    """Тестирует постраничный вывод и выгрузку откликов работодателя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='password')
+        specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        company = Company.objects.create(
+            name='company', location='Москва', description='-', employee_count=3, owner=cls.owner
+        )
+        cls.vacancy = Vacancy.objects.create(
+            title='vacancy', specialty=specialty, company=company, skills='Python',
+            description='-', salary_min=100000, salary_max=200000
+        )
+        applicants = [User.objects.create(username=f'applicant_{number}') for number in range(26)]
+        Application.objects.bulk_create([
+            Application(
+                written_username=f'name_{number}', written_phone='+79990000000',
+                written_cover_letter=f'letter_{number}', vacancy=cls.vacancy, user=applicants[number]
+            )
+            for number in range(25)
+        ])
+        Application.objects.create(
+            written_username='=HYPERLINK("http://example.com")', written_phone='+79990000000',
+            written_cover_letter='Пишу на Python', vacancy=cls.vacancy, user=applicants[25]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def test_inbox_is_paginated(self):
+        url = reverse('my_vacancy', kwargs={'pk': self.vacancy.pk})
+        response = self.client.get(url)
+        page = response.context['applications']
+        self.assertEqual(len(page), 20)
+        self.assertTrue(page.has_next())
+        self.assertContains(response, reverse('my_vacancy_applications', kwargs={'pk': self.vacancy.pk}))
+
+        response = self.client.get(f'{url}?{page.next_querystring}')
+        self.assertEqual(
+            [application.written_username for application in response.context['applications']],
+            [f'name_{number}' for number in range(5, -1, -1)]
+        )
+        self.assertEqual(self.client.get(f'{url}?cursor=broken').status_code, 404)
+
+    def test_csv_export(self):
+        response = self.client.get(reverse('my_vacancy_applications', kwargs={'pk': self.vacancy.pk}))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['Номер', 'Пользователь', 'Имя', 'Телефон', 'Сопроводительное письмо'])
+        self.assertEqual(len(rows), 27)
+        self.assertEqual(rows[1][1:], ['applicant_0', 'name_0', '+79990000000', 'letter_0'])
+        self.assertEqual(rows[-1][2:], ['\'=HYPERLINK("http://example.com")', '+79990000000', 'Пишу на Python'])
+
+    def test_export_of_foreign_vacancy(self):
+        stranger = User.objects.create_user(username='stranger', password='password')
+        Company.objects.create(name='other', location='Москва', description='-', employee_count=1, owner=stranger)
+        self.client.force_login(stranger)
+        response = self.client.get(reverse('my_vacancy_applications', kwargs={'pk': self.vacancy.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_vacancy_is_edited(self):
+        url = reverse('my_vacancy', kwargs={'pk': self.vacancy.pk})
+        response = self.client.post(url, {
+            'title': 'new_title', 'specialty': self.vacancy.specialty_id, 'skills': 'Python',
+            'description': '-', 'salary_min': 100000, 'salary_max': 200000
+        })
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.title, 'new_title')
+
+
+class ExportDataCommandTest(TestCase):
+    """Тестирует выгрузку данных для хранилища."""
+
+    @classmethod
+    def setUpTestData(cls):
+        specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        cls.vacancies = [
+            Vacancy.objects.create(
+                title=f'vacancy_{number}', specialty=specialty, company=cls.company, skills='Python',
+                description='=1+1', salary_min=100000, salary_max=200000
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def export(self, **options):
+        options.setdefault('safety_lag', 0)
+        call_command('export_data', output_dir=self.output_dir, stdout=io.StringIO(), **options)
+        with open(os.path.join(self.output_dir, 'manifest.json'), encoding='utf-8') as file:
+            return json.load(file)
+
+    def read_jsonl(self, name):
+        with gzip.open(os.path.join(self.output_dir, name), 'rt', encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_full_and_incremental_export(self):
+        manifest = self.export(models='vacancies,companies', gzip=True)
+        self.assertEqual(manifest['files']['vacancies'], {'file': 'vacancies.jsonl.gz', 'rows': 3})
+        rows = self.read_jsonl('vacancies.jsonl.gz')
+        self.assertEqual([row['title'] for row in rows], ['vacancy_0', 'vacancy_1', 'vacancy_2'])
+        self.assertEqual((rows[0]['company_name'], rows[0]['specialty_code']), ('company', 'backend'))
+        self.assertEqual(rows[0]['description'], '=1+1')
+
+        since = timezone.now() - timedelta(minutes=1)
+        Vacancy.objects.update(updated_at=since - timedelta(hours=1))
+        Company.objects.update(updated_at=since - timedelta(hours=1))
+        Vacancy.objects.filter(pk=self.vacancies[1].pk).update(updated_at=since)
+        manifest = self.export(models='vacancies,companies', since=since.isoformat(), gzip=True)
+        self.assertEqual([row['id'] for row in self.read_jsonl('vacancies.jsonl.gz')], [self.vacancies[1].pk])
+        self.assertEqual(manifest['files']['companies']['rows'], 0)
+
+        Company.objects.filter(pk=self.company.pk).update(updated_at=since)
+        manifest = self.export(models='vacancies', since=since.isoformat(), gzip=True)
+        self.assertEqual(manifest['files']['vacancies']['rows'], 3)
+
+    def test_recent_changes_wait_for_next_export(self):
+        Company.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        Vacancy.objects.filter(pk=self.vacancies[0].pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        manifest = self.export(models='vacancies', safety_lag=60, gzip=True)
+        self.assertEqual([row['id'] for row in self.read_jsonl('vacancies.jsonl.gz')], [self.vacancies[0].pk])
+        self.assertNotIn('application_count', self.read_jsonl('vacancies.jsonl.gz')[0])
+
+        manifest = self.export(models='vacancies', since=manifest['until'], gzip=True)
+        self.assertEqual(manifest['files']['vacancies']['rows'], 2)
+
+    def test_deletions_are_exported(self):
+        since = timezone.now() - timedelta(minutes=1)
+        applicant = User.objects.create_user(username='applicant', password='password')
+        application = Application.objects.create(
+            written_username='name', written_cover_letter='-', vacancy=self.vacancies[0], user=applicant
+        )
+        deleted = {('vacancies', vacancy.pk) for vacancy in self.vacancies}
+        deleted |= {('companies', self.company.pk), ('applications', application.pk)}
+        Vacancy.objects.get(pk=self.vacancies[1].pk).delete()
+        Company.objects.get(pk=self.company.pk).delete()
+        manifest = self.export(models='deletions', since=since.isoformat(), gzip=True)
+        self.assertEqual(manifest['files']['deletions']['rows'], 5)
+        rows = self.read_jsonl('deletions.jsonl.gz')
+        self.assertEqual({(row['export'], row['object_id']) for row in rows}, deleted)
+
+    def test_csv_export(self):
+        self.export(models='vacancies', format='csv', chunk_size=2)
+        with open(os.path.join(self.output_dir, 'vacancies.csv'), encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['company_location'], 'Москва')
+        self.assertEqual(rows[0]['description'], '=1+1')
+        self.assertIn('T', rows[0]['published_at'])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            self.export(models='vacancies,users')
+        with self.assertRaises(CommandError):
+            self.export(since='yesterday')
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.filters import facet_choices, facet_counts
+from core.models import Company, Specialty, Vacancy
+
+
+class VacancyFilterTest(TestCase):
+    """Тестирует фильтры и фасеты списка вакансий."""
+
+    @classmethod
+    def setUpTestData(cls):
+        backend = Specialty.objects.create(code='backend', title='Бэкенд')
+        frontend = Specialty.objects.create(code='frontend', title='Фронтенд')
+        moscow = Company.objects.create(name='moscow', location='Москва', description='-', employee_count=3)
+        kazan = Company.objects.create(name='kazan', location='Казань', description='-', employee_count=3)
+        now = timezone.now()
+        rows = [
+            ('old_backend', backend, moscow, 60000, 90000, 40),
+            ('backend', backend, moscow, 150000, 200000, 2),
+            ('frontend', frontend, kazan, 100000, 160000, 0),
+            ('frontend_cheap', frontend, moscow, 40000, 60000, 5),
+        ]
+        for title, specialty, company, salary_min, salary_max, days in rows:
+            vacancy = Vacancy.objects.create(
+                title=title, specialty=specialty, company=company, skills='Python',
+                description='-', salary_min=salary_min, salary_max=salary_max
+            )
+            Vacancy.objects.filter(pk=vacancy.pk).update(published_at=now - timedelta(days=days, hours=1))
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, params, url=None):
+        response = self.client.get(url or reverse('vacancies'), params)
+        return sorted(vacancy.title for vacancy in response.context['vacancies'])
+
+    def test_filters(self):
+        self.assertEqual(self.titles({'specialty': 'frontend'}), ['frontend', 'frontend_cheap'])
+        self.assertEqual(self.titles({'location': 'Казань'}), ['frontend'])
+        self.assertEqual(self.titles({'salary_from': 150000}), ['backend', 'frontend'])
+        self.assertEqual(self.titles({'salary_from': 50000, 'salary_to': 80000}), ['frontend_cheap', 'old_backend'])
+        self.assertEqual(self.titles({'age': 3}), ['backend', 'frontend'])
+        self.assertEqual(self.titles({'age': 7, 'location': 'Москва'}), ['backend', 'frontend_cheap'])
+
+    def test_invalid_values_are_ignored(self):
+        self.assertEqual(self.titles({'age': 2, 'salary_from': 'many', 'location': 'Москва'}),
+                         ['backend', 'frontend_cheap', 'old_backend'])
+        self.assertEqual(self.titles({'specialty': 'unknown'}), [])
+
+    def test_facet_counts_in_one_query(self):
+        choices = facet_choices()
+        with self.assertNumQueries(1):
+            counts = facet_counts(
+                Vacancy.objects.all(), ('specialty', 'location', 'salary', 'age'), {'location': 'Москва'}, choices
+            )
+        self.assertEqual(counts['total'], 3)
+        # Фасет выбранного фильтра не ограничивается им самим.
+        self.assertEqual(dict(zip(choices['location'], counts['location'])), {'Москва': 3, 'Казань': 1})
+        specialties = {code: total for (code, title, pk), total in zip(choices['specialty'], counts['specialty'])}
+        self.assertEqual(specialties, {'backend': 2, 'frontend': 1})
+        self.assertEqual(counts['age'], [0, 1, 2, 2])
+
+    def test_locations_follow_vacancies(self):
+        self.assertEqual(facet_choices()['location'], ['Москва', 'Казань'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Vacancy.objects.get(title='frontend').delete()
+        self.assertEqual(facet_choices()['location'], ['Москва'])
+
+    def test_facet_links(self):
+        response = self.client.get(reverse('vacancies'), {'location': 'Казань'})
+        self.assertEqual(response.context['total_count'], 1)
+        groups = {group['title']: group['options'] for group in response.context['filter_groups']}
+        kazan = next(option for option in groups['Город'] if option['label'] == 'Казань')
+        self.assertTrue(kazan['active'])
+        self.assertEqual(kazan['querystring'], '')
+        self.assertEqual([option['label'] for option in groups['Специализация']], ['Фронтенд'])
+
+    def test_specialty_page_filters(self):
+        url = reverse('vacancies_by_specialties', kwargs={'code': 'backend'})
+        self.assertEqual(self.titles({'salary_from': 100000, 'specialty': 'frontend'}, url), ['backend'])
+        response = self.client.get(url)
+        self.assertNotIn('Специализация', [group['title'] for group in response.context['filter_groups']])
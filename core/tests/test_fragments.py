@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.fragments import render_cards
+from core.models import Company, Specialty, Vacancy
+
+
+class CardCacheTest(TestCase):
+    """Тестирует кэш разметки карточек."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        for number in range(3):
+            Vacancy.objects.create(
+                title=f'vacancy_{number}', specialty=cls.specialty, company=cls.company,
+                skills='Python, Git', description='-', salary_min=100000, salary_max=200000
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def vacancies(self):
+        return list(Vacancy.objects.select_related('specialty', 'company').order_by('title'))
+
+    def test_cached_cards_render_without_queries(self):
+        html = render_cards(self.vacancies(), 'vacancy')
+        self.assertIn('100,000', html)
+        self.assertIn('Git', html)
+        vacancies = self.vacancies()
+        with self.assertNumQueries(0):
+            self.assertEqual(render_cards(vacancies, 'vacancy'), html)
+
+    def test_only_missing_cards_are_rendered(self):
+        render_cards(self.vacancies(), 'vacancy')
+        vacancy = Vacancy.objects.get(title='vacancy_1')
+        vacancy.title = 'renamed'
+        vacancy.save()
+        vacancies = self.vacancies()
+        # Теги навыков загружаются одним запросом только для измененной карточки.
+        with self.assertNumQueries(1):
+            html = render_cards(vacancies, 'vacancy')
+        self.assertIn('renamed', html)
+        self.assertNotIn('vacancy_1', html)
+
+    def test_specialty_rename_invalidates_cards(self):
+        render_cards(self.vacancies(), 'vacancy')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.specialty.title = 'Серверная разработка'
+            self.specialty.save()
+        self.assertIn('Серверная разработка', render_cards(self.vacancies(), 'vacancy'))
+
+    def test_company_card_follows_vacancy_count(self):
+        render_cards([Company.objects.get()], 'company')
+        Vacancy.objects.create(
+            title='new', specialty=self.specialty, company=self.company,
+            skills='Python', description='-', salary_min=1, salary_max=2
+        )
+        self.assertIn('4 открытых вакансий', render_cards([Company.objects.get()], 'company'))
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import intake
+from core.models import Application, Company, Specialty, Vacancy
+
+User = get_user_model()
+
+
+class ApplicationIntakeTest(TestCase):
+    """Тестирует очередь откликов и их пакетную запись в базу."""
+
+    @classmethod
+    def setUpTestData(cls):
+        specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        cls.vacancies = [
+            Vacancy.objects.create(
+                title=f'vacancy_{number}', specialty=specialty, company=company, skills='Python',
+                description='-', salary_min=100000, salary_max=200000
+            )
+            for number in range(2)
+        ]
+        cls.user = User.objects.create_user(username='user', password='password')
+
+    def setUp(self):
+        spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool)
+        settings = override_settings(APPLICATION_SPOOL_DIR=spool, APPLICATION_SPOOL_LIMIT=10)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_login(self.user)
+
+    def apply(self, vacancy, letter='letter'):
+        return self.client.post(reverse('vacancy_detail', kwargs={'pk': vacancy.pk}), {
+            'written_username': 'name', 'written_phone': '+79990000000', 'written_cover_letter': letter
+        }, follow=True)
+
+    def test_apply_is_acknowledged_before_insert(self):
+        with self.assertNumQueries(3):
+            response = self.client.post(reverse('vacancy_detail', kwargs={'pk': self.vacancies[0].pk}), {
+                'written_username': 'name', 'written_phone': '+79990000000', 'written_cover_letter': 'letter'
+            })
+        self.assertRedirects(response, reverse('vacancies'), fetch_redirect_response=False)
+        self.assertFalse(Application.objects.exists())
+        self.assertEqual(intake.pending_count(), 1)
+        self.assertContains(self.client.get(reverse('vacancies')), 'Отклик отправлен.')
+
+    def test_duplicates_are_collapsed(self):
+        self.apply(self.vacancies[0], 'first')
+        self.apply(self.vacancies[0], 'second')
+        self.apply(self.vacancies[1])
+        self.assertEqual(intake.flush_applications(batch_size=1), 2)
+        self.assertEqual(Application.objects.get(vacancy=self.vacancies[0]).written_cover_letter, 'second')
+
+        self.apply(self.vacancies[0], 'third')
+        self.assertEqual(intake.flush_applications(), 0)
+        self.assertEqual(Application.objects.count(), 2)
+        self.vacancies[0].refresh_from_db()
+        self.assertEqual(self.vacancies[0].application_count, 1)
+
+    def test_full_queue_saves_synchronously(self):
+        with override_settings(APPLICATION_SPOOL_LIMIT=1):
+            self.apply(self.vacancies[0])
+            self.apply(self.vacancies[1])
+        self.assertEqual(list(Application.objects.values_list('vacancy', flat=True)), [self.vacancies[1].pk])
+        self.assertEqual(intake.pending_count(), 1)
+
+    def test_repeated_synchronous_apply(self):
+        with override_settings(APPLICATION_SPOOL_LIMIT=0):
+            self.apply(self.vacancies[0], 'first')
+            response = self.apply(self.vacancies[0], 'second')
+        self.assertContains(response, 'Отклик отправлен.')
+        self.assertEqual(Application.objects.get().written_cover_letter, 'first')
+        self.vacancies[0].refresh_from_db()
+        self.assertEqual(self.vacancies[0].application_count, 1)
+
+    def test_claimed_entries_are_recovered(self):
+        self.apply(self.vacancies[0])
+        intake.claim_entries(10)
+        self.assertEqual(intake.pending_count(), 0)
+        call_command('process_applications', once=True, stdout=open(os.devnull, 'w'))
+        self.assertEqual(Application.objects.count(), 1)
+        self.assertEqual(os.listdir(intake.spool_path(intake.PROCESSING)), [])
+
+    def test_missing_vacancy(self):
+        response = self.client.post(reverse('vacancy_detail', kwargs={'pk': 0}), {
+            'written_username': 'name', 'written_cover_letter': 'letter'
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(intake.pending_count(), 0)
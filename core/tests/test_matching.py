@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core import matching
+from core.matching import UNKNOWN_GRADE, MatchingIndex, ResumeMatrix, target_grade, text_skill_codes
+from core.models import Company, Resume, Specialty, Vacancy
+
+User = get_user_model()
+
+
+class ResumeMatrixTest(SimpleTestCase):
+    """Тестирует оценку резюме по матрице признаков."""
+
+    def setUp(self):
+        # pk, специализация, квалификация, зарплата, активно, навыки.
+        self.matrix = ResumeMatrix([
+            (1, 1, 2, 150000, True, [10, 11]),
+            (2, 1, 2, 150000, True, [10]),
+            (3, 2, 2, 150000, True, [10, 11]),
+            (4, 1, 2, 400000, True, [10, 11]),
+            (5, 1, 2, 150000, False, [10, 11]),
+        ])
+
+    def pks(self, **kwargs):
+        options = {'specialty_id': 1, 'grade': 2, 'salary_min': 100000, 'salary_max': 200000, 'skill_pks': {10, 11}}
+        options.update(kwargs)
+        return [pk for pk, score, overlap in self.matrix.top(**options)]
+
+    def test_ranking(self):
+        self.assertEqual(self.pks(), [1, 2, 4, 3])
+        self.assertEqual(self.pks(limit=2), [1, 2])
+        self.assertEqual(self.matrix.top(1, 2, 100000, 200000, {10, 11})[0][2], 2)
+
+    def test_incremental_update(self):
+        self.matrix.update([(2, 1, 2, 150000, True, [10, 11, 12]), (6, 1, 2, 120000, True, [11])], deleted_pks=[1])
+        self.assertEqual(self.pks(skill_pks={12}), [2, 6, 4, 3])
+        self.assertEqual(len(self.matrix), 4)
+        self.matrix.update([(5, 1, 2, 150000, True, [])])
+        self.assertEqual(self.pks(), [2, 6, 4, 3, 5])
+
+    def test_text_features(self):
+        codes = text_skill_codes('Писал на Python и Django REST framework; знаю C++, Node.js')
+        self.assertTrue({'python', 'django rest framework', 'c++', 'node.js'} <= codes)
+        self.assertEqual(target_grade('Senior Python-разработчик'), 3)
+        self.assertEqual(target_grade('Python-разработчик'), UNKNOWN_GRADE)
+
+
+class MatchingIndexTest(TestCase):
+    """Тестирует подбор кандидатов на странице вакансии работодателя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.backend = Specialty.objects.create(code='backend', title='Бэкенд')
+        frontend = Specialty.objects.create(code='frontend', title='Фронтенд')
+        cls.owner = User.objects.create_user(username='owner', password='password')
+        company = Company.objects.create(
+            name='company', location='Москва', description='-', employee_count=3, owner=cls.owner
+        )
+        cls.vacancy = Vacancy.objects.create(
+            title='Middle Python-разработчик', specialty=cls.backend, company=company,
+            skills='Python, Django', description='-', salary_min=100000, salary_max=200000
+        )
+        for name, specialty, experience in (
+            ('Python', cls.backend, 'Python, Django, PostgreSQL'),
+            ('Frontend', frontend, 'JavaScript'),
+        ):
+            Resume.objects.create(
+                name=name, surname='-', status='2', salary=150000, specialty=specialty, grade='2',
+                education='-', experience=experience, description='-', portfolio='-'
+            )
+
+    def setUp(self):
+        cache.clear()
+        matching.index.matrix = None
+
+    def test_candidates_panel(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('my_vacancy', kwargs={'pk': self.vacancy.pk}))
+        candidates = response.context['candidates']
+        self.assertEqual([resume.name for resume in candidates], ['Python', 'Frontend'])
+        self.assertEqual(candidates[0].matched_skills, 2)
+        self.assertEqual(candidates[0].match_score, 100)
+        self.assertContains(response, 'Подходящие кандидаты')
+
+    def test_resume_changes_reach_other_processes(self):
+        other = MatchingIndex()
+        other.get_matrix()
+        with self.captureOnCommitCallbacks(execute=True):
+            Resume.objects.filter(name='Frontend').get().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            resume = Resume.objects.get(name='Python')
+            resume.status = '0'
+            resume.save()
+        self.assertEqual(len(other.get_matrix()), 0)
+
+    def test_stale_matrix_is_rebuilt_in_background(self):
+        other = MatchingIndex()
+        old = other.get_matrix()
+        other.built_at -= matching.MATRIX_MAX_AGE + 1
+        with self.captureOnCommitCallbacks(execute=True):
+            Resume.objects.filter(name='Frontend').delete()
+        with mock.patch.object(matching.threading, 'Thread') as thread:
+            self.assertIs(other.get_matrix(), old)
+            self.assertIs(other.get_matrix(), old)
+        thread.assert_called_once()
+        with mock.patch.object(matching.connection, 'close'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual(len(other.get_matrix()), 1)
+        self.assertFalse(other.rebuilding)
@@ -0,0 +1,30 @@
+import json
+
+from django.test import TestCase
+
+from core.models import Specialty
+
+
+class RequestTimingMiddlewareTest(TestCase):
+    """Тестирует заголовок Server-Timing и лог запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Specialty.objects.create(code='backend', title='Бэкенд')
+
+    def test_server_timing_and_log(self):
+        with self.assertLogs('core.requests', level='INFO') as logs:
+            response = self.client.get('/vacancies/')
+        metrics = {item.split(';')[0] for item in response['Server-Timing'].split(', ')}
+        self.assertEqual(metrics, {'db', 'view', 'tpl', 'total'})
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['url_name'], 'vacancies')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+
+    def test_redirect_is_logged(self):
+        with self.assertLogs('core.requests', level='INFO') as logs:
+            self.client.get('/mycompany/')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['status'], 302)
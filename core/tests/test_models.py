@@ -1,4 +1,5 @@
 import os
+from glob import glob
 from unittest import mock
 
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -128,6 +129,8 @@ class CompanyModelTest(TestCase):
         super().tearDownClass()
         img = 'media/company_images/test.jpg'
         os.remove(img)
+        for thumbnail in glob('media/thumbs/company_images/test_*'):
+            os.remove(thumbnail)
 
     def test_name_label(self):
         company = Company.objects.get(id=1)
@@ -0,0 +1,69 @@
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Company, Specialty, Vacancy
+from core.pagecache import normalized_query
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTest(TestCase):
+    """Тестирует кэш готовых страниц для анонимных посетителей."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        Vacancy.objects.create(
+            title='vacancy', specialty=cls.specialty, company=cls.company,
+            skills='Python', description='-', salary_min=1, salary_max=2
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_is_served_from_cache_until_changes(self):
+        url = reverse('vacancies')
+        first = self.client.get(url, {'location': 'Москва', 'salary_from': ''})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'location': 'Москва'})
+        self.assertContains(second, 'vacancy')
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vacancy.objects.create(
+                title='fresh', specialty=self.specialty, company=self.company,
+                skills='Git', description='-', salary_min=1, salary_max=2
+            )
+        self.assertContains(self.client.get(url, {'location': 'Москва'}), 'fresh')
+
+    def test_search_and_main_pages(self):
+        for url, params in ((reverse('search'), {'q': 'Python'}), (reverse('main'), {})):
+            self.client.get(url, params)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url, params).status_code, 200)
+
+    def test_authenticated_users_bypass_cache(self):
+        url = reverse('vacancies')
+        self.client.get(url)
+        self.client.force_login(User.objects.create_user(username='user', password='password', first_name='Посетитель'))
+        response = self.client.get(url)
+        self.assertContains(response, 'Посетитель')
+
+    def test_pending_messages_bypass_cache(self):
+        url = reverse('vacancies')
+        self.client.get(url)
+        storage = CookieStorage(HttpRequest())
+        storage.add(messages.INFO, 'сообщение')
+        response = HttpResponse()
+        storage.update(response)
+        self.client.cookies.update(response.cookies)
+        self.assertContains(self.client.get(url), 'сообщение')
+
+    def test_normalized_query(self):
+        self.assertEqual(normalized_query(QueryDict('b=2&a=1&c=')), 'a=1&b=2')
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase
+
+from core.models import Vacancy, Specialty, Company
+from core.pagination import KeysetPaginator, cached_count
+
+
+class KeysetPaginatorTest(TestCase):
+    """Тестирует постраничный вывод по ключу."""
+
+    @classmethod
+    def setUpTestData(cls):
+        specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        company = Company.objects.create(
+            name='company_name', location='company_location',
+            description='company_description', employee_count=3
+        )
+        Vacancy.objects.bulk_create([
+            Vacancy(
+                title=f'vacancy_{number}', specialty=specialty, company=company,
+                skills='skill', description='description', salary_min=1, salary_max=10
+            )
+            for number in range(7)
+        ])
+        # Одинаковое время публикации у части вакансий проверяет сравнение по id.
+        first = Vacancy.objects.order_by('id').first()
+        Vacancy.objects.filter(id__lte=first.id + 2).update(published_at=first.published_at)
+
+    def setUp(self):
+        cache.clear()
+        self.paginator = KeysetPaginator(Vacancy.objects.all(), 3, ('-published_at', 'id'))
+        self.expected = list(Vacancy.objects.order_by('-published_at', 'id'))
+
+    def test_walk_forward_and_back(self):
+        pages = [self.paginator.get_page(QueryDict())]
+        while pages[-1].has_next():
+            pages.append(self.paginator.get_page(QueryDict(pages[-1].next_querystring)))
+        self.assertEqual([obj for page in pages for obj in page], self.expected)
+        self.assertEqual(len(pages), 3)
+        self.assertFalse(pages[0].has_previous())
+
+        previous = self.paginator.get_page(QueryDict(pages[-1].previous_querystring))
+        self.assertEqual(previous.object_list, pages[1].object_list)
+        self.assertTrue(previous.has_next())
+
+    def test_querystring_keeps_other_params(self):
+        page = self.paginator.get_page(QueryDict('q=python'))
+        self.assertEqual(QueryDict(page.next_querystring)['q'], 'python')
+
+    def test_float_rank_survives_cursor(self):
+        paginator = KeysetPaginator(Vacancy.objects.all(), 3, ('-search_rank', 'id'))
+        rank = 0.1 + 0.2
+        cursor = paginator.encode_cursor(SimpleNamespace(search_rank=rank, id=5), 'next')
+        self.assertEqual(paginator.decode_cursor(cursor), ('next', [rank, 5]))
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get('/vacancies/', {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_count(self):
+        self.assertEqual(cached_count(Vacancy.objects.all()), 7)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(Vacancy.objects.all()), 7)
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core import publish
+from core.models import Company, Skill, Specialty, Vacancy
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class PublishTest(TestCase):
+    """Тестирует карту сайта и снимки публичных страниц."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.backend = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.frontend = Specialty.objects.create(code='frontend', title='Фронтенд')
+        cls.company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        cls.vacancy = cls.create_vacancy('Python-разработчик', cls.backend, 'Python, Django')
+
+    @classmethod
+    def create_vacancy(cls, title, specialty, skills):
+        return Vacancy.objects.create(
+            title=title, specialty=specialty, company=cls.company, skills=skills,
+            description='-', salary_min=100000, salary_max=200000
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings = override_settings(SNAPSHOT_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def read(self, *names):
+        with open(os.path.join(self.root, *names), encoding='utf-8') as file:
+            return file.read()
+
+    def test_sitemap_shards(self):
+        with mock.patch.object(publish, 'SITEMAP_SHARD_SIZE', 1):
+            self.assertEqual(publish.build_sitemaps(self.root, 'https://example.com/'), (6, 0))
+            self.assertIsNone(publish.build_sitemaps(self.root, 'https://example.com'))
+
+            index = self.read('sitemap.xml')
+            self.assertEqual(index.count('<sitemap>'), 6)
+            self.assertIn('<loc>https://example.com/sitemap-skills-2.xml</loc>', index)
+            specialty = self.read('sitemap-specialties-1.xml')
+            self.assertIn('<loc>https://example.com/vacancies/cat/backend</loc>', specialty)
+            self.assertIn(f'<lastmod>{self.vacancy.published_at.isoformat()}</lastmod>', specialty)
+            self.assertNotIn('lastmod', self.read('sitemap-specialties-2.xml'))
+            self.assertNotIn(f'/vacancies/{self.vacancy.pk}<', index + specialty)
+
+            Vacancy.objects.filter(skills='Python, Django').delete()
+            Skill.objects.update(vacancy_count=0)
+            self.assertEqual(publish.build_sitemaps(self.root, 'https://example.com'), (3, 2))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'sitemap-skills-1.xml')))
+
+    def test_snapshots_refresh_changed_pages(self):
+        out = StringIO()
+        call_command('build_snapshots', output_dir=self.root, host='testserver', stdout=out)
+        self.assertIn('Отрисовано страниц: 3, изменилось файлов: 3', out.getvalue())
+        self.assertIn('Python-разработчик', self.read('vacancies', 'cat', 'backend.html'))
+        self.assertIn('Python-разработчик', self.read('vacancies', 'index.html'))
+
+        self.assertEqual(publish.build_snapshots(self.root, 'testserver'), (0, 0, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy = self.create_vacancy('Верстальщик', self.frontend, 'HTML')
+        self.assertEqual(publish.build_snapshots(self.root, 'testserver')[:2], (3, 3))
+
+        vacancy.title = 'Верстальщица'
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.save()
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'vacancies', 'cat', 'frontend.html')))
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'vacancies', 'cat', 'backend.html')))
+        self.assertEqual(publish.build_snapshots(self.root, 'testserver')[:2], (2, 2))
+        self.assertIn('Верстальщица', self.read('vacancies', 'cat', 'frontend.html'))
+        self.assertNotIn('Верстальщица', self.read('vacancies', 'cat', 'backend.html'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.frontend.delete()
+        self.assertEqual(publish.build_snapshots(self.root, 'testserver')[2], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'vacancies', 'cat', 'frontend.html')))
+
+    def test_moved_vacancy_discards_both_specialties(self):
+        publish.build_snapshots(self.root, 'testserver')
+        vacancy = Vacancy.objects.get(pk=self.vacancy.pk)
+        vacancy.specialty = self.frontend
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.save()
+        self.assertEqual(os.listdir(os.path.join(self.root, 'vacancies', 'cat')), [])
+
+        publish.build_snapshots(self.root, 'testserver')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.save()
+        self.assertEqual(publish.build_snapshots(self.root, 'testserver')[:2], (3, 3))
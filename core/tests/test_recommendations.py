@@ -0,0 +1,129 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core import matching, recommendations
+from core.models import Company, Recommendation, RecommendationTask, Resume, Specialty, Vacancy
+
+User = get_user_model()
+
+
+class RecommendationTest(TestCase):
+    """Тестирует рекомендации вакансий владельцам резюме."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.backend = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.frontend = Specialty.objects.create(code='frontend', title='Фронтенд')
+        cls.company = Company.objects.create(name='company', location='Москва', description='-', employee_count=3)
+        cls.user = User.objects.create_user(username='user', password='password')
+
+    def setUp(self):
+        cache.clear()
+        matching.index.matrix = None
+
+    def create_vacancy(self, title, specialty, skills, salary_max=200000):
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy = Vacancy.objects.create(
+                title=title, specialty=specialty, company=self.company, skills=skills,
+                description='-', salary_min=100000, salary_max=salary_max
+            )
+        recommendations.process_tasks()
+        return vacancy
+
+    def create_resume(self, user=None, specialty=None, experience='Python, Django', status='2'):
+        with self.captureOnCommitCallbacks(execute=True):
+            resume = Resume.objects.create(
+                user=user, name='name', surname='-', status=status, salary=150000, specialty=specialty or self.backend,
+                grade='2', education='-', experience=experience, description='-', portfolio='-'
+            )
+        recommendations.process_tasks()
+        return resume
+
+    def recommended(self, resume):
+        return list(resume.recommendations.order_by('-score').values_list('vacancy__title', flat=True))
+
+    def test_resume_save_builds_recommendations(self):
+        self.create_vacancy('Python-разработчик', self.backend, 'Python, Django')
+        self.create_vacancy('Go-разработчик', self.backend, 'Go')
+        self.create_vacancy('Верстальщик', self.frontend, 'HTML')
+        resume = self.create_resume()
+        self.assertEqual(self.recommended(resume), ['Python-разработчик', 'Go-разработчик'])
+
+    def test_new_vacancy_updates_affected_resumes(self):
+        resume = self.create_resume()
+        other = self.create_resume(specialty=self.frontend, experience='HTML')
+        self.create_vacancy('Python-разработчик', self.backend, 'Python')
+        self.assertEqual(self.recommended(resume), ['Python-разработчик'])
+        self.assertEqual(self.recommended(other), [])
+
+    def test_worst_recommendation_is_evicted(self):
+        resume = self.create_resume()
+        for number in range(recommendations.RECOMMENDATION_LIMIT):
+            self.create_vacancy(f'vacancy_{number}', self.backend, 'Go', salary_max=120000 + number)
+        vacancy = self.create_vacancy('Python-разработчик', self.backend, 'Python, Django')
+        self.assertEqual(resume.recommendations.count(), recommendations.RECOMMENDATION_LIMIT)
+        self.assertEqual(self.recommended(resume)[0], 'Python-разработчик')
+        self.assertNotIn('vacancy_0', self.recommended(resume))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.specialty = self.frontend
+            vacancy.skills = 'HTML'
+            vacancy.save()
+        recommendations.process_tasks()
+        self.assertNotIn('Python-разработчик', self.recommended(resume))
+
+    def test_inactive_resume_has_no_recommendations(self):
+        self.create_vacancy('Python-разработчик', self.backend, 'Python, Django')
+        resume = self.create_resume(status='0')
+        self.assertEqual(self.recommended(resume), [])
+
+    def test_saves_are_queued(self):
+        resume = self.create_resume()
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy = Vacancy.objects.create(
+                title='Python-разработчик', specialty=self.backend, company=self.company, skills='Python',
+                description='-', salary_min=100000, salary_max=200000
+            )
+            vacancy.save()
+        self.assertEqual(RecommendationTask.objects.get().object_id, vacancy.pk)
+        self.assertEqual(self.recommended(resume), [])
+
+        # Сохранение во время пересчета оставляет задачу в очереди.
+        resave = mock.Mock(side_effect=lambda pk, using: recommendations.request_recommendations('vacancy', pk))
+        with mock.patch.dict(recommendations.TASK_HANDLERS, vacancy=resave):
+            self.assertEqual(recommendations.process_tasks(), 1)
+        self.assertTrue(RecommendationTask.objects.exists())
+
+        with mock.patch.dict(recommendations.TASK_HANDLERS, vacancy=mock.Mock(side_effect=ValueError)), \
+                self.assertLogs('core.recommendations', 'ERROR'):
+            self.assertEqual(recommendations.process_tasks(), 1)
+        self.assertFalse(RecommendationTask.objects.exists())
+
+        call_command('process_recommendations', once=True, stdout=StringIO())
+        recommendations.request_recommendations('vacancy', vacancy.pk)
+        call_command('process_recommendations', once=True, stdout=StringIO())
+        self.assertEqual(self.recommended(resume), ['Python-разработчик'])
+
+    def test_my_resume_view_reads_one_query(self):
+        self.create_vacancy('Python-разработчик', self.backend, 'Python, Django')
+        resume = self.create_resume(user=self.user)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('my_resume'))
+        self.assertContains(response, 'Подходящие вакансии')
+        with self.assertNumQueries(1):
+            titles = [item.vacancy.company.name for item in response.context['recommendations'].all()]
+        self.assertEqual(titles, ['company'])
+        self.assertEqual(response.context['resume'], resume)
+
+    def test_rebuild_command(self):
+        resume = self.create_resume()
+        self.create_vacancy('Python-разработчик', self.backend, 'Python')
+        Recommendation.objects.all().delete()
+        call_command('rebuild_recommendations', verbosity=0, stdout=None)
+        self.assertEqual(self.recommended(resume), ['Python-разработчик'])
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.cache import get_or_build
+from core.middleware import ReplicaPinningMiddleware
+from core.models import Vacancy
+from core.routers import reset_pinning
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    """Тестирует маршрутизацию чтения на реплики и закрепление за основной базой."""
+
+    def setUp(self):
+        reset_pinning()
+        self.addCleanup(reset_pinning)
+        self.factory = RequestFactory()
+
+    def view(self, write=False):
+        def get_response(request):
+            if write:
+                router.db_for_write(Vacancy)
+            return HttpResponse(router.db_for_read(Vacancy))
+        return ReplicaPinningMiddleware(get_response)
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.assertEqual(router.db_for_read(Vacancy), 'replica')
+        self.assertEqual(router.db_for_write(Vacancy), 'default')
+        self.assertEqual(router.db_for_read(Vacancy), 'default')
+
+    def test_cache_is_built_from_primary(self):
+        cache.delete('routers:test')
+        self.addCleanup(cache.delete, 'routers:test')
+        self.assertEqual(get_or_build('routers:test', lambda: router.db_for_read(Vacancy)), 'default')
+        self.assertEqual(router.db_for_read(Vacancy), 'replica')
+
+    def test_related_reads_follow_instance(self):
+        vacancy = Vacancy()
+        vacancy._state.db = 'default'
+        self.assertEqual(router.db_for_read(Vacancy, instance=vacancy), 'default')
+
+    def test_no_migrations_on_replica(self):
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
+
+    def test_read_only_request_is_not_pinned(self):
+        response = self.view()(self.factory.get('/'))
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn('primary_pin', response.cookies)
+
+    def test_post_reads_from_primary(self):
+        response = self.view()(self.factory.post('/'))
+        self.assertEqual(response.content, b'default')
+        self.assertIn('primary_pin', response.cookies)
+
+    def test_post_pins_following_reads(self):
+        response = self.view(write=True)(self.factory.post('/'))
+        cookie = response.cookies['primary_pin']
+        self.assertEqual(cookie['max-age'], 5)
+
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = cookie.value
+        response = self.view()(request)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn('primary_pin', response.cookies)
+        self.assertEqual(router.db_for_read(Vacancy), 'replica')
+
+    def test_forged_or_expired_cookie_is_ignored(self):
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = 'forged'
+        self.assertEqual(self.view()(request).content, b'replica')
+        with override_settings(REPLICA_PIN_SECONDS=-1):
+            pinned = self.view(write=True)(self.factory.post('/')).cookies['primary_pin'].value
+            request = self.factory.get('/')
+            request.COOKIES['primary_pin'] = pinned
+            self.assertEqual(self.view()(request).content, b'replica')
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Vacancy, Specialty, Company
+from core.search import search_vacancies, stem, rebuild_index
+
+
+class StemTest(TestCase):
+    """Тестирует стеммер для русского языка."""
+
+    def test_word_forms_share_stem(self):
+        self.assertEqual(stem('разработчик'), stem('разработчика'))
+        self.assertEqual(stem('разработчики'), stem('разработчиков'))
+
+    def test_latin_word_is_lowercased(self):
+        self.assertEqual(stem('Python'), 'python')
+
+
+class SearchVacanciesTest(TestCase):
+    """Тестирует полнотекстовый поиск по вакансиям."""
+
+    @classmethod
+    def setUpTestData(cls):
+        specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        company = Company.objects.create(
+            name='company_name', location='company_location',
+            description='company_description', employee_count=3
+        )
+        cls.in_title = Vacancy.objects.create(
+            title='Разработчик на Python', specialty=specialty, company=company,
+            skills='Django, Git', description='<p>Офис в центре</p>',
+            salary_min=1, salary_max=10
+        )
+        cls.in_description = Vacancy.objects.create(
+            title='Тестировщик', specialty=specialty, company=company,
+            skills='Selenium', description='<p>Будем писать тесты на python</p>',
+            salary_min=1, salary_max=10
+        )
+        cls.unrelated = Vacancy.objects.create(
+            title='Дизайнер', specialty=specialty, company=company,
+            skills='Figma', description='<p>Рисуем макеты</p>',
+            salary_min=1, salary_max=10
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        return list(search_vacancies(Vacancy.objects.all(), query))
+
+    def test_search_covers_description(self):
+        self.assertIn(self.in_description, self.search('python'))
+        self.assertNotIn(self.unrelated, self.search('python'))
+
+    def test_title_ranked_above_description(self):
+        self.assertEqual(self.search('python'), [self.in_title, self.in_description])
+
+    def test_search_uses_stemming(self):
+        self.assertEqual(self.search('разработчики'), [self.in_title])
+
+    def test_index_follows_save_and_delete(self):
+        self.unrelated.skills = 'Python'
+        self.unrelated.save()
+        self.assertIn(self.unrelated, self.search('python'))
+        self.unrelated.delete()
+        self.assertEqual(len(self.search('python')), 2)
+
+    def test_rebuild_index(self):
+        self.assertEqual(rebuild_index(), 3)
+        self.assertEqual(len(self.search('python')), 2)
+
+    def test_search_view_is_ranked(self):
+        response = self.client.get(reverse('search'), {'q': 'python'})
+        self.assertEqual(list(response.context['vacancies']), [self.in_title, self.in_description])
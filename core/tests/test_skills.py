@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Vacancy, Specialty, Company, Skill
+from core.skills import parse_skills, recount_skill_counts
+
+
+class SkillTagsTest(TestCase):
+    """Тестирует теги навыков и их счетчики."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(
+            name='company_name', location='company_location',
+            description='company_description', employee_count=3
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def create_vacancy(self, skills):
+        return Vacancy.objects.create(
+            title='vacancy_title', specialty=self.specialty, company=self.company,
+            skills=skills, description='description', salary_min=1, salary_max=10
+        )
+
+    def count(self, code):
+        return Skill.objects.get(code=code).vacancy_count
+
+    def test_parse_skills(self):
+        self.assertEqual(
+            parse_skills('Python,  Git , ,python, Высоконагруженные   системы'),
+            {'python': 'Python', 'git': 'Git', 'высоконагруженные системы': 'Высоконагруженные системы'}
+        )
+
+    def test_tags_follow_skills_string(self):
+        vacancy = self.create_vacancy('Python, Git')
+        self.assertEqual(set(vacancy.skill_tags.values_list('code', flat=True)), {'python', 'git'})
+        self.create_vacancy('python')
+        self.assertEqual(self.count('python'), 2)
+
+        vacancy.skills = 'Docker'
+        vacancy.save()
+        self.assertEqual(self.count('python'), 1)
+        self.assertEqual(self.count('git'), 0)
+        self.assertEqual(self.count('docker'), 1)
+
+        vacancy.delete()
+        self.assertEqual(self.count('docker'), 0)
+
+    def test_recount_fixes_drift(self):
+        self.create_vacancy('Python')
+        Skill.objects.update(vacancy_count=100)
+        recount_skill_counts()
+        self.assertEqual(self.count('python'), 1)
+
+    def test_vacancies_by_skill_view(self):
+        self.create_vacancy('Python, Git')
+        self.create_vacancy('Git')
+        response = self.client.get(reverse('vacancies_by_skill', kwargs={'code': 'python'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['vacancies']), 1)
+        self.assertEqual(response.context['total_count'], 1)
+        self.assertEqual(response.context['skill_facets'][0].code, 'git')
+
+        response = self.client.get(reverse('vacancies_by_skill', kwargs={'code': 'cobol'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,47 @@
+import gzip
+import shutil
+import tempfile
+
+import brotli
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core.storage import CompressedManifestStaticFilesStorage
+
+
+class CompressedManifestStorageTest(SimpleTestCase):
+    """Тестирует хэшированные имена и сжатые копии статических файлов."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.location, base_url='/static/')
+
+    def collect(self, files):
+        for name, content in files.items():
+            self.storage._save(name, ContentFile(content))
+        paths = {name: (self.storage, name) for name in files}
+        return list(self.storage.post_process(paths))
+
+    def test_hashed_files_are_compressed(self):
+        css = b'body { color: black; }\n' * 100
+        self.collect({'css/site.css': css, 'img/logo.png': b'\x89PNG' * 200})
+        hashed_name = self.storage.stored_name('css/site.css')
+        self.assertNotEqual(hashed_name, 'css/site.css')
+        with self.storage.open(hashed_name + '.gz') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), css)
+        with self.storage.open(hashed_name + '.br') as compressed:
+            self.assertEqual(brotli.decompress(compressed.read()), css)
+        self.assertFalse(self.storage.exists(self.storage.stored_name('img/logo.png') + '.gz'))
+
+    def test_small_files_are_not_compressed(self):
+        self.collect({'js/tiny.js': b'var a = 1;'})
+        self.assertFalse(self.storage.exists(self.storage.stored_name('js/tiny.js') + '.gz'))
+
+    def test_recollect_overwrites_compressed_files(self):
+        css = b'p { margin: 0; }\n' * 100
+        self.collect({'css/site.css': css})
+        self.collect({'css/site.css': css})
+        hashed_name = self.storage.stored_name('css/site.css')
+        with self.storage.open(hashed_name + '.gz') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), css)
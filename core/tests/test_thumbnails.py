@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core.models import Company
+from core.thumbnails import delete_variants, generate_variants, thumbnail_url, variant_name
+
+
+def make_image(name='logo.png', size=(400, 200), mode='RGBA'):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 30, 30, 255) if mode == 'RGBA' else (200, 30, 30)).save(
+        buffer, 'PNG' if name.endswith('.png') else 'JPEG'
+    )
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class ThumbnailTest(TestCase):
+    """Тестирует создание уменьшенных копий изображений"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root)
+
+    def create_company(self, logo):
+        return Company.objects.create(
+            name='company', location='location', description='description', employee_count=1, logo=logo
+        )
+
+    def test_variant_name(self):
+        self.assertEqual(variant_name('company_images/a.jpeg', 'card'), 'thumbs/company_images/a_card.jpg')
+        self.assertEqual(variant_name('/company_images/a.png', 'card', 'WEBP'), 'thumbs/company_images/a_card.webp')
+
+    def test_variants_created_on_save(self):
+        company = self.create_company(make_image())
+        storage = company.logo.storage
+        for variant, size in (('card', (130, 80)), ('logo', (150, 150))):
+            for image_format in ('PNG', 'WEBP'):
+                with storage.open(variant_name(company.logo.name, variant, image_format)) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size, size)
+
+    def test_jpeg_variant_is_smaller_than_original(self):
+        company = self.create_company(make_image('photo.jpg', (2000, 1500), 'RGB'))
+        storage = company.logo.storage
+        self.assertLess(
+            storage.size(variant_name(company.logo.name, 'card')), storage.size(company.logo.name)
+        )
+
+    def test_existing_variants_not_regenerated(self):
+        company = self.create_company(make_image())
+        self.assertEqual(generate_variants(company.logo), 0)
+        self.assertEqual(generate_variants(company.logo, force=True), 4)
+
+    def test_delete_variants(self):
+        company = self.create_company(make_image())
+        delete_variants(company.logo)
+        self.assertFalse(company.logo.storage.exists(variant_name(company.logo.name, 'card')))
+
+    def test_replaced_image_variants_deleted(self):
+        company = self.create_company(make_image())
+        shared = self.create_company(make_image('shared.png'))
+        self.create_company(shared.logo.name)
+        old_name, shared_name = company.logo.name, shared.logo.name
+
+        for obj in (Company.objects.get(pk=company.pk), Company.objects.get(pk=shared.pk)):
+            obj.logo = make_image('new.png')
+            obj.save()
+        storage = company.logo.storage
+        self.assertFalse(storage.exists(variant_name(old_name, 'card')))
+        self.assertFalse(storage.exists(variant_name(old_name, 'logo', 'WEBP')))
+        self.assertTrue(storage.exists(variant_name(shared_name, 'card')))
+
+    def test_thumbnail_url(self):
+        company = self.create_company(make_image())
+        self.assertEqual(thumbnail_url(company.logo, 'card'), f'/media/{variant_name(company.logo.name, "card")}')
+        self.assertTrue(thumbnail_url(company.logo, 'card', 'webp').endswith('_card.webp'))
+        self.assertEqual(thumbnail_url(company.logo, 'unknown'), company.logo.url)
+
+    def test_thumbnail_url_for_remote_and_empty_files(self):
+        company = self.create_company('https://example.com/logo.png')
+        self.assertEqual(thumbnail_url(company.logo, 'card'), 'https://example.com/logo.png')
+        company.logo = ''
+        self.assertEqual(thumbnail_url(company.logo, 'card'), '')
+
+    def test_template_tag(self):
+        company = self.create_company(make_image())
+        rendered = Template(
+            "{% load user_tags %}{% thumbnail logo 'card' 'webp' %} {% thumbnail logo 'card' %}"
+        ).render(Context({'logo': company.logo}))
+        self.assertEqual(rendered, f"{thumbnail_url(company.logo, 'card', 'webp')} {thumbnail_url(company.logo, 'card')}")
+
+    def test_generate_thumbnails_command(self):
+        company = self.create_company(make_image())
+        self.create_company(company.logo.name)
+        delete_variants(company.logo)
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+        self.assertIn('4 файлов создано для 1 изображений', out.getvalue())
+        self.assertTrue(company.logo.storage.exists(variant_name(company.logo.name, 'card', 'WEBP')))
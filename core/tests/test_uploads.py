@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import publish, uploads
+from core.models import Company, RecommendationTask, Skill, Specialty, Vacancy
+
+User = get_user_model()
+
+CSV_HEADER = 'title,specialty,skills,description,salary_min,salary_max\n'
+
+
+class VacancyUploadTest(TestCase):
+    """Тестирует загрузку вакансий компании из файла."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='password')
+        cls.specialty = Specialty.objects.create(code='backend', title='Бэкенд')
+        cls.company = Company.objects.create(
+            name='company', location='Москва', description='-', employee_count=3, owner=cls.owner
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def upload(self, name, content):
+        if isinstance(content, str):
+            content = content.encode()
+        return self.client.post(reverse('upload_vacancies'), {'file': SimpleUploadedFile(name, content)})
+
+    def json_rows(self, count):
+        return [
+            {'title': f'vacancy_{number}', 'specialty': 'backend', 'skills': 'Python, Django',
+             'description': '-', 'salary_min': 100000, 'salary_max': 200000}
+            for number in range(count)
+        ]
+
+    def test_csv_report(self):
+        content = '\ufeff' + CSV_HEADER + (
+            'Python-разработчик,backend,"Python, Django","Пишем\nсервисы",100000,200000\n'
+            'Без зарплаты,backend,Python,-,,200000\n'
+            'Неизвестная,frontend,Python,-,100000,200000\n'
+            'Go-разработчик,backend,Go,-,150000,250000\n'
+        )
+        response = self.upload('vacancies.csv', content)
+        report = response.context['report']
+        self.assertEqual((report.rows, report.created, report.error_count), (4, 2, 2))
+        self.assertEqual([row for row, _ in report.errors], [2, 3])
+        self.assertIn('Зарплата от', report.errors[0][1][0])
+        self.assertIn('Специализация', report.errors[1][1][0])
+        self.assertEqual(Vacancy.objects.get(title='Python-разработчик').description, 'Пишем\nсервисы')
+
+        self.company.refresh_from_db()
+        self.specialty.refresh_from_db()
+        self.assertEqual((self.company.vacancy_count, self.specialty.vacancy_count), (2, 2))
+        self.assertEqual(Skill.objects.get(code='python').vacancy_count, 1)
+        self.assertEqual(
+            set(Vacancy.objects.get(title='Go-разработчик').skill_tags.values_list('code', flat=True)), {'go'}
+        )
+
+    def test_json_array_in_batches(self):
+        content = json.dumps(self.json_rows(7) + [['not', 'an', 'object']], ensure_ascii=False, indent=2)
+        with mock.patch.object(uploads, 'BATCH_SIZE', 3), mock.patch.object(uploads, 'READ_SIZE', 16):
+            report = self.upload('vacancies.json', content).context['report']
+        self.assertEqual((report.created, report.error_count, report.fatal_error), (7, 1, None))
+        self.assertEqual(Vacancy.objects.filter(company=self.company).count(), 7)
+        self.assertEqual(Skill.objects.get(code='django').vacancy_count, 7)
+
+    def test_json_lines(self):
+        content = '\n'.join(json.dumps(row) for row in self.json_rows(3))
+        with mock.patch.object(uploads, 'READ_SIZE', 10):
+            report = self.upload('vacancies.jsonl', content).context['report']
+        self.assertEqual(report.created, 3)
+
+    def test_broken_file_keeps_loaded_batches(self):
+        content = json.dumps(self.json_rows(4))[:-40]
+        with mock.patch.object(uploads, 'BATCH_SIZE', 2):
+            report = self.upload('vacancies.json', content).context['report']
+        self.assertEqual(report.created, 3)
+        self.assertIn('Ошибка JSON', report.fatal_error)
+
+        report = self.upload('vacancies.csv', CSV_HEADER.encode() + 'Вакансия'.encode('cp1251')).context['report']
+        self.assertIn('UTF-8', report.fatal_error)
+
+    def test_rows_are_validated_without_queries_per_row(self):
+        content = CSV_HEADER + 'Вакансия,backend,Python,-,100000,200000\n' * 20
+        rows = uploads.iter_rows(SimpleUploadedFile('vacancies.csv', content.encode()))
+        with self.assertNumQueries(19):
+            report = uploads.import_vacancies(self.company, rows)
+        self.assertEqual(report.created, 20)
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def test_uploaded_vacancies_are_published(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        frontend = Specialty.objects.create(code='frontend', title='Фронтенд')
+        with override_settings(SNAPSHOT_ROOT=root):
+            publish.build_snapshots(root, 'testserver')
+            with self.captureOnCommitCallbacks(execute=True):
+                report = self.upload('vacancies.json', json.dumps(self.json_rows(2))).context['report']
+        self.assertEqual(report.created, 2)
+        self.assertEqual(
+            set(RecommendationTask.objects.filter(kind='vacancy').values_list('object_id', flat=True)),
+            set(Vacancy.objects.values_list('pk', flat=True))
+        )
+        self.assertFalse(os.path.exists(publish.snapshot_file(root, '/vacancies/cat/backend')))
+        self.assertFalse(os.path.exists(publish.snapshot_file(root, '/vacancies/')))
+        self.assertTrue(os.path.exists(publish.snapshot_file(root, f'/vacancies/cat/{frontend.code}')))
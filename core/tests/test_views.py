@@ -1,10 +1,11 @@
-from django.db.models import QuerySet
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
 from core.forms import ApplicationForm
 from core.management.commands import db_dump, makesuperuser
 from core.models import Vacancy
+from core.pagination import KeysetPage
 
 
 class ViewsTest(TestCase):
@@ -17,6 +18,9 @@ class ViewsTest(TestCase):
         super_user_command = makesuperuser.Command()
         super_user_command.handle()
 
+    def setUp(self):
+        cache.clear()
+
     def test_main_view(self):
         response = self.client.get('')
         self.assertEqual(response.status_code, 200)
@@ -30,18 +34,20 @@ class ViewsTest(TestCase):
         response = self.client.get(reverse('search'), {'q': 'Python'})
         self.assertEqual(response.status_code, 200)
         self.assertIsNotNone(response.context['vacancies'])
-        self.assertIsInstance(response.context['vacancies'], QuerySet)
+        self.assertIsInstance(response.context['page_obj'], KeysetPage)
+        self.assertEqual(len(response.context['vacancies']), response.context['total_count'])
 
     def test_vacancies_list_view(self):
         response = self.client.get(reverse('vacancies'))
         self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.context['vacancies'], QuerySet)
+        self.assertIsInstance(response.context['page_obj'], KeysetPage)
+        self.assertEqual(response.context['total_count'], 5)
         self.assertTemplateUsed(response, 'core/vacancies.html')
 
     def test_vacancies_by_specialty_view(self):
         response = self.client.get(reverse('vacancies_by_specialties', kwargs={'code': 'backend'}))
         self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.context['vacancies'], QuerySet)
+        self.assertIsInstance(response.context['page_obj'], KeysetPage)
         self.assertEqual(len(response.context['vacancies']), 5)
         self.assertTemplateUsed(response, 'core/vacancies.html')
 
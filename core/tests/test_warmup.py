@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core import signals
+from django.core.wsgi import get_wsgi_application
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+
+from core.models import Specialty
+from core import matching
+from core.warmup import build_matching_index, compile_templates, populate_urls, template_names, warm_request
+
+
+class WarmupTest(TestCase):
+    """Тестирует прогрев процесса перед приемом запросов."""
+
+    def test_compile_templates(self):
+        names = list(template_names())
+        self.assertIn('core/index.html', names)
+        self.assertIn('inc/_pagination.html', names)
+        count, errors = compile_templates()
+        self.assertEqual(errors, [])
+        self.assertEqual(count, len(names))
+
+    def test_populate_urls(self):
+        self.assertGreater(populate_urls(), 20)
+
+    def test_build_matching_index(self):
+        self.addCleanup(setattr, matching.index, 'matrix', None)
+        self.assertEqual(build_matching_index(), 0)
+        self.assertIsNotNone(matching.index.matrix)
+
+    @override_settings(MIDDLEWARE=[name for name in settings.MIDDLEWARE if not name.startswith('debug_toolbar')])
+    def test_warm_request(self):
+        # WSGIHandler закрывает соединение в начале и конце запроса, что
+        # прервало бы транзакцию теста; тестовый клиент делает так же.
+        for signal in (signals.request_started, signals.request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        Specialty.objects.create(code='backend', title='Бэкенд')
+        status, elapsed = warm_request(get_wsgi_application(), '/vacancies/')
+        self.assertEqual(status, 200)
+        self.assertGreater(elapsed, 0)
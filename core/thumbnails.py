@@ -0,0 +1,149 @@
+"""Уменьшенные копии загруженных изображений.
+
+Для каждого поля-картинки задан набор вариантов фиксированного размера.
+Варианты сохраняются рядом с оригиналом в каталоге thumbs/ в исходном
+формате и в WebP. Имя варианта однозначно выводится из имени оригинала,
+поэтому шаблонному тегу thumbnail не нужно обращаться к файловой системе.
+Варианты создаются сигналом post_save и командой generate_thumbnails,
+варианты замененной картинки удаляются тем же сигналом.
+"""
+import os
+from collections import namedtuple
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+Variant = namedtuple('Variant', ['width', 'height', 'crop'])
+
+VARIANTS = {
+    'core.Company.logo': {
+        'card': Variant(130, 80, crop=False),
+        'logo': Variant(150, 150, crop=False),
+    },
+    'core.Resume.photo': {
+        'card': Variant(130, 80, crop=True),
+        'detail': Variant(190, 150, crop=True),
+        'preview': Variant(120, 120, crop=False),
+    },
+    'core.Specialty.picture': {
+        'icon': Variant(80, 80, crop=False),
+    },
+}
+THUMBNAILS_DIR = 'thumbs'
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 6},
+}
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+
+def field_variants(field_file):
+    field = field_file.field
+    return VARIANTS.get(f'{field.model._meta.label}.{field.name}', {})
+
+
+def image_fields(instance):
+    """Поля-картинки объекта, для которых заданы варианты."""
+
+    label = instance._meta.label
+    return [
+        getattr(instance, key.rsplit('.', 1)[1])
+        for key in VARIANTS if key.rsplit('.', 1)[0] == label
+    ]
+
+
+def is_local(name):
+    return bool(name) and not name.startswith(('http://', 'https://'))
+
+
+def source_format(name):
+    extension = os.path.splitext(name)[1].lower()
+    return 'JPEG' if extension in ('.jpg', '.jpeg') else 'PNG'
+
+
+def variant_name(name, variant, image_format=None):
+    """Имя файла варианта: thumbs/<путь оригинала>_<вариант>.<расширение>."""
+
+    root = os.path.splitext(name.lstrip('/'))[0]
+    image_format = image_format or source_format(name)
+    return f'{THUMBNAILS_DIR}/{root}_{variant}{EXTENSIONS[image_format]}'
+
+
+def thumbnail_url(field_file, variant, image_format=None):
+    """URL варианта изображения. Для внешних ссылок возвращается сама ссылка."""
+
+    name = field_file.name if field_file else ''
+    if not is_local(name):
+        return name or ''
+    if variant not in field_variants(field_file):
+        return field_file.url
+    return field_file.storage.url(variant_name(name, variant, image_format and image_format.upper()))
+
+
+def resize(image, variant, image_format):
+    if variant.crop:
+        return ImageOps.fit(image, (variant.width, variant.height), Image.LANCZOS)
+    image = ImageOps.contain(image, (variant.width, variant.height), Image.LANCZOS)
+    transparent = image_format != 'JPEG' and image.mode in ('RGBA', 'LA', 'P')
+    canvas = Image.new(
+        'RGBA' if transparent else 'RGB', (variant.width, variant.height),
+        (255, 255, 255, 0) if transparent else (255, 255, 255)
+    )
+    canvas.paste(
+        image.convert('RGBA') if transparent else image.convert('RGB'),
+        ((variant.width - image.width) // 2, (variant.height - image.height) // 2)
+    )
+    return canvas
+
+
+def encode(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **SAVE_OPTIONS[image_format])
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(field_file, force=False):
+    """Создает все варианты изображения. Возвращает число записанных файлов."""
+
+    name = field_file.name if field_file else ''
+    variants = field_variants(field_file)
+    if not is_local(name) or not variants:
+        return 0
+    storage = field_file.storage
+    base_format = source_format(name)
+    if not force and storage.exists(variant_name(name, next(iter(variants)), base_format)):
+        return 0
+    if not storage.exists(name.lstrip('/')):
+        return 0
+
+    with storage.open(name.lstrip('/')) as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+
+    written = 0
+    for variant_key, variant in variants.items():
+        for image_format in (base_format, 'WEBP'):
+            target = variant_name(name, variant_key, image_format)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, encode(resize(image, variant, image_format), image_format))
+            written += 1
+    return written
+
+
+def delete_variants(field_file, name=None):
+    """Удаляет варианты изображения field_file или, если задано name,
+    прежнего файла этого поля."""
+
+    name = name or (field_file.name if field_file else '')
+    if not is_local(name):
+        return
+    for variant_key in field_variants(field_file):
+        for image_format in (source_format(name), 'WEBP'):
+            target = variant_name(name, variant_key, image_format)
+            if field_file.storage.exists(target):
+                field_file.storage.delete(target)
@@ -0,0 +1,170 @@
+"""Загрузка вакансий компании из файла.
+
+Файл CSV или JSON читается построчно: CSV через csv.DictReader поверх
+текстовой обертки загруженного файла, JSON — как JSON Lines (объект на
+строку) или массив объектов, который разбирается по одному элементу
+через JSONDecoder.raw_decode. В памяти держится только текущая пачка
+из BATCH_SIZE строк.
+
+Каждая строка проверяется по правилам VacancyForm (BulkVacancyForm),
+специализации загружаются один раз. Прошедшие проверку строки пачки
+вставляются через bulk_create_vacancies в отдельной транзакции, так что
+ошибка в конце файла не отменяет уже загруженные пачки. Отчет содержит
+число созданных вакансий и ошибки по номерам строк, не больше
+MAX_REPORTED_ERRORS.
+"""
+import csv
+import io
+import json
+import re
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from core.bulk import bulk_create_vacancies, count_created_vacancies, invalidate_vacancy_caches
+from core.forms import BulkVacancyForm
+from core.models import Specialty, Vacancy
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+READ_SIZE = 64 * 1024
+# Наибольший размер одного объекта JSON: больше — считаем файл поврежденным.
+MAX_ROW_SIZE = 1024 * 1024
+WHITESPACE = re.compile(r'\s*')
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+class UploadError(ValueError):
+    """Файл нельзя прочитать дальше: неверная кодировка или синтаксис."""
+
+
+class UploadReport:
+    """Итог загрузки: число созданных вакансий и ошибки строк."""
+
+    def __init__(self):
+        self.created = 0
+        self.rows = 0
+        self.errors = []
+        self.error_count = 0
+        self.fatal_error = None
+
+    def add_error(self, row, messages):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, messages))
+
+    @property
+    def hidden_errors(self):
+        return self.error_count - len(self.errors)
+
+
+@contextmanager
+def open_text(file):
+    """Текстовый поток поверх загруженного файла в UTF-8 (с BOM или без).
+    Сам загруженный файл остается открытым."""
+
+    file.seek(0)
+    stream = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield stream
+    except UnicodeDecodeError:
+        raise UploadError('Файл должен быть в кодировке UTF-8.')
+    finally:
+        stream.detach()
+
+
+def iter_csv_rows(file):
+    with open_text(file) as stream:
+        try:
+            yield from csv.DictReader(stream)
+        except csv.Error as error:
+            raise UploadError(f'Ошибка CSV: {error}.')
+
+
+def iter_json_rows(file):
+    """Элементы JSON-массива или объекты JSON Lines по одному. Буфер
+    дочитывается, пока текущий элемент не разберется целиком."""
+
+    decoder = json.JSONDecoder()
+    with open_text(file) as stream:
+        chunks = iter(lambda: stream.read(READ_SIZE), '')
+        buffer, position, array = '', 0, None
+        while True:
+            position = (SEPARATORS if array else WHITESPACE).match(buffer, position).end()
+            if position == len(buffer):
+                buffer, position = next(chunks, ''), 0
+                if buffer:
+                    continue
+                if array:
+                    raise UploadError('Ошибка JSON: массив не закрыт.')
+                return
+            if array is None:
+                array = buffer[position] == '['
+                position += array
+                continue
+            if array and buffer[position] == ']':
+                return
+            try:
+                row, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                chunk = next(chunks, '') if len(buffer) - position < MAX_ROW_SIZE else ''
+                if not chunk:
+                    raise UploadError(f'Ошибка JSON: {error.msg}, позиция {error.pos}.')
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield row
+
+
+def iter_rows(file):
+    if file.name.lower().endswith(('.json', '.jsonl')):
+        return iter_json_rows(file)
+    return iter_csv_rows(file)
+
+
+def save_batch(vacancies, using):
+    with transaction.atomic(using=using):
+        bulk_create_vacancies(vacancies, using, BATCH_SIZE)
+        count_created_vacancies(vacancies, using)
+
+
+def import_vacancies(company, rows, using='default'):
+    """Проверяет и вставляет вакансии компании из rows — словарей с полями
+    VacancyForm. Возвращает UploadReport."""
+
+    report = UploadReport()
+    specialties = {specialty.code: specialty for specialty in Specialty.objects.using(using)}
+    # Одна форма на все строки: создание формы копирует все поля и стоит
+    # дороже самой проверки. full_clean заново заполняет errors и cleaned_data.
+    form = BulkVacancyForm({}, specialties=specialties)
+    batch, vacancy_pks, specialty_pks = [], [], set()
+    try:
+        for number, row in enumerate(rows, start=1):
+            report.rows = number
+            if not isinstance(row, dict):
+                report.add_error(number, ['Строка должна быть объектом с полями вакансии.'])
+                continue
+            form.data, form.instance = row, Vacancy(company=company)
+            form.full_clean()
+            if form.errors:
+                report.add_error(number, [
+                    f'{form.fields[field].label}: {message}' if field in form.fields else message
+                    for field, messages in form.errors.items() for message in messages
+                ])
+                continue
+            batch.append(form.instance)
+            if len(batch) >= BATCH_SIZE:
+                save_batch(batch, using)
+                report.created += len(batch)
+                vacancy_pks.extend(vacancy.pk for vacancy in batch)
+                specialty_pks.update(vacancy.specialty_id for vacancy in batch)
+                batch = []
+    except UploadError as error:
+        report.fatal_error = str(error)
+    if batch:
+        save_batch(batch, using)
+        report.created += len(batch)
+        vacancy_pks.extend(vacancy.pk for vacancy in batch)
+        specialty_pks.update(vacancy.specialty_id for vacancy in batch)
+    if report.created:
+        invalidate_vacancy_caches(vacancy_pks, specialty_pks, using)
+    return report
@@ -9,9 +9,11 @@ handler500 = views.custom_handler500
 urlpatterns = [
     path('', views.MainView.as_view(), name='main'),
     path('search/', views.SearchView.as_view(), name='search'),
+    path('search/autocomplete', views.AutocompleteView.as_view(), name='autocomplete'),
 
     path('vacancies/', views.VacanciesList.as_view(), name='vacancies'),
     path('vacancies/cat/<str:code>', views.VacanciesBySpecialties.as_view(), name='vacancies_by_specialties'),
+    path('vacancies/skill/<path:code>', views.VacanciesBySkill.as_view(), name='vacancies_by_skill'),
     path('vacancies/<int:pk>', views.VacancyDetail.as_view(), name='vacancy_detail'),
 
     path('companies/', views.CompaniesList.as_view(), name='companies'),
@@ -26,7 +28,10 @@ urlpatterns = [
 
     path('mycompany/vacancies', views.MyVacanciesView.as_view(), name='my_vacancies'),
     path('mycompany/vacancies/<int:pk>', views.MyVacancyView.as_view(), name='my_vacancy'),
+    path('mycompany/vacancies/<int:pk>/applications.csv', views.MyVacancyApplicationsExport.as_view(),
+         name='my_vacancy_applications'),
     path('mycompany/vacancies/create', views.CreateVacancyView.as_view(), name='create_vacancy'),
+    path('mycompany/vacancies/upload', views.UploadVacanciesView.as_view(), name='upload_vacancies'),
 
     path('myresume/', views.MyResumeView.as_view(), name='my_resume'),
     path('myresume/letsstart', views.MyResumeStartView.as_view(), name='lets_start_resume'),
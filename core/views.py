@@ -1,59 +1,218 @@
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Count, Q
-from django.http import HttpResponseBadRequest, HttpResponseServerError
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.http import Http404, HttpResponseBadRequest, HttpResponseServerError, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse_lazy
-from django.views.generic import TemplateView, ListView, DetailView, CreateView, UpdateView
-
-from core.forms import SignupForm, ApplicationForm, CompanyForm, VacancyForm, ResumeForm
-from core.models import Specialty, Company, Vacancy, Resume, Application
+from django.views.decorators.http import condition
+from django.views.generic import View, TemplateView, ListView, DetailView, CreateView, UpdateView, FormView
+
+from core.autocomplete import MAX_SUGGESTIONS, suggest
+from core.cache import HOMEPAGE_NAMESPACE, get_or_build, namespace_version, namespaced_key
+from core.conditional import LISTINGS_NAMESPACE, has_pending_messages, listing_etag, make_etag
+from core.exports import application_lines
+from core.filters import facet_choices, facet_counts, facet_groups, filter_conditions, combine
+from core.fragments import CARDS_NAMESPACE
+from core.intake import enqueue_application
+from core.matching import matching_resumes
+from core.forms import SignupForm, ApplicationForm, CompanyForm, VacancyForm, ResumeForm, VacancyFilterForm, VacancyUploadForm
+from core.models import Specialty, Company, Vacancy, Resume, Application, Skill
+from core.pagecache import cached_page, is_cacheable_request, page_key, store_page
+from core.pagination import InvalidCursor, KeysetPaginationMixin, KeysetPaginator
+from core.recommendations import RECOMMENDATION_LIMIT
+from core.routers import pin_primary
+from core.search import search_vacancies
+from core.uploads import import_vacancies, iter_rows
 
 User = get_user_model()
 
 
-class MainView(TemplateView):
+def popular_skills(limit):
+    """Названия самых востребованных навыков для примеров поиска."""
+
+    return list(Skill.objects.filter(vacancy_count__gt=0).values_list('name', flat=True)[:limit])
+
+
+class SkillFacetsMixin:
+    """Добавляет в контекст самые популярные навыки с количеством вакансий."""
+
+    skill_facets_limit = 20
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['skill_facets'] = Skill.objects.filter(vacancy_count__gt=0)[:self.skill_facets_limit]
+        return context
+
+
+class VacancyFilterMixin:
+    """Фильтрует список вакансий по параметрам строки запроса и добавляет
+    в контекст фасеты с количеством вакансий."""
+
+    facets = ('specialty', 'location', 'salary', 'age')
+
+    def get_filters(self):
+        if not hasattr(self, '_filters'):
+            filters = VacancyFilterForm(self.request.GET).get_filters()
+            if 'specialty' not in self.facets:
+                filters.pop('specialty', None)
+            self._filters = filters
+        return self._filters
+
+    def get_base_queryset(self):
+        return super().get_queryset()
+
+    def get_queryset(self):
+        self.base_queryset = self.get_base_queryset()
+        return self.base_queryset.filter(combine(filter_conditions(self.get_filters(), facet_choices())))
+
+    def get_facet_counts(self):
+        if not hasattr(self, '_facet_counts'):
+            self._facet_counts = facet_counts(
+                self.base_queryset, self.facets, self.get_filters(), facet_choices()
+            )
+        return self._facet_counts
+
+    def get_total_count(self):
+        return self.get_facet_counts()['total']
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['filter_groups'] = facet_groups(
+            self.facets, self.get_filters(), facet_choices(), self.get_facet_counts(), self.request.GET
+        )
+        context['filters_active'] = bool(self.get_filters())
+        return context
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на GET-запросы, если валидаторы страницы совпали с
+    присланными клиентом. Валидаторы считаются до основного запроса
+    представления; None означает, что валидатора нет. Last-Modified не
+    различает пользователей, поэтому его задают только страницы, одинаковые
+    для всех, а пока есть непоказанные сообщения, он не выдается."""
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return None
+
+    def _last_modified(self, request, *args, **kwargs):
+        if has_pending_messages(request):
+            return None
+        return self.get_last_modified(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        handler = super().dispatch
+        if request.method in ('GET', 'HEAD'):
+            handler = condition(etag_func=self.get_etag, last_modified_func=self._last_modified)(handler)
+        return handler(request, *args, **kwargs)
+
+
+class ListingConditionalGetMixin(ConditionalGetMixin):
+    def get_etag(self, request, *args, **kwargs):
+        return listing_etag(request)
+
+
+class AnonymousPageCacheMixin:
+    """Отдает анонимным посетителям готовую страницу из кэша. Страницы
+    сбрасываются увеличением версии пространства page_cache_namespace."""
+
+    page_cache_namespace = LISTINGS_NAMESPACE
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_key(request, self.page_cache_namespace)
+        response = cached_page(key)
+        if response is not None:
+            return response
+        # Страница попадет в кэш, поэтому до конца запроса, включая отрисовку
+        # шаблона, данные читаются с основной базы, а не с отстающей реплики.
+        pin_primary()
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.add_post_render_callback(lambda rendered: store_page(key, request, rendered))
+            return response
+        return store_page(key, request, response)
+
+
+class MainView(AnonymousPageCacheMixin, TemplateView):
     """Вывод главной страницы."""
 
     template_name = 'core/index.html'
+    page_cache_namespace = HOMEPAGE_NAMESPACE
 
-    def get_context_data(self, **kwargs):
-        specialties = Specialty.objects.all().annotate(vacancy_count=Count('vacancies'))
-        companies = Company.objects.all().annotate(vacancy_count=Count('vacancies'))[:8]
+    @staticmethod
+    def build_context():
+        specialties = Specialty.objects.all()
+        companies = Company.objects.all()[:8]
 
-        vacancy = Vacancy.objects.first()
-        examples_for_search = vacancy.skills.split(', ')[:4]
+        examples_for_search = popular_skills(4)
 
         return {
-            'specialties': specialties,
-            'companies': companies,
+            'specialties': list(specialties),
+            'companies': list(companies),
             'examples': examples_for_search,
         }
 
+    def get_context_data(self, **kwargs):
+        return get_or_build(
+            namespaced_key(HOMEPAGE_NAMESPACE, 'context'), self.build_context
+        )
+
 
-class VacanciesList(ListView):
+class VacanciesList(ListingConditionalGetMixin, AnonymousPageCacheMixin, SkillFacetsMixin, VacancyFilterMixin,
+                    KeysetPaginationMixin, ListView):
     """Вывод страницы со списком всех вакансий."""
 
     model = Vacancy
     template_name = 'core/vacancies.html'
     queryset = Vacancy.objects.select_related('specialty', 'company')
     context_object_name = 'vacancies'
+    keyset_ordering = ('-published_at', 'id')
 
 
-class VacanciesBySpecialties(ListView):
+class VacanciesBySpecialties(ListingConditionalGetMixin, AnonymousPageCacheMixin, SkillFacetsMixin, VacancyFilterMixin,
+                             KeysetPaginationMixin, ListView):
     """Вывод страницы со списком вакансий по категориям."""
 
     model = Vacancy
     template_name = 'core/vacancies.html'
     context_object_name = 'vacancies'
+    keyset_ordering = ('-published_at', 'id')
+    facets = ('location', 'salary', 'age')
 
-    def get_queryset(self):
+    def get_base_queryset(self):
+        specialty_pks = [pk for code, title, pk in facet_choices()['specialty'] if code == self.kwargs['code']]
+        return Vacancy.objects.filter(
+            specialty_id__in=specialty_pks).select_related('specialty', 'company')
+
+
+class VacanciesBySkill(ListingConditionalGetMixin, AnonymousPageCacheMixin, SkillFacetsMixin, VacancyFilterMixin,
+                       KeysetPaginationMixin, ListView):
+    """Вывод страницы со списком вакансий, требующих навык."""
+
+    model = Vacancy
+    template_name = 'core/vacancies.html'
+    context_object_name = 'vacancies'
+    keyset_ordering = ('-published_at', 'id')
+
+    def get_base_queryset(self):
+        self.skill = get_object_or_404(Skill, code=self.kwargs['code'])
         return Vacancy.objects.filter(
-            specialty__code=self.kwargs['code']).select_related('specialty', 'company')
+            skill_tags=self.skill).select_related('specialty', 'company')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['skill'] = self.skill
+        return context
 
 
-class VacancyDetail(LoginRequiredMixin, DetailView, CreateView):
+class VacancyDetail(LoginRequiredMixin, ConditionalGetMixin, DetailView, CreateView):
     """Вывод страницы с полным описанием вакансии и формой для заполнения отклика."""
 
     template_name = 'core/vacancy.html'
@@ -63,19 +222,56 @@ class VacancyDetail(LoginRequiredMixin, DetailView, CreateView):
     form_class = ApplicationForm
     success_url = reverse_lazy('vacancies')
 
-    def form_valid(self, form):
-        form.instance.vacancy = self.get_object()
-        form.instance.user = self.request.user
-        return super(VacancyDetail, self).form_valid(form)
-
+    def get_modification_times(self):
+        if not hasattr(self, '_modification_times'):
+            self._modification_times = Vacancy.objects.filter(pk=self.kwargs['pk']).values_list(
+                'updated_at', 'company__updated_at'
+            ).first()
+        return self._modification_times
+
+    def get_etag(self, request, *args, **kwargs):
+        # Без Last-Modified: время изменения одинаково для всех пользователей
+        # и не знает о непоказанных сообщениях, а ETag учитывает и то и другое.
+        times = self.get_modification_times()
+        if not times:
+            return None
+        # Ссылка «Назад» на странице ведет на HTTP_REFERER.
+        return make_etag(request, *times, namespace_version(CARDS_NAMESPACE), request.META.get('HTTP_REFERER'))
 
-class CompanyDetail(LoginRequiredMixin, DetailView):
+    def form_valid(self, form):
+        vacancy_pk = self.kwargs['pk']
+        if not Vacancy.objects.filter(pk=vacancy_pk).exists():
+            raise Http404
+        # Отклик записывает в базу команда process_applications, если очередь не заполнена.
+        if not enqueue_application(self.request.user.pk, vacancy_pk, form.cleaned_data):
+            form.instance.vacancy_id = vacancy_pk
+            form.instance.user = self.request.user
+            try:
+                with transaction.atomic():
+                    form.save()
+            except IntegrityError:
+                # Отклик этого пользователя на вакансию уже записан: повторная отправка формы.
+                pass
+        messages.success(self.request, 'Отклик отправлен.')
+        return redirect(self.success_url)
+
+
+class CompanyDetail(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """Вывод страницы описания компании."""
 
     template_name = 'core/company.html'
     model = Company
     context_object_name = 'company'
 
+    def get_etag(self, request, *args, **kwargs):
+        # Без Last-Modified: удаление вакансии не меняет ни одно время изменения.
+        state = Company.objects.filter(pk=self.kwargs['pk']).values_list(
+            'updated_at', 'vacancy_count'
+        ).annotate(last_vacancy=Max('vacancies__updated_at')).first()
+        if not state:
+            return None
+        return make_etag(request, *state, namespace_version(CARDS_NAMESPACE))
+
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
         context['vacancies'] = self.object.vacancies.select_related(
@@ -162,8 +358,7 @@ class MyVacanciesView(LoginRequiredMixin, CreateCompanyRequiredMixin, ListView):
     context_object_name = 'vacancies'
 
     def get_queryset(self):
-        return Vacancy.objects.prefetch_related(
-                'applications').filter(company=self.request.user.company)
+        return Vacancy.objects.filter(company=self.request.user.company)
 
 
 class MyVacancyView(LoginRequiredMixin, CreateCompanyRequiredMixin, UpdateView):
@@ -173,18 +368,22 @@ class MyVacancyView(LoginRequiredMixin, CreateCompanyRequiredMixin, UpdateView):
     form_class = VacancyForm
     context_object_name = 'vacancy'
 
+    applications_per_page = 20
+
     def get_object(self, queryset=None):
-        return get_object_or_404(
-                    Vacancy.objects.prefetch_related('applications'),
-                    company=self.request.user.company, pk=self.kwargs['pk']
-                )
+        return get_object_or_404(Vacancy, company=self.request.user.company, pk=self.kwargs['pk'])
 
     def get_success_url(self):
         return self.request.path
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['applications'] = self.object.applications.all()
+        paginator = KeysetPaginator(self.object.applications.all(), self.applications_per_page, ('-pk',))
+        try:
+            context['applications'] = context['page_obj'] = paginator.get_page(self.request.GET)
+        except InvalidCursor:
+            raise Http404('Страница не найдена')
+        context['candidates'] = matching_resumes(self.object)
         return context
 
     def form_valid(self, form):
@@ -192,6 +391,31 @@ class MyVacancyView(LoginRequiredMixin, CreateCompanyRequiredMixin, UpdateView):
         return super(MyVacancyView, self).form_valid(form)
 
 
+class MyVacancyApplicationsExport(LoginRequiredMixin, CreateCompanyRequiredMixin, View):
+    """Выгрузка откликов на вакансию пользователя в CSV. Ответ формируется
+    по мере чтения откликов из базы."""
+
+    def get(self, request, *args, **kwargs):
+        vacancy = get_object_or_404(Vacancy.objects.only('pk'), company=request.user.company, pk=kwargs['pk'])
+        response = StreamingHttpResponse(
+            application_lines(Application.objects.filter(vacancy=vacancy)),
+            content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="applications-{vacancy.pk}.csv"'
+        return response
+
+
+class UploadVacanciesView(LoginRequiredMixin, CreateCompanyRequiredMixin, FormView):
+    """Загрузка вакансий компании из файла CSV или JSON с отчетом по строкам."""
+
+    form_class = VacancyUploadForm
+    template_name = 'core/vacancy-upload.html'
+
+    def form_valid(self, form):
+        report = import_vacancies(self.request.user.company, iter_rows(form.cleaned_data['file']))
+        return self.render_to_response(self.get_context_data(form=form, report=report))
+
+
 class CreateVacancyView(
     LoginRequiredMixin,
     CreateCompanyRequiredMixin,
@@ -269,6 +493,9 @@ class MyResumeView(
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['photo'] = self.object.photo
+        context['recommendations'] = self.object.recommendations.select_related(
+            'vacancy__company', 'vacancy__specialty'
+        ).order_by('-score')[:RECOMMENDATION_LIMIT]
         return context
 
     def get_success_url(self):
@@ -293,36 +520,51 @@ class CreateResumeView(
         return super(CreateResumeView, self).form_valid(form)
 
 
-class SearchView(ListView):
+class SearchView(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """Вывод страницы с поиском по вакансиям."""
 
     model = Vacancy
     template_name = 'core/search.html'
     context_object_name = 'vacancies'
 
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_keyset_ordering(self):
+        if self.get_search_query():
+            return '-search_rank', '-published_at', 'id'
+        return '-published_at', 'id'
+
     def get_queryset(self):
-        search_query = self.request.GET.get('q')
+        search_query = self.get_search_query()
+        vacancies = Vacancy.objects.select_related('specialty', 'company')
         if search_query:
-            vacancies = Vacancy.objects.select_related(
-                'specialty', 'company'
-            ).filter(Q(skills__icontains=search_query) | Q(title__icontains=search_query))
-        else:
-            vacancies = Vacancy.objects.select_related(
-                'specialty', 'company'
-            ).all()
+            vacancies = search_vacancies(vacancies, search_query)
         return vacancies
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['examples'] = Vacancy.objects.first().skills.split(', ')[:4]
+        context['examples'] = popular_skills(4)
         return context
 
 
-class ResumesList(LoginRequiredMixin, ListView):
+class AutocompleteView(View):
+    """Подсказки для строки поиска в формате JSON."""
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '')
+        try:
+            limit = max(0, min(int(request.GET.get('limit', MAX_SUGGESTIONS)), MAX_SUGGESTIONS))
+        except ValueError:
+            limit = MAX_SUGGESTIONS
+        return JsonResponse({'query': query, 'suggestions': suggest(query, limit)})
+
+
+class ResumesList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """Вывод страницы со списком всех резюме."""
 
     model = Resume
-    queryset = Resume.objects.exclude(status='Не ищу работу').select_related('user')
+    queryset = Resume.objects.exclude(status='Не ищу работу').select_related('user', 'specialty')
     context_object_name = 'resumes'
     template_name = 'core/resumes.html'
 
@@ -335,7 +577,7 @@ class ResumeDetail(LoginRequiredMixin, DetailView):
     context_object_name = 'resume'
 
 
-class CompaniesList(LoginRequiredMixin, ListView):
+class CompaniesList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """Вывод страницы со списком всех компаний."""
 
     model = Company
@@ -0,0 +1,92 @@
+"""Прогрев процесса перед приемом запросов.
+
+Вызывается из хуков config/gunicorn.py: шаблоны проекта компилируются
+в кэш загрузчика, распознаватель адресов заполняется, соединения с базами
+открываются, матрица подбора резюме строится, а пробный запрос проходит
+через все приложение. Без прогрева эту работу выполняет первый
+пользовательский запрос каждого процесса.
+"""
+import os
+import sys
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+
+
+def template_names():
+    """Имена всех шаблонов из каталогов TEMPLATES['DIRS']."""
+
+    for engine in engines.all():
+        for directory in getattr(engine, 'engine', engine).dirs:
+            for root, _, files in os.walk(directory):
+                for file_name in sorted(files):
+                    if file_name.endswith(('.html', '.txt', '.xml')):
+                        yield os.path.relpath(os.path.join(root, file_name), directory)
+
+
+def compile_templates():
+    """Компилирует шаблоны проекта. Возвращает (число шаблонов, ошибки)."""
+
+    count, errors = 0, []
+    for name in template_names():
+        try:
+            for engine in engines.all():
+                engine.get_template(name)
+            count += 1
+        except TemplateSyntaxError as error:
+            errors.append(f'{name}: {error}')
+    return count, errors
+
+
+def populate_urls():
+    """Импортирует представления и строит таблицы обратного разрешения
+    адресов. Возвращает число именованных адресов."""
+
+    return sum(isinstance(key, str) for key in get_resolver().reverse_dict)
+
+
+def build_matching_index():
+    """Строит матрицу подбора резюме. Возвращает число резюме в ней."""
+
+    from core.matching import index
+
+    index.rebuild()
+    return len(index.matrix)
+
+
+def open_connections():
+    for alias in connections:
+        connections[alias].ensure_connection()
+    return len(connections.all())
+
+
+def close_connections():
+    """Закрывает соединения: они не должны переживать fork процесса."""
+
+    for connection in connections.all():
+        connection.close()
+
+
+def warm_request(application, path='/'):
+    """Выполняет GET-запрос к WSGI-приложению в текущем процессе.
+    Возвращает (код ответа, время в миллисекундах)."""
+
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', 'wsgi.errors': sys.stderr, 'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    host = settings.ALLOWED_HOSTS[0].lstrip('.') if settings.ALLOWED_HOSTS else ''
+    environ['HTTP_HOST'] = host if host and host != '*' else 'localhost'
+    status = []
+    started = time.perf_counter()
+    response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(status[0].split()[0]), (time.perf_counter() - started) * 1000
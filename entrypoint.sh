@@ -2,6 +2,7 @@
 python manage.py makemigrations --no-input
 python manage.py migrate --no-input
 python manage.py db_dump
+python manage.py generate_thumbnails
 python manage.py makesuperuser
 python manage.py collectstatic --no-input --clear
-gunicorn config.wsgi:application --bind 0.0.0.0:8000
\ No newline at end of file
+gunicorn config.wsgi:application -c config/gunicorn.py
\ No newline at end of file